@@ -1,20 +1,24 @@
 import csv
 from datetime import datetime
 import os
+from pathlib import Path
+import re
+import subprocess
+import sys
 from types import SimpleNamespace
 from typing import List, Optional
 
 import typer
-from bfcl._llm_response_generation import main as generation_main
 from bfcl.constants.category_mapping import TEST_COLLECTION_MAPPING
 from bfcl.constants.eval_config import (
+    BENCHMARK_REPORT_PATH,
+    COMPILED_DATASET_PATH,
     DOTENV_PATH,
     PROJECT_ROOT,
     RESULT_PATH,
     SCORE_PATH,
 )
 from bfcl.constants.model_config import MODEL_CONFIG_MAPPING
-from bfcl.eval_checker.eval_runner import main as evaluation_main
 from dotenv import load_dotenv
 from tabulate import tabulate
 
@@ -28,6 +32,10 @@ class ExecutionOrderGroup(typer.core.TyperGroup):
             "results",
             "evaluate",
             "scores",
+            "serve",
+            "profile-startup",
+            "bench",
+            "data",
         ]
 
 
@@ -56,6 +64,17 @@ def handle_multiple_input(input_str):
     return [item.strip() for item in ",".join(input_str).split(",") if item.strip()]
 
 
+def handle_variations_input(input_str):
+    """
+    Input is like 'res_fmt=json,doc_fmt=xml;res_fmt=xml,doc_fmt=json', we need to transform it to ['res_fmt=json,doc_fmt=xml', 'res_fmt=xml,doc_fmt=json'].
+    The variations themselves contain commas, so they are separated by ';' (or by repeating the option) instead.
+    """
+    if input_str is None:
+        return []
+
+    return [item.strip() for item in ";".join(input_str).split(";") if item.strip()]
+
+
 @cli.command()
 def test_categories():
     """
@@ -112,6 +131,12 @@ def generate(
     ),
     num_gpus: int = typer.Option(1, help="The number of GPUs to use."),
     num_threads: int = typer.Option(1, help="The number of threads to use."),
+    rate_limit: List[str] = typer.Option(
+        [],
+        "--rate-limit",
+        help="Per-provider request ceiling in requests per minute, e.g. 'openai=200,claude=50'. Providers without a ceiling are only throttled after they return a rate-limit error. Use commas to separate multiple providers.",
+        callback=handle_multiple_input,
+    ),
     gpu_memory_utilization: float = typer.Option(0.9, help="The GPU memory utilization."),
     backend: str = typer.Option("vllm", help="The backend to use for the model."),
     skip_server_setup: bool = typer.Option(
@@ -133,13 +158,28 @@ def generate(
         False,
         "--allow-overwrite",
         "-o",
-        help="Allow overwriting existing results for regeneration.",
+        help="Allow overwriting existing results for regeneration. The model is queried again, even for the requests in the response cache, whose cached responses are replaced.",
+    ),
+    resume: bool = typer.Option(
+        False,
+        "--resume",
+        help="Also retry the test entries whose inference failed in a previous run (their error was written as the model response). Entries that were never generated, e.g. because the previous run was interrupted, are always generated.",
     ),
     run_ids: bool = typer.Option(
         False,
         "--run-ids",
         help="If true, also run the test entry mentioned in the test_case_ids_to_generate.json file, in addition to the --test_category argument.",
     ),
+    cache_dir: Optional[str] = typer.Option(
+        None,
+        "--cache-dir",
+        help="Path to the folder where the model responses are cached, if different from the default; Path should be relative to the `berkeley-function-call-leaderboard` root folder",
+    ),
+    no_cache: bool = typer.Option(
+        False,
+        "--no-cache",
+        help="Always query the model, without reading from or writing to the response cache.",
+    ),
     prompt_variation: str = typer.Option(
         "python",
         "--prompt-variation",
@@ -149,6 +189,15 @@ def generate(
              "Doc formats (doc_fmt): 'json' (default), 'python', 'xml'. "
              "Example: 'res_fmt=json_tagged,doc_fmt=xml' or just 'json' for legacy.",
     ),
+    variations: List[str] = typer.Option(
+        [],
+        "--variations",
+        help="Run several prompt variations in one process, sharing the work queue, rate limits and response cache. "
+             "Use 'all' for every response format and doc format combination, or list the variations to run. "
+             "Each variation is written to its own 'result_{res_fmt}_{doc_fmt}' folder (inside --result-dir, if given); --prompt-variation is ignored. "
+             "Separate multiple variations with ';', since the variations themselves contain commas.",
+        callback=handle_variations_input,
+    ),
 ):
     """
     Generate the LLM response for one or more models on a test-category (same as openfunctions_evaluation.py).
@@ -162,16 +211,24 @@ def generate(
         exclude_state_log=exclude_state_log,
         num_gpus=num_gpus,
         num_threads=num_threads,
+        rate_limit=rate_limit,
         gpu_memory_utilization=gpu_memory_utilization,
         backend=backend,
         skip_server_setup=skip_server_setup,
         local_model_path=local_model_path,
         result_dir=result_dir,
         allow_overwrite=allow_overwrite,
+        resume=resume,
         run_ids=run_ids,
+        cache_dir=cache_dir,
+        no_cache=no_cache,
         prompt_variation=prompt_variation,
+        variations=variations,
     )
     load_dotenv(dotenv_path=DOTENV_PATH, verbose=True, override=True)  # Load the .env file
+    # Imported here so that the other commands don't pay for the model handler dependencies
+    from bfcl._llm_response_generation import main as generation_main
+
     generation_main(args)
 
 
@@ -260,12 +317,51 @@ def evaluate(
              "If specified, automatically sets result_dir and score_dir based on res_fmt. "
              "Example: 'res_fmt=json,doc_fmt=xml' or just 'json'.",
     ),
+    num_workers: int = typer.Option(
+        1,
+        "--num-workers",
+        help="The number of worker processes to use. Categories are split into shards of entries and evaluated in parallel.",
+    ),
+    variations: List[str] = typer.Option(
+        [],
+        "--variations",
+        help="Evaluate several prompt variations in one process. Use 'all' for every response format and doc format combination, or list the variations to evaluate. "
+             "Each variation is read from its own 'result_{res_fmt}_{doc_fmt}' folder and scored into 'score_{res_fmt}_{doc_fmt}' (inside --result-dir/--score-dir, if given). "
+             "Separate multiple variations with ';', since the variations themselves contain commas.",
+        callback=handle_variations_input,
+    ),
+    no_cache: bool = typer.Option(
+        False,
+        "--no-cache",
+        help="Score every entry again, without reading or updating the score cache.",
+    ),
 ):
     """
     Evaluate results from run of one or more models on a test-category (same as eval_runner.py).
     """
 
     load_dotenv(dotenv_path=DOTENV_PATH, verbose=True, override=True)  # Load the .env file
+
+    if variations:
+        from bfcl.eval_checker.eval_runner import main as evaluation_main
+        from bfcl.model_handler.utils import (
+            expand_prompt_variations,
+            get_prompt_variation_dir_suffix,
+        )
+
+        for variation in expand_prompt_variations(variations):
+            suffix = get_prompt_variation_dir_suffix(variation)
+            print(f"🔄 Evaluating prompt variation: {variation}")
+            evaluation_main(
+                model,
+                test_category,
+                str(Path(result_dir or "") / f"result_{suffix}"),
+                str(Path(score_dir or "") / f"score_{suffix}"),
+                variation,
+                num_workers,
+                not no_cache,
+            )
+        return
     
     # If prompt_variation is specified, automatically set result_dir and score_dir
     if prompt_variation:
@@ -280,7 +376,11 @@ def evaluate(
         if score_dir is None:
             score_dir = f"score_{res_fmt}"
     
-    evaluation_main(model, test_category, result_dir, score_dir, prompt_variation)
+    from bfcl.eval_checker.eval_runner import main as evaluation_main
+
+    evaluation_main(
+        model, test_category, result_dir, score_dir, prompt_variation, num_workers, not no_cache
+    )
 
 
 @cli.command()
@@ -290,6 +390,16 @@ def scores(
         "--score-dir",
         help="Relative path to the evaluation score folder, if different from the default; Path should be relative to the `berkeley-function-call-leaderboard` root folder",
     ),
+    model: List[str] = typer.Option(
+        None,
+        help="Show the score of each test category of these models, instead of the leaderboard.",
+        callback=handle_multiple_input,
+    ),
+    test_category: List[str] = typer.Option(
+        None,
+        help="Show the score of each model on these test categories, instead of the leaderboard.",
+        callback=handle_multiple_input,
+    ),
 ):
     """
     Display the leaderboard.
@@ -302,6 +412,45 @@ def scores(
         score_dir = SCORE_PATH
     else:
         score_dir = (PROJECT_ROOT / score_dir).resolve()
+
+    if model or test_category:
+        from bfcl.eval_checker.score_store import get_score_store
+        from bfcl.utils import parse_test_category_argument
+
+        model_names = {model_name.replace("/", "_") for model_name in model or []}
+        test_names = set(parse_test_category_argument(test_category)[1]) if test_category else set()
+
+        score_store = get_score_store()
+        rows = []
+        for model_name, category_scores in sorted(score_store.sync_score_dir(score_dir).items()):
+            if model_names and model_name not in model_names:
+                continue
+            for category_name, score in sorted(category_scores.items()):
+                if test_names and category_name not in test_names:
+                    continue
+                error_type_counts = score_store.get_error_type_counts(
+                    score_dir, model_name, category_name
+                )
+                rows.append(
+                    [
+                        model_name,
+                        category_name,
+                        "{:.2f}%".format(score["accuracy"] * 100),
+                        score["correct_count"] if score["correct_count"] is not None else "N/A",
+                        score["total_count"],
+                        ", ".join(
+                            f"{error_type} ({count})" for error_type, count in error_type_counts[:2]
+                        ),
+                    ]
+                )
+        print(
+            tabulate(
+                rows,
+                headers=["Model", "Test Category", "Accuracy", "Correct", "Total", "Top Error Types"],
+                tablefmt="grid",
+            )
+        )
+        return
     # files = ["./score/data_non_live.csv", "./score/data_live.csv", "./score/data_overall.csv"]
     file = score_dir / "data_overall.csv"
 
@@ -334,5 +483,318 @@ def scores(
         print(f"\nFile {file} not found.\n")
 
 
+@cli.command()
+def profile_startup(
+    module: str = typer.Option(
+        "bfcl.__main__",
+        "--module",
+        help="The module to profile the import of, e.g. 'bfcl.eval_checker.eval_runner' or 'bfcl.model_handler.api_inference.openai'.",
+    ),
+    top: int = typer.Option(20, "--top", help="The number of slowest modules to display."),
+):
+    """
+    Report the import time of the CLI (or another bfcl module), to keep the startup time in check.
+    """
+    # Run in a fresh interpreter, as everything is already imported in this one
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    if process.returncode != 0:
+        print(process.stderr.strip().splitlines()[-1])
+        raise typer.Exit(code=1)
+
+    # Each line looks like "import time:  self [us] | cumulative | imported package"
+    import_times = []
+    for line in process.stderr.splitlines():
+        match = re.match(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)", line)
+        if match:
+            self_time, cumulative_time, indent, name = match.groups()
+            import_times.append((name, int(self_time), int(cumulative_time), len(indent) // 2))
+
+    total_time = sum(self_time for _, self_time, _, _ in import_times)
+    # The modules imported directly by the profiled module (or by the interpreter itself, eg. `site`)
+    direct_imports = sorted(
+        [entry for entry in import_times if entry[3] <= 1], key=lambda x: x[2], reverse=True
+    )
+    slowest_imports = sorted(import_times, key=lambda x: x[1], reverse=True)
+
+    print(f"Importing {module} takes {total_time / 1e6:.3f}s ({len(import_times)} modules).\n")
+    print("Slowest direct imports (cumulative):")
+    print(
+        tabulate(
+            [
+                [name, f"{cumulative_time / 1e3:.1f}", f"{cumulative_time / total_time:.1%}"]
+                for name, _, cumulative_time, _ in direct_imports[:top]
+            ],
+            headers=["Module", "Cumulative (ms)", "Share"],
+            tablefmt="grid",
+        )
+    )
+    print("\nSlowest individual modules (self):")
+    print(
+        tabulate(
+            [
+                [name, f"{self_time / 1e3:.1f}"]
+                for name, self_time, _, _ in slowest_imports[:top]
+            ],
+            headers=["Module", "Self (ms)"],
+            tablefmt="grid",
+        )
+    )
+
+
+@cli.command()
+def bench(
+    workload: List[str] = typer.Option(
+        ["all"],
+        help="A list of workloads to run, or groups of workloads (eg. 'ast_parse', 'file_io'). Use --list to see them. Use commas to separate multiple workloads.",
+        callback=handle_multiple_input,
+    ),
+    rounds: int = typer.Option(5, "--rounds", help="The number of passes over the operations of each workload."),
+    output: Optional[str] = typer.Option(
+        None,
+        "--output",
+        help="Path of the JSON report. Defaults to a timestamped file in .cache/benchmark/.",
+    ),
+    compare: Optional[str] = typer.Option(
+        None,
+        "--compare",
+        help="A baseline report to compare against. Exits with code 1 if any workload regressed.",
+    ),
+    report: Optional[str] = typer.Option(
+        None,
+        "--report",
+        help="Compare this existing report against --compare, instead of running the benchmark.",
+    ),
+    threshold: float = typer.Option(
+        0.1,
+        "--threshold",
+        help="The relative drop in throughput (or growth in p99 latency) above which a workload is flagged as a regression.",
+    ),
+    list_workloads: bool = typer.Option(False, "--list", help="List the workloads instead of running them."),
+):
+    """
+    Measure the overhead of the framework itself (parsing, tool compilation, checking, file IO, and generation against a local mock model) on fixed synthetic workloads.
+    """
+    from bfcl.benchmark.runner import (
+        compare_reports,
+        load_report,
+        run_benchmark,
+        select_workloads,
+        write_report,
+    )
+
+    if list_workloads:
+        print(
+            tabulate(
+                [[w.name, w.description] for w in select_workloads(workload)],
+                headers=["Workload", "Description"],
+                tablefmt="grid",
+            )
+        )
+        return
+
+    if report is not None:
+        if compare is None:
+            raise typer.BadParameter("--report requires a baseline report to compare against.", param_hint="--compare")
+        current_report = load_report(report)
+    else:
+        try:
+            workloads = select_workloads(workload)
+        except ValueError as e:
+            raise typer.BadParameter(str(e), param_hint="--workload")
+        current_report = run_benchmark(workloads, rounds)
+        output_path = (
+            Path(output)
+            if output is not None
+            else BENCHMARK_REPORT_PATH / f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        )
+        write_report(current_report, output_path)
+
+        print(
+            tabulate(
+                [
+                    [
+                        name,
+                        result["op_count"],
+                        f"{result['ops_per_sec']:.1f}",
+                        f"{result['p50_ms']:.3f}",
+                        f"{result['p99_ms']:.3f}",
+                        f"{result['peak_rss_mb']:.0f}" if result["peak_rss_mb"] is not None else "N/A",
+                    ]
+                    for name, result in current_report["workloads"].items()
+                ],
+                headers=["Workload", "Ops", "Ops/sec", "p50 (ms)", "p99 (ms)", "Peak RSS (MB)"],
+                tablefmt="grid",
+            )
+        )
+        print(f"📊 Benchmark report saved to {output_path}")
+
+    if compare is None:
+        return
+
+    comparisons = compare_reports(load_report(compare), current_report, threshold)
+
+    def format_change(change):
+        return f"{change:+.1%}" if change is not None else "N/A"
+
+    print(
+        tabulate(
+            [
+                [
+                    comparison["workload"],
+                    format_change(comparison["throughput_change"]),
+                    format_change(comparison["p99_change"]),
+                    "❌ regression" if comparison["is_regression"] else "✅",
+                ]
+                for comparison in comparisons
+            ],
+            headers=["Workload", "Ops/sec change", "p99 change", "Status"],
+            tablefmt="grid",
+        )
+    )
+    regression_count = sum(comparison["is_regression"] for comparison in comparisons)
+    if regression_count:
+        print(f"{regression_count} of {len(comparisons)} workloads regressed by more than {threshold:.0%}.")
+        raise typer.Exit(code=1)
+    print(f"No regression beyond {threshold:.0%} in {len(comparisons)} workloads.")
+
+
+@cli.command()
+def serve(
+    model: Optional[str] = typer.Option(
+        None,
+        help="The locally-hosted model to serve. Later `bfcl generate` runs of this model reuse the server instead of starting their own.",
+    ),
+    backend: str = typer.Option("vllm", help="The backend to use for the model."),
+    num_gpus: int = typer.Option(1, help="The number of GPUs to use."),
+    gpu_memory_utilization: float = typer.Option(0.9, help="The GPU memory utilization."),
+    host: str = typer.Option(
+        "localhost",
+        "--host",
+        help="The address the server listens on, e.g. `0.0.0.0` to also accept connections from other machines.",
+    ),
+    port: Optional[int] = typer.Option(
+        None,
+        "--port",
+        help="The port to serve on. Defaults to the VLLM_PORT environment variable, or 1053.",
+    ),
+    local_model_path: Optional[str] = typer.Option(
+        None,
+        "--local-model-path",
+        help="Specify the path to a local directory containing the model's config/tokenizer/weights for fully offline inference. Use this only if the model weights are stored in a location other than the default HF_HOME directory.",
+    ),
+    list_servers: bool = typer.Option(
+        False,
+        "--list",
+        help="List the running servers started by `bfcl serve` instead of starting one.",
+    ),
+):
+    """
+    Start a vLLM/SGLang server for a locally-hosted model and keep it alive (until Ctrl+C) across `bfcl generate` runs.
+    """
+    load_dotenv(dotenv_path=DOTENV_PATH, verbose=True, override=True)  # Load the .env file
+    from bfcl.model_handler.local_inference.oss_server import list_live_servers
+    from bfcl.model_handler.local_inference.oss_server import serve as start_server
+    from bfcl.model_handler.model_style import ModelStyle
+
+    if list_servers:
+        print(
+            tabulate(
+                [
+                    [info["model"], info["backend"], info["base_url"], info["pid"], info["started_at"]]
+                    for info in list_live_servers()
+                ],
+                headers=["Model", "Backend", "URL", "PID", "Started at"],
+                tablefmt="grid",
+            )
+        )
+        return
+
+    if model not in MODEL_CONFIG_MAPPING:
+        raise typer.BadParameter(f"Unknown model_name '{model}'.", param_hint="--model")
+    handler = MODEL_CONFIG_MAPPING[model].get_model_handler()(model, temperature=0.001)
+    if handler.model_style != ModelStyle.OSSMODEL:
+        raise typer.BadParameter(
+            f"'{model}' is not a locally-hosted model; only those can be served.",
+            param_hint="--model",
+        )
+    handler.set_model_source(local_model_path)
+
+    start_server(
+        backend,
+        handler.model_path_or_id,
+        host=host,
+        port=port if port is not None else int(handler.vllm_port),
+        dtype=handler.dtype,
+        num_gpus=num_gpus,
+        gpu_memory_utilization=gpu_memory_utilization,
+    )
+
+
+data_cli = typer.Typer(
+    context_settings=dict(help_option_names=["-h", "--help"]),
+    no_args_is_help=True,
+    help="Manage the test datasets.",
+)
+cli.add_typer(data_cli, name="data")
+
+
+@data_cli.command("compile")
+def data_compile(
+    test_category: List[str] = typer.Option(
+        ["all"],
+        help="A list of test categories to compile. Use commas to separate multiple test categories.",
+        callback=handle_multiple_input,
+    ),
+    force: bool = typer.Option(
+        False,
+        "--force",
+        "-f",
+        help="Compile again even if the compiled dataset is up to date.",
+    ),
+):
+    """
+    Pack the entries and possible answers of each test category into a memory-mapped file with an id index, so that single entries can be read without parsing the whole JSON file.
+    The JSON files stay the source of truth; a compiled dataset is ignored as soon as they change, until it is compiled again.
+    """
+    from bfcl.dataset import (
+        POSSIBLE_ANSWER_SECTION,
+        PROMPT_SECTION,
+        CompiledDataset,
+        compile_dataset,
+    )
+    from bfcl.utils import parse_test_category_argument
+
+    _, all_test_categories = parse_test_category_argument(test_category)
+
+    rows = []
+    for category in all_test_categories:
+        pack_path, compiled = compile_dataset(category, force=force)
+        compiled_dataset = CompiledDataset(pack_path)
+        rows.append(
+            [
+                category,
+                compiled_dataset.count(PROMPT_SECTION),
+                compiled_dataset.count(POSSIBLE_ANSWER_SECTION)
+                if POSSIBLE_ANSWER_SECTION in compiled_dataset.records
+                else "N/A",
+                "compiled" if compiled else "up to date",
+            ]
+        )
+        compiled_dataset.close()
+
+    print(
+        tabulate(
+            rows,
+            headers=["Test category", "Entries", "Possible answers", "Status"],
+            tablefmt="grid",
+        )
+    )
+    print(f"📦 Compiled datasets are stored in {COMPILED_DATASET_PATH}")
+
+
 if __name__ == "__main__":
     cli()
@@ -1,30 +1,52 @@
 import argparse
+import asyncio
 import json
-import time
 from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
 
-from bfcl.constants.category_mapping import (
-    MULTI_TURN_FUNC_DOC_FILE_MAPPING,
-    TEST_FILE_MAPPING,
-)
+from bfcl.constants.category_mapping import TEST_FILE_MAPPING
 from bfcl.constants.eval_config import (
-    MULTI_TURN_FUNC_DOC_PATH,
     PROJECT_ROOT,
     PROMPT_PATH,
+    RESPONSE_CACHE_PATH,
     RESULT_PATH,
     TEST_IDS_TO_GENERATE_PATH,
 )
-from bfcl.eval_checker.eval_runner_helper import load_file
 from bfcl.constants.model_config import MODEL_CONFIG_MAPPING
+from bfcl.dataset import (
+    get_dataset_entries_by_ids,
+    load_dataset_file,
+    load_multi_turn_func_doc,
+)
+from bfcl.eval_checker.multi_turn_eval.instance_registry import INSTANCE_REGISTRY
+from bfcl.model_handler.compilation_cache import get_compilation_cache_summary
 from bfcl.model_handler.model_style import ModelStyle
-from bfcl.model_handler.utils import set_prompt_variation
-from bfcl.utils import is_multi_turn, parse_test_category_argument, sort_key
+from bfcl.model_handler.rate_limiter import (
+    get_provider_name,
+    get_rate_limiter,
+    DeferredRateLimitError,
+    get_retry_after,
+    is_rate_limit_error,
+    is_retryable_error,
+    parse_rate_limit_argument,
+)
+from bfcl.model_handler.response_cache import get_response_cache
+from bfcl.model_handler.result_store import compact_result_dir
+from bfcl.model_handler.run_journal import INFERENCE_ERROR_PREFIX, get_run_journal
+from bfcl.model_handler.utils import (
+    expand_prompt_variations,
+    get_prompt_variation_dir_suffix,
+    prompt_variation_context,
+    set_prompt_variation,
+)
+from bfcl.utils import (
+    is_multi_turn,
+    parse_test_category_argument,
+    sort_key,
+)
 from tqdm import tqdm
 
 RETRY_LIMIT = 3
-# 60s for the timer to complete. But often we find that even with 60 there is a conflict. So 65 is a safe no.
-RETRY_DELAY = 65  # Delay in seconds
 
 
 def get_args():
@@ -39,12 +61,23 @@ def get_args():
     parser.add_argument("--include-input-log", action="store_true", default=False)
     parser.add_argument("--exclude-state-log", action="store_true", default=False)
     parser.add_argument("--num-threads", default=1, type=int)
+    parser.add_argument(
+        "--rate-limit",
+        type=str,
+        default=None,
+        nargs="+",
+        help="Per-provider request ceiling in requests per minute, e.g. `openai=200 claude=50`.",
+    )
     parser.add_argument("--num-gpus", default=1, type=int)
     parser.add_argument("--backend", default="vllm", type=str, choices=["vllm", "sglang"])
     parser.add_argument("--gpu-memory-utilization", default=0.9, type=float)
     parser.add_argument("--result-dir", default=None, type=str)
     parser.add_argument("--run-ids", action="store_true", default=False)
     parser.add_argument("--allow-overwrite", "-o", action="store_true", default=False)
+    parser.add_argument("--resume", action="store_true", default=False)
+    parser.add_argument("--variations", type=str, default=None, nargs="+")
+    parser.add_argument("--cache-dir", default=None, type=str)
+    parser.add_argument("--no-cache", action="store_true", default=False)
     # Add the new skip_vllm argument
     parser.add_argument(
         "--skip-server-setup",
@@ -65,7 +98,8 @@ def get_args():
 
 
 def build_handler(model_name, temperature):
-    handler = MODEL_CONFIG_MAPPING[model_name].model_handler(model_name, temperature)
+    model_handler = MODEL_CONFIG_MAPPING[model_name].get_model_handler()
+    handler = model_handler(model_name, temperature)
     return handler
 
 
@@ -78,11 +112,11 @@ def get_involved_test_entries(test_category_args, run_ids):
             if len(test_ids) == 0:
                 continue
             test_file_path = TEST_FILE_MAPPING[category]
+            # Shallow copies, as `process_multi_turn_test_case` adds keys to the entries
             all_test_entries_involved.extend(
                 [
-                    entry
-                    for entry in load_file(PROMPT_PATH / test_file_path)
-                    if entry["id"] in test_ids
+                    dict(entry)
+                    for entry in get_dataset_entries_by_ids(PROMPT_PATH / test_file_path, test_ids)
                 ]
             )
             all_test_categories.append(category)
@@ -94,7 +128,9 @@ def get_involved_test_entries(test_category_args, run_ids):
         for test_category, file_to_open in zip(
             all_test_categories[:], all_test_file_paths[:]
         ):
-            all_test_entries_involved.extend(load_file(PROMPT_PATH / file_to_open))
+            all_test_entries_involved.extend(
+                [dict(entry) for entry in load_dataset_file(PROMPT_PATH / file_to_open)]
+            )
 
     return (
         all_test_file_paths,
@@ -104,27 +140,51 @@ def get_involved_test_entries(test_category_args, run_ids):
 
 
 def collect_test_cases(
-    args, model_name, all_test_categories, all_test_file_paths, all_test_entries_involved
+    args,
+    model_name,
+    all_test_categories,
+    all_test_file_paths,
+    all_test_entries_involved,
+    result_dir=None,
 ):
+    if result_dir is None:
+        result_dir = args.result_dir
     model_name_dir = model_name.replace("/", "_")
-    model_result_dir = args.result_dir / model_name_dir
+    model_result_dir = result_dir / model_name_dir
+    journal = get_run_journal(result_dir, model_name)
+    result_file_paths = [
+        model_result_dir / file_to_open.replace(".json", "_result.json")
+        for file_to_open in all_test_file_paths
+    ]
+    # Recover the results of a previous run that was interrupted before it could finalize its result files
+    for test_category, result_file_path in zip(all_test_categories, result_file_paths):
+        journal.compact_result_file(test_category, result_file_path)
+    compact_result_dir(model_result_dir)
 
-    existing_result = []
-    for test_category, file_to_open in zip(all_test_categories, all_test_file_paths):
+    existing_ids = set()
+    failed_ids = set()
+    for test_category, result_file_path in zip(all_test_categories, result_file_paths):
 
-        result_file_path = model_result_dir / file_to_open.replace(".json", "_result.json")
         if result_file_path.exists():
-            # Not allowing overwrite, we will load the existing results
+            # Not allowing overwrite, we will skip the existing results (their ids come from the run journal, unless
+            # the result file changed since)
             if not args.allow_overwrite:
-                existing_result.extend(load_file(result_file_path))
+                existing_ids.update(journal.get_generated_ids(test_category, result_file_path))
+                failed_ids.update(journal.get_failed_ids(test_category))
             # Allow overwrite and not running specific test ids, we will delete the existing result file before generating new results
             elif not args.run_ids:
                 result_file_path.unlink()
+                journal.checkpoint(test_category, result_file_path)
             # Allow overwrite and running specific test ids, we will do nothing here
             else:
                 pass
+        else:
+            journal.checkpoint(test_category, result_file_path)
 
-        existing_ids = [entry["id"] for entry in existing_result]
+    # When resuming, the entries whose inference failed are generated again, and replace their error in the result file
+    if getattr(args, "resume", False) and failed_ids:
+        print(f"Retrying {len(failed_ids)} test entries whose inference failed in {model_result_dir}.")
+        existing_ids -= failed_ids
 
     test_cases_to_generate = [
         test_case
@@ -143,18 +203,22 @@ def process_multi_turn_test_case(test_cases):
     for entry in test_cases:
         if not is_multi_turn(entry["id"]):
             continue
+        # Already processed; the same entry is shared by all the prompt variations of a run
+        if "function" in entry:
+            continue
         involved_classes = entry["involved_classes"]
         entry["function"] = []
         for func_collection in involved_classes:
-            # func_doc is a list of dict
-            func_doc = load_file(
-                MULTI_TURN_FUNC_DOC_PATH / MULTI_TURN_FUNC_DOC_FILE_MAPPING[func_collection]
-            )
+            # func_doc is a list of dict, shared with the other entries; the inference works on a deep copy of the entry
+            func_doc = load_multi_turn_func_doc(func_collection)
             entry["function"].extend(func_doc)
 
         # Handle Miss Func category; we need to remove the holdout function doc
         if "missed_function" in entry:
-            for turn_index, missed_func_names in entry["missed_function"].items():
+            # Build a new mapping rather than modifying the one of the (shared) dataset entry
+            missed_function = entry["missed_function"]
+            entry["missed_function"] = {}
+            for turn_index, missed_func_names in missed_function.items():
                 entry["missed_function"][turn_index] = []
                 for missed_func_name in missed_func_names:
                     for i, func_doc in enumerate(entry["function"]):
@@ -168,46 +232,71 @@ def process_multi_turn_test_case(test_cases):
     return test_cases
 
 
-def multi_threaded_inference(handler, test_case, include_input_log, exclude_state_log):
+async def async_inference(
+    handler, test_case, include_input_log, exclude_state_log, semaphore, prompt_variation=None
+):
+    """
+    Run the inference for one test case in a worker thread, with the given prompt variation.
 
+    `semaphore` bounds the number of test cases in flight (`--num-threads`). The token of the first API request of
+    the test case is taken from the provider's rate limiter here, on the event loop, so that neither the wait for it
+    nor the wait after it is throttled holds a worker thread; the later requests of a multi-turn test case are paced
+    by the limiter inside the handler. When a rate-limit or server error escapes the handler, we only wait as long as
+    the limiter (or the provider's retry-after hint) tells us to, also on the event loop.
+    """
     assert type(test_case["function"]) is list
 
+    # Each asyncio task has its own context, which `asyncio.to_thread` hands over to the worker thread
+    with prompt_variation_context(prompt_variation):
+        return await _async_inference(
+            handler, test_case, include_input_log, exclude_state_log, semaphore
+        )
+
+
+async def _async_inference(handler, test_case, include_input_log, exclude_state_log, semaphore):
     retry_count = 0
 
-    while True:
-        try:
-            result, metadata = handler.inference(
-                deepcopy(test_case), include_input_log, exclude_state_log
-            )
-            break  # Success, exit the loop
-        except Exception as e:
-            # TODO: It might be better to handle the exception in the handler itself rather than a universal catch block here, as each handler use different ways to call the endpoint.
-            # OpenAI has openai.RateLimitError while Anthropic has anthropic.RateLimitError. It would be more robust in the long run.
-            if retry_count < RETRY_LIMIT and (
-                "rate limit reached" in str(e).lower()
-                or (hasattr(e, "status_code") and (e.status_code in {429, 503, 500}))
-            ):
-                print(
-                    f"Rate limit reached. Sleeping for 65 seconds. Retry {retry_count + 1}/{RETRY_LIMIT}"
-                )
-                time.sleep(RETRY_DELAY)
-                retry_count += 1
-            else:
-                # This is usually the case when the model getting stuck on one particular test case.
-                # For example, timeout error or FC model returning invalid JSON response.
-                # Since temperature is already set to 0.001, retrying the same test case will not help.
-                # So we continue the generation process and record the error message as the model response
-                print("-" * 100)
-                print(
-                    "❗️❗️ Error occurred during inference. Maximum reties reached for rate limit or other error. Continuing to next test case."
+    async with semaphore:
+        while True:
+            if handler.rate_limiter is not None:
+                await handler.rate_limiter.acquire_async()
+            try:
+                result, metadata = await asyncio.to_thread(
+                    handler.inference, deepcopy(test_case), include_input_log, exclude_state_log
                 )
-                print(f"❗️❗️ Test case ID: {test_case['id']}, Error: {str(e)}")
-                print("-" * 100)
+                break  # Success, exit the loop
+            except DeferredRateLimitError as e:
+                # The first request was throttled; the next `acquire_async` waits for as long as the limiter is paused.
+                # Not counted as a retry, like the throttled requests the handler retries itself.
+                retry_delay = handler.rate_limiter.on_rate_limited(get_retry_after(e.original_error))
+                print(f"Rate limit reached. Waiting {retry_delay:.2f} seconds before sending the request again.")
+            except Exception as e:
+                if retry_count < RETRY_LIMIT and is_retryable_error(e):
+                    if handler.rate_limiter is not None and is_rate_limit_error(e):
+                        retry_delay = handler.rate_limiter.on_rate_limited(get_retry_after(e))
+                    else:
+                        retry_delay = get_retry_after(e) or 1
+                    print(
+                        f"{'Rate limit reached' if is_rate_limit_error(e) else 'Server error'}. Sleeping for {retry_delay:.2f} seconds. Retry {retry_count + 1}/{RETRY_LIMIT}"
+                    )
+                    await asyncio.sleep(retry_delay)
+                    retry_count += 1
+                else:
+                    # This is usually the case when the model getting stuck on one particular test case.
+                    # For example, timeout error or FC model returning invalid JSON response.
+                    # Since temperature is already set to 0.001, retrying the same test case will not help.
+                    # So we continue the generation process and record the error message as the model response
+                    print("-" * 100)
+                    print(
+                        "❗️❗️ Error occurred during inference. Maximum reties reached for rate limit or other error. Continuing to next test case."
+                    )
+                    print(f"❗️❗️ Test case ID: {test_case['id']}, Error: {str(e)}")
+                    print("-" * 100)
 
-                return {
-                    "id": test_case["id"],
-                    "result": f"Error during inference: {str(e)}",
-                }
+                    return {
+                        "id": test_case["id"],
+                        "result": f"{INFERENCE_ERROR_PREFIX}{str(e)}",
+                    }
 
     result_to_write = {
         "id": test_case["id"],
@@ -219,57 +308,98 @@ def multi_threaded_inference(handler, test_case, include_input_log, exclude_stat
     return result_to_write
 
 
-def generate_results(args, model_name, test_cases_total):
+async def async_generate_results(args, model_name, handler, generation_tasks):
+    # `asyncio.to_thread` uses the default executor, which is capped at a few dozen threads; size it to `--num-threads`
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=args.num_threads)
+    )
+    semaphore = asyncio.Semaphore(args.num_threads)
+    tasks = [
+        asyncio.create_task(
+            async_inference(
+                handler,
+                test_case,
+                args.include_input_log,
+                args.exclude_state_log,
+                semaphore,
+                prompt_variation,
+            )
+        )
+        for test_case, prompt_variation, _ in generation_tasks
+    ]
+
+    with tqdm(total=len(generation_tasks), desc=f"Generating results for {model_name}") as pbar:
+        try:
+            for task, (_, _, result_dir) in zip(tasks, generation_tasks):
+                # This will wait for the task to complete, so that we are always writing in order
+                result = await task
+                handler.write(result, result_dir=result_dir)
+                get_run_journal(result_dir, model_name).record_results([result])
+                pbar.update()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+def generate_results(args, model_name, generation_tasks):
+    """
+    `generation_tasks` is a list of (test_case, prompt_variation, result_dir), possibly covering several prompt variations,
+    which are all run through the same work queue (and, for OSS models, the same inference server).
+    """
     update_mode = args.allow_overwrite
     handler = build_handler(model_name, args.temperature)
+    if not getattr(args, "no_cache", False):
+        handler.response_cache = get_response_cache(args.cache_dir)
+        # Regenerating is meant to get fresh responses, so the cached ones are only overwritten, never replayed
+        handler.refresh_response_cache = args.allow_overwrite
+
+    try:
+        if handler.model_style == ModelStyle.OSSMODEL:
+            # batch_inference will handle the writing of results
+            handler.batch_inference(
+                test_entries=[test_case for test_case, _, _ in generation_tasks],
+                num_gpus=args.num_gpus,
+                gpu_memory_utilization=args.gpu_memory_utilization,
+                backend=args.backend,
+                skip_server_setup=args.skip_server_setup,
+                local_model_path=args.local_model_path,
+                include_input_log=args.include_input_log,
+                exclude_state_log=args.exclude_state_log,
+                result_dir=args.result_dir,
+                update_mode=update_mode,
+                entry_variations=[
+                    (prompt_variation, result_dir)
+                    for _, prompt_variation, result_dir in generation_tasks
+                ],
+            )
 
-    if handler.model_style == ModelStyle.OSSMODEL:
-        # batch_inference will handle the writing of results
-        handler.batch_inference(
-            test_entries=test_cases_total,
-            num_gpus=args.num_gpus,
-            gpu_memory_utilization=args.gpu_memory_utilization,
-            backend=args.backend,
-            skip_server_setup=args.skip_server_setup,
-            local_model_path=args.local_model_path,
-            include_input_log=args.include_input_log,
-            exclude_state_log=args.exclude_state_log,
-            result_dir=args.result_dir,
-            update_mode=update_mode,
-        )
+        else:
+            provider = get_provider_name(handler)
+            rate_limits = parse_rate_limit_argument(getattr(args, "rate_limit", None))
+            # Handlers of the same provider share one limiter (and thus one quota) across all models in this run
+            handler.rate_limiter = get_rate_limiter(provider, rate_limits.get(provider))
+            if provider in rate_limits:
+                print(f"Rate limiting {provider} requests to {rate_limits[provider]:g} RPM.")
 
-    else:
-        futures = []
-        with ThreadPoolExecutor(max_workers=args.num_threads) as executor:
-            with tqdm(
-                total=len(test_cases_total), desc=f"Generating results for {model_name}"
-            ) as pbar:
-
-                for test_case in test_cases_total:
-                    future = executor.submit(
-                        multi_threaded_inference,
-                        handler,
-                        test_case,
-                        args.include_input_log,
-                        args.exclude_state_log,
-                    )
-                    futures.append(future)
+            asyncio.run(async_generate_results(args, model_name, handler, generation_tasks))
 
-                for future in futures:
-                    # This will wait for the task to complete, so that we are always writing in order
-                    result = future.result()
-                    handler.write(
-                        result, result_dir=args.result_dir, update_mode=args.run_ids
-                    )  # Only when we run specific test ids, we will need update_mode=True to keep entries in the same order
-                    pbar.update()
+    finally:
+        # Sort and deduplicate the result files once, instead of on every write
+        handler.compact_results()
 
 
 def main(args):
 
     # Set the global prompt variation
-    if hasattr(args, 'prompt_variation'):
-        set_prompt_variation(args.prompt_variation)
-        print(f"Using prompt variation: {args.prompt_variation}")
+    prompt_variation = getattr(args, "prompt_variation", None)
+    if prompt_variation is not None:
+        set_prompt_variation(prompt_variation)
+
+    prompt_variations = expand_prompt_variations(getattr(args, "variations", None) or [])
+    if prompt_variations:
+        print(f"Running {len(prompt_variations)} prompt variations: {prompt_variations}")
+    elif prompt_variation is not None:
+        print(f"Using prompt variation: {prompt_variation}")
 
     if type(args.model) is not list:
         args.model = [args.model]
@@ -300,18 +430,64 @@ def main(args):
     else:
         args.result_dir = RESULT_PATH
 
+    if getattr(args, "cache_dir", None) is not None:
+        args.cache_dir = PROJECT_ROOT / args.cache_dir
+    else:
+        args.cache_dir = RESPONSE_CACHE_PATH
+
+    if prompt_variations:
+        # Each variation gets its own result folder, eg. `result_json_xml`, inside the `--result-dir` folder if one is given
+        variations_root = args.result_dir if args.result_dir != RESULT_PATH else PROJECT_ROOT
+        variation_result_dirs = [
+            (variation, variations_root / f"result_{get_prompt_variation_dir_suffix(variation)}")
+            for variation in prompt_variations
+        ]
+    else:
+        variation_result_dirs = [(prompt_variation, args.result_dir)]
+
     for model_name in args.model:
-        test_cases_total = collect_test_cases(
-            args,
-            model_name,
-            all_test_categories,
-            all_test_file_paths,
-            all_test_entries_involved,
-        )
+        generation_tasks = []
+        for variation, result_dir in variation_result_dirs:
+            test_cases_total = collect_test_cases(
+                args,
+                model_name,
+                all_test_categories,
+                all_test_file_paths,
+                all_test_entries_involved,
+                result_dir=result_dir,
+            )
+            generation_tasks.extend(
+                (test_case, variation, result_dir) for test_case in test_cases_total
+            )
+            if test_cases_total:
+                get_run_journal(result_dir, model_name).start_run(
+                    {
+                        "model": model_name,
+                        "test_categories": all_test_categories,
+                        "temperature": args.temperature,
+                        "prompt_variation": variation,
+                        "allow_overwrite": args.allow_overwrite,
+                        "run_ids": args.run_ids,
+                        "resume": getattr(args, "resume", False),
+                    },
+                    [test_case["id"] for test_case in test_cases_total],
+                )
 
-        if len(test_cases_total) == 0:
+        if len(generation_tasks) == 0:
             print(
                 f"All selected test cases have been previously generated for {model_name}. No new test cases to generate."
             )
         else:
-            generate_results(args, model_name, test_cases_total)
+            try:
+                generate_results(args, model_name, generation_tasks)
+            finally:
+                # The result files are compacted by now, even if the run was interrupted
+                for _, result_dir in variation_result_dirs:
+                    journal = get_run_journal(result_dir, model_name)
+                    journal.finish_run()
+                    print(journal.summary())
+
+    if not getattr(args, "no_cache", False):
+        print(get_response_cache(args.cache_dir).summary())
+    print(get_compilation_cache_summary())
+    print(INSTANCE_REGISTRY.summary())
@@ -0,0 +1,131 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+
+class _MockChatCompletionHandler(BaseHTTPRequestHandler):
+    """
+    Answers every chat completion request immediately: with a call to the first tool (no arguments) when the request
+    has tools, and with an empty list of calls otherwise. The first `rate_limited_request_count` requests of the server
+    are answered with a 429 instead.
+    """
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, payload: dict, status: int = 200, headers: Optional[dict] = None) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        # Model listing, used by some clients to check that the server is up
+        self._send_json({"object": "list", "data": [{"id": "mock", "object": "model"}]})
+
+    def do_POST(self):
+        content_length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(content_length) or b"{}")
+        with self.server.request_count_lock:
+            self.server.request_count += 1
+            self.server.request_times.append(time.monotonic())
+            is_rate_limited = self.server.request_count <= self.server.rate_limited_request_count
+
+        if is_rate_limited:
+            headers = {}
+            if self.server.retry_after is not None:
+                headers["Retry-After"] = f"{self.server.retry_after:g}"
+            self._send_json(
+                {
+                    "error": {
+                        "message": "Rate limit reached for requests",
+                        "type": "requests",
+                        "code": "rate_limit_exceeded",
+                    }
+                },
+                status=429,
+                headers=headers,
+            )
+            return
+
+        tools = request.get("tools") or []
+        if tools:
+            message = {
+                "role": "assistant",
+                "content": None,
+                "tool_calls": [
+                    {
+                        "id": "call_0",
+                        "type": "function",
+                        "function": {"name": tools[0]["function"]["name"], "arguments": "{}"},
+                    }
+                ],
+            }
+        else:
+            message = {"role": "assistant", "content": "[]"}
+
+        self._send_json(
+            {
+                "id": "mock",
+                "object": "chat.completion",
+                "created": 0,
+                "model": request.get("model", "mock"),
+                "choices": [{"index": 0, "message": message, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+            }
+        )
+
+
+class MockModelServer:
+    """
+    A local OpenAI-compatible chat completion endpoint that answers instantly, so that an end-to-end `bfcl generate`
+    run against it measures the overhead of the framework alone. Use as a context manager; `base_url` is the value for
+    `OPENAI_BASE_URL`.
+
+    To exercise the rate limiting of the framework, the first `rate_limited_request_count` requests are throttled,
+    with a `Retry-After` header of `retry_after` seconds if given.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        rate_limited_request_count: int = 0,
+        retry_after: Optional[float] = None,
+    ) -> None:
+        self._server = ThreadingHTTPServer((host, port), _MockChatCompletionHandler)
+        self._server.daemon_threads = True
+        self._server.rate_limited_request_count = rate_limited_request_count
+        self._server.retry_after = retry_after
+        self._server.request_count = 0
+        # `time.monotonic()` of every chat completion request received, throttled or not
+        self._server.request_times = []
+        self._server.request_count_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    @property
+    def request_count(self) -> int:
+        return self._server.request_count
+
+    @property
+    def request_times(self) -> list[float]:
+        return list(self._server.request_times)
+
+    def __enter__(self) -> "MockModelServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,186 @@
+import json
+import math
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Optional
+
+from bfcl.benchmark.workloads import Workload, get_workloads
+from bfcl.constants.eval_config import PROJECT_ROOT
+
+REPORT_FORMAT_VERSION = 1
+# A workload regresses when its throughput drops, or its p99 latency grows, by more than this fraction
+DEFAULT_REGRESSION_THRESHOLD = 0.1
+
+
+def select_workloads(names: list[str]) -> list[Workload]:
+    """The workloads matching the given names; a name can also be a group, such as `ast_parse` or `file_io`."""
+    workloads = get_workloads()
+    if not names or "all" in names:
+        return workloads
+
+    selected = []
+    for name in names:
+        matches = [
+            workload
+            for workload in workloads
+            if workload.name == name or workload.name.startswith(name.rstrip("/") + "/")
+        ]
+        if not matches:
+            raise ValueError(
+                f"Unknown workload '{name}'. Available workloads: {', '.join(workload.name for workload in workloads)}"
+            )
+        selected.extend(match for match in matches if match not in selected)
+    return selected
+
+
+def _get_peak_rss() -> Optional[int]:
+    """The peak resident set size of this process so far, in bytes (None where it is not available)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS, in kilobytes on Linux
+    return peak_rss if sys.platform == "darwin" else peak_rss * 1024
+
+
+def _percentile(sorted_values: list[float], fraction: float) -> float:
+    # Nearest rank
+    return sorted_values[max(0, math.ceil(fraction * len(sorted_values)) - 1)]
+
+
+def run_workload(workload: Workload, rounds: int) -> dict:
+    if workload.measure is not None:
+        durations, wall_time, peak_rss = workload.measure(rounds)
+    else:
+        try:
+            ops = workload.build_ops()
+            # One untimed pass, so that one-time setup (imports, lazily built tables) is not counted
+            if workload.before_round is not None:
+                workload.before_round()
+            for op in ops:
+                op()
+
+            durations = []
+            for _ in range(rounds):
+                if workload.before_round is not None:
+                    workload.before_round()
+                for op in ops:
+                    start_time = time.perf_counter()
+                    op()
+                    durations.append(time.perf_counter() - start_time)
+        finally:
+            if workload.teardown is not None:
+                workload.teardown()
+        wall_time = sum(durations)
+        peak_rss = _get_peak_rss()
+
+    durations.sort()
+    return {
+        "description": workload.description,
+        "op_count": len(durations),
+        "ops_per_sec": len(durations) / wall_time if wall_time else None,
+        "mean_ms": sum(durations) / len(durations) * 1e3 if durations else None,
+        "p50_ms": _percentile(durations, 0.5) * 1e3 if durations else None,
+        "p99_ms": _percentile(durations, 0.99) * 1e3 if durations else None,
+        # The peak of the whole benchmark process so far (or of the processes the workload ran), not of this workload alone
+        "peak_rss_mb": peak_rss / 1024 / 1024 if peak_rss is not None else None,
+    }
+
+
+def _get_git_commit() -> Optional[str]:
+    try:
+        process = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=PROJECT_ROOT,
+            capture_output=True,
+            text=True,
+            timeout=10,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return process.stdout.strip() if process.returncode == 0 else None
+
+
+def run_benchmark(workloads: list[Workload], rounds: int) -> dict:
+    try:
+        bfcl_version = version("bfcl")
+    except PackageNotFoundError:
+        bfcl_version = None
+
+    report = {
+        "format_version": REPORT_FORMAT_VERSION,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "bfcl_version": bfcl_version,
+        "git_commit": _get_git_commit(),
+        "python_version": platform.python_version(),
+        "platform": platform.platform(),
+        "rounds": rounds,
+        "workloads": {},
+    }
+    for workload in workloads:
+        print(f"⏱️  Running workload: {workload.name}")
+        report["workloads"][workload.name] = run_workload(workload, rounds)
+    return report
+
+
+def write_report(report: dict, output_path: Path) -> None:
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "w") as f:
+        json.dump(report, f, indent=4)
+
+
+def load_report(report_path: Path) -> dict:
+    with open(report_path) as f:
+        report = json.load(f)
+    if report.get("format_version") != REPORT_FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported benchmark report format in {report_path}: {report.get('format_version')} (expected {REPORT_FORMAT_VERSION})."
+        )
+    return report
+
+
+def _relative_change(baseline_value, current_value) -> Optional[float]:
+    if baseline_value is None or current_value is None or baseline_value == 0:
+        return None
+    return current_value / baseline_value - 1
+
+
+def compare_reports(
+    baseline: dict, current: dict, threshold: float = DEFAULT_REGRESSION_THRESHOLD
+) -> list[dict]:
+    """
+    Compare the workloads present in both reports. A workload is flagged as a regression when its throughput dropped,
+    or its p99 latency grew, by more than `threshold` (a fraction).
+    """
+    comparisons = []
+    for name, current_result in current["workloads"].items():
+        baseline_result = baseline["workloads"].get(name)
+        if baseline_result is None:
+            continue
+        throughput_change = _relative_change(
+            baseline_result["ops_per_sec"], current_result["ops_per_sec"]
+        )
+        p99_change = _relative_change(baseline_result["p99_ms"], current_result["p99_ms"])
+        is_regression = (throughput_change is not None and throughput_change < -threshold) or (
+            p99_change is not None and p99_change > threshold
+        )
+        comparisons.append(
+            {
+                "workload": name,
+                "baseline_ops_per_sec": baseline_result["ops_per_sec"],
+                "current_ops_per_sec": current_result["ops_per_sec"],
+                "throughput_change": throughput_change,
+                "baseline_p99_ms": baseline_result["p99_ms"],
+                "current_p99_ms": current_result["p99_ms"],
+                "p99_change": p99_change,
+                "is_regression": is_regression,
+            }
+        )
+    return comparisons
@@ -0,0 +1,408 @@
+"""
+The fixed, synthetic workloads of `bfcl bench`. Each one exercises a part of the framework on inputs derived from the
+dataset (or generated deterministically), without any model in the loop, so that its cost can be tracked over time.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, NamedTuple, Optional
+from xml.sax.saxutils import escape, quoteattr
+
+from bfcl.constants.eval_config import POSSIBLE_ANSWER_PATH, PROMPT_PATH
+from bfcl.constants.type_mappings import GORILLA_TO_OPENAPI
+from bfcl.dataset import find_dataset_file, load_dataset_file
+
+# The categories the AST workloads draw their entries from
+AST_CATEGORIES = ["simple", "multiple", "parallel", "parallel_multiple"]
+RESPONSE_FORMATS = [
+    "Python",
+    "JSON",
+    "XML",
+    "PythonTagged",
+    "JSONTagged",
+    "XMLTagged",
+    "Java",
+    "JavaScript",
+]
+MULTI_TURN_CATEGORY = "multi_turn_base"
+MULTI_TURN_ENTRY_COUNT = 50
+FILE_IO_ENTRY_COUNT = 20000
+END_TO_END_MODEL = "gpt-4o-2024-11-20-FC"
+END_TO_END_CATEGORY = "simple"
+END_TO_END_THREADS = 8
+# Any model works for the AST checker; this one does not rename dotted function names
+AST_CHECKER_MODEL = "gpt-4o-2024-11-20"
+
+
+class Workload(NamedTuple):
+    name: str
+    description: str
+    # Builds the operations to time (called once, untimed); each operation is a callable without arguments
+    build_ops: Optional[Callable[[], list[Callable]]] = None
+    # Called before each round, untimed
+    before_round: Optional[Callable[[], None]] = None
+    # Called once the rounds are done (also when one failed), untimed; e.g. to remove the files `build_ops` wrote
+    teardown: Optional[Callable[[], None]] = None
+    # For workloads that cannot be split into in-process operations: `measure(rounds)` runs the whole workload and
+    # returns the duration of each operation, the total wall time (operations may overlap), both in seconds, and the
+    # peak RSS (in bytes, or None) of the processes it ran
+    measure: Optional[Callable[[int], tuple[list[float], float, Optional[int]]]] = None
+
+
+def _load_category(test_category: str) -> tuple[tuple[dict, ...], tuple[dict, ...]]:
+    prompt = load_dataset_file(find_dataset_file(PROMPT_PATH, test_category))
+    possible_answer = load_dataset_file(find_dataset_file(POSSIBLE_ANSWER_PATH, test_category))
+    return prompt, possible_answer
+
+
+def _ground_truth_calls(possible_answer_entry: dict) -> list[tuple[str, dict]]:
+    """The ground truth of an entry as (function name, arguments), with the first accepted value of each parameter."""
+    calls = []
+    for function_call in possible_answer_entry["ground_truth"]:
+        for func_name, params in function_call.items():
+            arguments = {}
+            for param, values in params.items():
+                accepted_values = [value for value in values if value != ""]
+                if accepted_values:
+                    arguments[param] = accepted_values[0]
+            calls.append((func_name, arguments))
+    return calls
+
+
+def _xml_type(value) -> str:
+    if type(value) == bool:
+        return "boolean"
+    if type(value) == int:
+        return "integer"
+    if type(value) == float:
+        return "float"
+    if type(value) == list:
+        return "array"
+    if type(value) == dict:
+        return "dict"
+    return "string"
+
+
+def _xml_text(value) -> str:
+    if type(value) == bool:
+        return "true" if value else "false"
+    if type(value) in [list, dict]:
+        return escape(json.dumps(value))
+    return escape(str(value))
+
+
+def format_response(calls: list[tuple[str, dict]], response_format: str) -> str:
+    """Render function calls the way a model answers in the given response format."""
+    base_format = response_format.removesuffix("Tagged")
+    if base_format == "Python":
+        response = (
+            "["
+            + ", ".join(
+                f"{func_name}({', '.join(f'{param}={value!r}' for param, value in arguments.items())})"
+                for func_name, arguments in calls
+            )
+            + "]"
+        )
+    elif base_format == "JSON":
+        response = json.dumps(
+            [{"function_name": func_name, "parameters": arguments} for func_name, arguments in calls]
+        )
+    elif base_format == "XML":
+        response = "<function_calls>"
+        for func_name, arguments in calls:
+            response += f"<function_call><name>{escape(func_name)}</name><arguments>"
+            for param, value in arguments.items():
+                response += f"<arg name={quoteattr(param)} type={quoteattr(_xml_type(value))}>{_xml_text(value)}</arg>"
+            response += "</arguments></function_call>"
+        response += "</function_calls>"
+    else:
+        raise ValueError(f"Unsupported response format: {response_format}")
+
+    if response_format.endswith("Tagged"):
+        response = f"<tool_call>{response}</tool_call>"
+    return response
+
+
+def _java_and_javascript_responses(language: str) -> list[str]:
+    from bfcl.model_handler.parser.benchmark import LANGUAGE_CONFIG, build_samples
+
+    test_category, _, _, _, sample_values, nested_sample_values, nested_types = LANGUAGE_CONFIG[language]
+    samples = build_samples(test_category, sample_values, nested_sample_values, nested_types)
+    return [f"[{source_code}]" for source_code, _ in samples]
+
+
+def _build_ast_parse_ops(response_format: str) -> list[Callable]:
+    from bfcl.model_handler.utils import ast_parse
+
+    if response_format in ["Java", "JavaScript"]:
+        responses = _java_and_javascript_responses(response_format)
+    else:
+        responses = []
+        for test_category in AST_CATEGORIES:
+            _, possible_answer = _load_category(test_category)
+            responses.extend(
+                format_response(_ground_truth_calls(entry), response_format)
+                for entry in possible_answer
+            )
+    return [lambda response=response: ast_parse(response, response_format) for response in responses]
+
+
+def _all_function_docs() -> list[list[dict]]:
+    function_docs = []
+    for test_category in AST_CATEGORIES:
+        prompt, _ = _load_category(test_category)
+        function_docs.extend(entry["function"] for entry in prompt)
+    return function_docs
+
+
+def _build_convert_to_tool_ops(model_style) -> list[Callable]:
+    from bfcl.model_handler.utils import convert_to_tool
+
+    return [
+        lambda functions=functions: convert_to_tool(functions, GORILLA_TO_OPENAPI, model_style)
+        for functions in _all_function_docs()
+    ]
+
+
+def _build_format_func_doc_ops(doc_fmt: str) -> list[Callable]:
+    from bfcl.model_handler.func_doc_formatters import format_func_doc
+
+    return [
+        lambda functions=functions: format_func_doc(functions, doc_fmt)
+        for functions in _all_function_docs()
+    ]
+
+
+def _clear_compilation_caches() -> None:
+    # Each round compiles every function doc again, as the first entries of a fresh run do
+    from bfcl.model_handler.compilation_cache import FUNC_DOC_CACHE, TOOL_COMPILATION_CACHE
+
+    TOOL_COMPILATION_CACHE.clear()
+    FUNC_DOC_CACHE.clear()
+
+
+def _build_ast_checker_ops(test_category: str) -> list[Callable]:
+    from bfcl.eval_checker.ast_eval.ast_checker import ast_checker
+    from bfcl.eval_checker.ast_eval.possible_answer import compile_possible_answers
+    from bfcl.model_handler.utils import ast_parse
+
+    prompt, possible_answer = _load_category(test_category)
+    possible_answer = compile_possible_answers(possible_answer)
+    ops = []
+    for prompt_entry, possible_answer_entry in zip(
+        sorted(prompt, key=lambda entry: entry["id"]),
+        sorted(possible_answer, key=lambda entry: entry["id"]),
+    ):
+        model_output = ast_parse(format_response(_ground_truth_calls(possible_answer_entry), "Python"))
+        ops.append(
+            lambda prompt_entry=prompt_entry, model_output=model_output, possible_answer_entry=possible_answer_entry: ast_checker(
+                prompt_entry["function"],
+                model_output,
+                possible_answer_entry["ground_truth"],
+                "Python",
+                test_category,
+                AST_CHECKER_MODEL,
+            )
+        )
+    return ops
+
+
+def _build_multi_turn_replay_ops() -> list[Callable]:
+    # The execution itself, not the ground truth execution cache that normally sits in front of it
+    from bfcl.eval_checker.multi_turn_eval.ground_truth_cache import _execute_ground_truth
+
+    prompt, possible_answer = _load_category(MULTI_TURN_CATEGORY)
+    possible_answer_by_id = {entry["id"]: entry for entry in possible_answer}
+    return [
+        lambda test_entry=test_entry: _execute_ground_truth(
+            test_entry, possible_answer_by_id[test_entry["id"]]["ground_truth"], False
+        )
+        for test_entry in prompt[:MULTI_TURN_ENTRY_COUNT]
+    ]
+
+
+def _synthetic_result_entries() -> list[dict]:
+    # Shaped like the entries of a multi-turn result file, the largest ones the framework writes
+    return [
+        {
+            "id": f"multi_turn_base_{index}",
+            "result": [[[f"cd(folder='dir_{index}')", "ls(a=True)"], [f"mv(source='a_{index}.txt', destination='b')"]]],
+            "input_token_count": [[1000 + index, 1200 + index]],
+            "output_token_count": [[20, 30]],
+            "latency": [[0.5, 0.75]],
+            "inference_log": [{"role": "user", "content": f"Move the file a_{index}.txt into the b folder."}],
+        }
+        for index in range(FILE_IO_ENTRY_COUNT)
+    ]
+
+
+# The temporary folders of the file I/O workloads, removed by their teardown
+_TEMP_DIRS: list[tempfile.TemporaryDirectory] = []
+
+
+def _make_temp_dir() -> str:
+    temp_dir = tempfile.TemporaryDirectory(prefix="bfcl_bench_")
+    _TEMP_DIRS.append(temp_dir)
+    return temp_dir.name
+
+
+def _remove_temp_dirs() -> None:
+    while _TEMP_DIRS:
+        _TEMP_DIRS.pop().cleanup()
+
+
+def _build_write_file_ops() -> list[Callable]:
+    from bfcl.utils import write_list_of_dicts_to_file
+
+    entries = _synthetic_result_entries()
+    temp_dir = _make_temp_dir()
+    return [lambda: write_list_of_dicts_to_file("results.json", entries, subdir=temp_dir)]
+
+
+def _build_load_file_ops() -> list[Callable]:
+    from bfcl.utils import load_file, write_list_of_dicts_to_file
+
+    temp_dir = _make_temp_dir()
+    write_list_of_dicts_to_file("results.json", _synthetic_result_entries(), subdir=temp_dir)
+    file_path = os.path.join(temp_dir, "results.json")
+    return [lambda: load_file(file_path, sort_by_id=True)]
+
+
+def _measure_end_to_end_generate(rounds: int) -> tuple[list[float], float, Optional[int]]:
+    """
+    Run `bfcl generate` against the mock model server, in a separate process. The duration of each operation is the
+    latency the handler recorded for an entry, which includes everything between the framework and the server; the
+    wall time includes the startup of the process.
+    """
+    from bfcl.benchmark.mock_model_server import MockModelServer
+
+    try:
+        import resource
+    except ImportError:
+        resource = None
+
+    latencies = []
+    wall_time = 0
+    with MockModelServer() as server:
+        env = {**os.environ, "OPENAI_API_KEY": "mock", "OPENAI_BASE_URL": server.base_url}
+        for _ in range(rounds):
+            with tempfile.TemporaryDirectory(prefix="bfcl_bench_") as result_dir:
+                # The generation entry point is called directly (rather than `bfcl generate`), so that a `.env` file
+                # cannot point the client at a real endpoint
+                start_time = time.perf_counter()
+                subprocess.run(
+                    [
+                        sys.executable,
+                        "-c",
+                        "from bfcl._llm_response_generation import get_args, main; main(get_args())",
+                        "--model",
+                        END_TO_END_MODEL,
+                        "--test-category",
+                        END_TO_END_CATEGORY,
+                        "--num-threads",
+                        str(END_TO_END_THREADS),
+                        "--result-dir",
+                        result_dir,
+                        "--no-cache",
+                    ],
+                    env=env,
+                    check=True,
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                )
+                wall_time += time.perf_counter() - start_time
+                for root, _, files in os.walk(result_dir):
+                    for file_name in files:
+                        if file_name.endswith("_result.json"):
+                            with open(os.path.join(root, file_name)) as f:
+                                latencies.extend(json.loads(line)["latency"] for line in f)
+
+    peak_rss = None
+    if resource is not None:
+        peak_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+        peak_rss *= 1 if sys.platform == "darwin" else 1024
+    return latencies, wall_time, peak_rss
+
+
+def get_workloads() -> list[Workload]:
+    from bfcl.model_handler.model_style import ModelStyle
+    from bfcl.constants.prompt_variations import DOC_FORMATS
+
+    workloads = []
+    for response_format in RESPONSE_FORMATS:
+        workloads.append(
+            Workload(
+                f"ast_parse/{response_format}",
+                f"Decode one {response_format} response to "
+                + ("a test entry of that language" if response_format in ["Java", "JavaScript"] else "an AST entry"),
+                lambda response_format=response_format: _build_ast_parse_ops(response_format),
+            )
+        )
+    for model_style in [
+        ModelStyle.OpenAI,
+        ModelStyle.Anthropic,
+        ModelStyle.Mistral,
+        ModelStyle.Google,
+        ModelStyle.AMAZON,
+        ModelStyle.COHERE,
+        ModelStyle.FIREWORK_AI,
+        ModelStyle.WRITER,
+        ModelStyle.NOVITA_AI,
+        ModelStyle.OSSMODEL,
+    ]:  # The model styles that `convert_to_tool` compiles tools for
+        workloads.append(
+            Workload(
+                f"convert_to_tool/{model_style.name}",
+                f"Compile the function docs of one AST entry into {model_style.name} tools, from an empty cache",
+                lambda model_style=model_style: _build_convert_to_tool_ops(model_style),
+                before_round=_clear_compilation_caches,
+            )
+        )
+    for doc_fmt in DOC_FORMATS:
+        workloads.append(
+            Workload(
+                f"format_func_doc/{doc_fmt}",
+                f"Render the function docs of one AST entry as {doc_fmt}, from an empty cache",
+                lambda doc_fmt=doc_fmt: _build_format_func_doc_ops(doc_fmt),
+                before_round=_clear_compilation_caches,
+            )
+        )
+    for test_category in AST_CATEGORIES:
+        workloads.append(
+            Workload(
+                f"ast_checker/{test_category}",
+                f"Check the ground truth of one {test_category} entry with the AST checker",
+                lambda test_category=test_category: _build_ast_checker_ops(test_category),
+            )
+        )
+    workloads.extend(
+        [
+            Workload(
+                "multi_turn_replay",
+                f"Execute the ground truth trajectory of one of the first {MULTI_TURN_ENTRY_COUNT} {MULTI_TURN_CATEGORY} entries",
+                _build_multi_turn_replay_ops,
+            ),
+            Workload(
+                "file_io/write_list_of_dicts_to_file",
+                f"Write a result file of {FILE_IO_ENTRY_COUNT} multi-turn entries",
+                _build_write_file_ops,
+                teardown=_remove_temp_dirs,
+            ),
+            Workload(
+                "file_io/load_file",
+                f"Load and sort a result file of {FILE_IO_ENTRY_COUNT} multi-turn entries",
+                _build_load_file_ops,
+                teardown=_remove_temp_dirs,
+            ),
+            Workload(
+                "e2e/generate",
+                f"Generate one {END_TO_END_CATEGORY} entry with {END_TO_END_MODEL} against a local mock model ({END_TO_END_THREADS} threads)",
+                measure=_measure_end_to_end_generate,
+            ),
+        ]
+    )
+    return workloads
@@ -14,6 +14,14 @@ SCORE_PATH = "./score/"
 DOTENV_PATH = "./.env"
 UTILS_PATH = "./utils/"
 TEST_IDS_TO_GENERATE_PATH = "./test_case_ids_to_generate.json"
+RESPONSE_CACHE_PATH = "./.cache/response_cache/"
+COMPILED_DATASET_PATH = "./.cache/compiled_dataset/"
+OSS_SERVER_LOCK_PATH = "./.cache/oss_servers/"
+GROUND_TRUTH_EXECUTION_CACHE_PATH = "./.cache/ground_truth_execution/"
+BENCHMARK_REPORT_PATH = "./.cache/benchmark/"
+SCORE_CACHE_PATH = "./.cache/score_cache/"
+SCORE_STORE_PATH = "./.cache/score_store/"
+RUN_JOURNAL_PATH = "./.cache/run_journal/"
 
 
 
@@ -32,6 +40,14 @@ SCORE_PATH = (PROJECT_ROOT / SCORE_PATH).resolve()
 DOTENV_PATH = (PROJECT_ROOT / DOTENV_PATH).resolve()
 UTILS_PATH = (PROJECT_ROOT / UTILS_PATH).resolve()
 TEST_IDS_TO_GENERATE_PATH = (PROJECT_ROOT / TEST_IDS_TO_GENERATE_PATH).resolve()
+RESPONSE_CACHE_PATH = (PROJECT_ROOT / RESPONSE_CACHE_PATH).resolve()
+COMPILED_DATASET_PATH = (PROJECT_ROOT / COMPILED_DATASET_PATH).resolve()
+OSS_SERVER_LOCK_PATH = (PROJECT_ROOT / OSS_SERVER_LOCK_PATH).resolve()
+GROUND_TRUTH_EXECUTION_CACHE_PATH = (PROJECT_ROOT / GROUND_TRUTH_EXECUTION_CACHE_PATH).resolve()
+BENCHMARK_REPORT_PATH = (PROJECT_ROOT / BENCHMARK_REPORT_PATH).resolve()
+SCORE_CACHE_PATH = (PROJECT_ROOT / SCORE_CACHE_PATH).resolve()
+SCORE_STORE_PATH = (PROJECT_ROOT / SCORE_STORE_PATH).resolve()
+RUN_JOURNAL_PATH = (PROJECT_ROOT / RUN_JOURNAL_PATH).resolve()
 
 RESULT_PATH.mkdir(parents=True, exist_ok=True)
 SCORE_PATH.mkdir(parents=True, exist_ok=True)
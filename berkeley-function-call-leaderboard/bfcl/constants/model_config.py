@@ -1,49 +1,17 @@
+import importlib
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Optional
 
-from bfcl.model_handler.api_inference.claude import ClaudeHandler
-from bfcl.model_handler.api_inference.cohere import CohereHandler
-from bfcl.model_handler.api_inference.databricks import DatabricksHandler
-from bfcl.model_handler.api_inference.deepseek import DeepSeekAPIHandler
-from bfcl.model_handler.api_inference.fireworks import FireworksHandler
-from bfcl.model_handler.api_inference.functionary import FunctionaryHandler
-from bfcl.model_handler.api_inference.gemini import GeminiHandler
-from bfcl.model_handler.api_inference.gogoagent import GoGoAgentHandler
-from bfcl.model_handler.api_inference.gorilla import GorillaHandler
-from bfcl.model_handler.api_inference.grok import GrokHandler
-from bfcl.model_handler.api_inference.mining import MiningHandler
-from bfcl.model_handler.api_inference.mistral import MistralHandler
-from bfcl.model_handler.api_inference.nexus import NexusHandler
-from bfcl.model_handler.api_inference.nova import NovaHandler
-from bfcl.model_handler.api_inference.novita import NovitaHandler
-from bfcl.model_handler.api_inference.nvidia import NvidiaHandler
-from bfcl.model_handler.api_inference.openai import OpenAIHandler
-from bfcl.model_handler.api_inference.writer import WriterHandler
-from bfcl.model_handler.api_inference.yi import YiHandler
-from bfcl.model_handler.local_inference.bielik import BielikHandler
-from bfcl.model_handler.local_inference.deepseek import DeepseekHandler
-from bfcl.model_handler.local_inference.deepseek_coder import DeepseekCoderHandler
-from bfcl.model_handler.local_inference.deepseek_reasoning import DeepseekReasoningHandler
-from bfcl.model_handler.local_inference.falcon_fc import Falcon3FCHandler
-from bfcl.model_handler.local_inference.gemma import GemmaHandler
-from bfcl.model_handler.local_inference.glaive import GlaiveHandler
-from bfcl.model_handler.local_inference.glm import GLMHandler
-from bfcl.model_handler.local_inference.granite import GraniteHandler
-from bfcl.model_handler.local_inference.hammer import HammerHandler
-from bfcl.model_handler.local_inference.hermes import HermesHandler
-from bfcl.model_handler.local_inference.llama import LlamaHandler
-from bfcl.model_handler.local_inference.llama_3_1 import LlamaHandler_3_1
-from bfcl.model_handler.local_inference.minicpm import MiniCPMHandler
-from bfcl.model_handler.local_inference.minicpm_fc import MiniCPMFCHandler
-from bfcl.model_handler.local_inference.mistral_fc import MistralFCHandler
-from bfcl.model_handler.local_inference.phi import PhiHandler
-from bfcl.model_handler.local_inference.phi_fc import PhiFCHandler
-from bfcl.model_handler.local_inference.quick_testing_oss import QuickTestingOSSHandler
-from bfcl.model_handler.local_inference.qwen import QwenHandler
-from bfcl.model_handler.local_inference.qwen_fc import QwenFCHandler
-from bfcl.model_handler.local_inference.salesforce_llama import SalesforceLlamaHandler
-from bfcl.model_handler.local_inference.salesforce_qwen import SalesforceQwenHandler
-from bfcl.model_handler.local_inference.think_agent import ThinkAgentHandler
+
+@lru_cache(maxsize=None)
+def _import_handler(handler_reference: str):
+    """
+    Import the handler class referenced as "module:Class".
+    The handler modules import heavy SDKs (openai, anthropic, transformers, ...), so we only do this on first use.
+    """
+    module_name, class_name = handler_reference.split(":")
+    return getattr(importlib.import_module(module_name), class_name)
 
 
 # -----------------------------------------------------------------------------
@@ -65,7 +33,7 @@ class ModelConfig:
         url (str): Reference URL for the model or hosting service.
         org (str): Organization providing the model.
         license (str): License under which the model is released.
-        model_handler (str): Handler name for invoking the model.
+        model_handler (str): Reference to the handler class for invoking the model, in the form "module:Class". Imported on first use, see `get_model_handler`.
         input_price (Optional[float]): USD per million input tokens (None for open source models).
         output_price (Optional[float]): USD per million output tokens (None for open source models).
         is_fc_model (bool): True if this model is used in Function-Calling mode, otherwise False for Prompt-based mode.
@@ -91,6 +59,10 @@ class ModelConfig:
     # True if this model does not allow '.' in function names
     underscore_to_dot: bool = False
 
+    def get_model_handler(self):
+        """Return the handler class, importing its module if needed."""
+        return _import_handler(self.model_handler)
+
 
 # Inference through API calls
 api_inference_model_map = {
@@ -100,7 +72,7 @@ api_inference_model_map = {
         url="https://gorilla.cs.berkeley.edu/blogs/7_open_functions_v2.html",
         org="Gorilla LLM",
         license="Apache 2.0",
-        model_handler=GorillaHandler,
+        model_handler="bfcl.model_handler.api_inference.gorilla:GorillaHandler",
         input_price=None,
         output_price=None,
         is_fc_model=False,
@@ -112,7 +84,7 @@ api_inference_model_map = {
         url="https://api-docs.deepseek.com/news/news1226",
         org="DeepSeek",
         license="MIT",
-        model_handler=DeepSeekAPIHandler,
+        model_handler="bfcl.model_handler.api_inference.deepseek:DeepSeekAPIHandler",
         input_price=None,
         output_price=None,
         is_fc_model=False,
@@ -124,7 +96,7 @@ api_inference_model_map = {
         url="https://api-docs.deepseek.com/news/news1226",
         org="DeepSeek",
         license="DeepSeek License",
-        model_handler=DeepSeekAPIHandler,
+        model_handler="bfcl.model_handler.api_inference.deepseek:DeepSeekAPIHandler",
         input_price=None,
         output_price=None,
         is_fc_model=True,
@@ -136,7 +108,7 @@ api_inference_model_map = {
         url="https://openai.com/index/gpt-5/",
         org="OpenAI",
         license="Proprietary",
-        model_handler=OpenAIHandler,
+        model_handler="bfcl.model_handler.api_inference.openai:OpenAIHandler",
         input_price=3,
         output_price=12,
         is_fc_model=False,
@@ -148,7 +120,7 @@ api_inference_model_map = {
         url="https://openai.com/index/gpt-5/",
         org="OpenAI",
         license="Proprietary",
-        model_handler=OpenAIHandler,
+        model_handler="bfcl.model_handler.api_inference.openai:OpenAIHandler",
         input_price=0.5,
         output_price=2,
         is_fc_model=False,
@@ -160,7 +132,7 @@ api_inference_model_map = {
         url="https://openai.com/index/gpt-5/",
         org="OpenAI",
         license="Proprietary",
-        model_handler=OpenAIHandler,
+        model_handler="bfcl.model_handler.api_inference.openai:OpenAIHandler",
         input_price=0.1,
         output_price=0.4,
         is_fc_model=False,
@@ -172,7 +144,7 @@ api_inference_model_map = {
         url="https://openai.com/index/introducing-gpt-4-5/",
         org="OpenAI",
         license="Proprietary",
-        model_handler=OpenAIHandler,
+        model_handler="bfcl.model_handler.api_inference.openai:OpenAIHandler",
         input_price=75,
         output_price=150,
         is_fc_model=False,
@@ -184,7 +156,7 @@ api_inference_model_map = {
         url="https://openai.com/index/introducing-gpt-4-5/",
         org="OpenAI",
         license="Proprietary",
-        model_handler=OpenAIHandler,
+        model_handler="bfcl.model_handler.api_inference.openai:OpenAIHandler",
         input_price=75,
         output_price=150,
         is_fc_model=True,
@@ -196,7 +168,7 @@ api_inference_model_map = {
         url="https://openai.com/index/gpt-4-1/",
         org="OpenAI",
         license="Proprietary",
-        model_handler=OpenAIHandler,
+        model_handler="bfcl.model_handler.api_inference.openai:OpenAIHandler",
         input_price=2,
         output_price=8,
         is_fc_model=True,
@@ -208,7 +180,7 @@ api_inference_model_map = {
         url="https://openai.com/index/gpt-4-1/",
         org="OpenAI",
         license="Proprietary",
-        model_handler=OpenAIHandler,
+        model_handler="bfcl.model_handler.api_inference.openai:OpenAIHandler",
         input_price=2,
         output_price=8,
         is_fc_model=False,
@@ -220,7 +192,7 @@ api_inference_model_map = {
         url="https://openai.com/index/gpt-4-1/",
         org="OpenAI",
         license="Proprietary",
-        model_handler=OpenAIHandler,
+        model_handler="bfcl.model_handler.api_inference.openai:OpenAIHandler",
         input_price=0.4,
         output_price=1.6,
         is_fc_model=True,
@@ -232,7 +204,7 @@ api_inference_model_map = {
         url="https://openai.com/index/gpt-4-1/",
         org="OpenAI",
         license="Proprietary",
-        model_handler=OpenAIHandler,
+        model_handler="bfcl.model_handler.api_inference.openai:OpenAIHandler",
         input_price=0.4,
         output_price=1.6,
         is_fc_model=False,
@@ -244,7 +216,7 @@ api_inference_model_map = {
         url="https://openai.com/index/gpt-4-1/",
         org="OpenAI",
         license="Proprietary",
-        model_handler=OpenAIHandler,
+        model_handler="bfcl.model_handler.api_inference.openai:OpenAIHandler",
         input_price=0.1,
         output_price=0.4,
         is_fc_model=True,
@@ -256,7 +228,7 @@ api_inference_model_map = {
         url="https://openai.com/index/gpt-4-1/",
         org="OpenAI",
         license="Proprietary",
-        model_handler=OpenAIHandler,
+        model_handler="bfcl.model_handler.api_inference.openai:OpenAIHandler",
         input_price=0.1,
         output_price=0.4,
         is_fc_model=False,
@@ -268,7 +240,7 @@ api_inference_model_map = {
         url="https://openai.com/o1/",
         org="OpenAI",
         license="Proprietary",
-        model_handler=OpenAIHandler,
+        model_handler="bfcl.model_handler.api_inference.openai:OpenAIHandler",
         input_price=15,
         output_price=60,
         is_fc_model=True,
@@ -280,7 +252,7 @@ api_inference_model_map = {
         url="https://openai.com/o1/",
         org="OpenAI",
         license="Proprietary",
-        model_handler=OpenAIHandler,
+        model_handler="bfcl.model_handler.api_inference.openai:OpenAIHandler",
         input_price=15,
         output_price=60,
         is_fc_model=False,
@@ -292,7 +264,7 @@ api_inference_model_map = {
         url="https://openai.com/index/openai-o3-mini/",
         org="OpenAI",
         license="Proprietary",
-        model_handler=OpenAIHandler,
+        model_handler="bfcl.model_handler.api_inference.openai:OpenAIHandler",
         input_price=1.1,
         output_price=4,
         is_fc_model=True,
@@ -304,7 +276,7 @@ api_inference_model_map = {
         url="https://openai.com/index/openai-o3-mini/",
         org="OpenAI",
         license="Proprietary",
-        model_handler=OpenAIHandler,
+        model_handler="bfcl.model_handler.api_inference.openai:OpenAIHandler",
         input_price=1.1,
         output_price=4,
         is_fc_model=False,
@@ -316,7 +288,7 @@ api_inference_model_map = {
         url="https://openai.com/index/hello-gpt-4o/",
         org="OpenAI",
         license="Proprietary",
-        model_handler=OpenAIHandler,
+        model_handler="bfcl.model_handler.api_inference.openai:OpenAIHandler",
         input_price=2.5,
         output_price=10,
         is_fc_model=False,
@@ -328,7 +300,7 @@ api_inference_model_map = {
         url="https://openai.com/index/hello-gpt-4o/",
         org="OpenAI",
         license="Proprietary",
-        model_handler=OpenAIHandler,
+        model_handler="bfcl.model_handler.api_inference.openai:OpenAIHandler",
         input_price=2.5,
         output_price=10,
         is_fc_model=True,
@@ -340,7 +312,7 @@ api_inference_model_map = {
         url="https://openai.com/index/gpt-4o-mini-advancing-cost-efficient-intelligence/",
         org="OpenAI",
         license="Proprietary",
-        model_handler=OpenAIHandler,
+        model_handler="bfcl.model_handler.api_inference.openai:OpenAIHandler",
         input_price=0.15,
         output_price=0.6,
         is_fc_model=False,
@@ -352,7 +324,7 @@ api_inference_model_map = {
         url="https://openai.com/index/gpt-4o-mini-advancing-cost-efficient-intelligence/",
         org="OpenAI",
         license="Proprietary",
-        model_handler=OpenAIHandler,
+        model_handler="bfcl.model_handler.api_inference.openai:OpenAIHandler",
         input_price=0.15,
         output_price=0.6,
         is_fc_model=True,
@@ -364,7 +336,7 @@ api_inference_model_map = {
         url="https://www.anthropic.com/news/claude-3-family",
         org="Anthropic",
         license="Proprietary",
-        model_handler=ClaudeHandler,
+        model_handler="bfcl.model_handler.api_inference.claude:ClaudeHandler",
         input_price=15,
         output_price=75,
         is_fc_model=False,
@@ -376,7 +348,7 @@ api_inference_model_map = {
         url="https://www.anthropic.com/news/claude-3-family",
         org="Anthropic",
         license="Proprietary",
-        model_handler=ClaudeHandler,
+        model_handler="bfcl.model_handler.api_inference.claude:ClaudeHandler",
         input_price=15,
         output_price=75,
         is_fc_model=True,
@@ -388,7 +360,7 @@ api_inference_model_map = {
         url="https://www.anthropic.com/news/claude-3-7-sonnet",
         org="Anthropic",
         license="Proprietary",
-        model_handler=ClaudeHandler,
+        model_handler="bfcl.model_handler.api_inference.claude:ClaudeHandler",
         input_price=3,
         output_price=15,
         is_fc_model=False,
@@ -400,7 +372,7 @@ api_inference_model_map = {
         url="https://www.anthropic.com/news/claude-3-7-sonnet",
         org="Anthropic",
         license="Proprietary",
-        model_handler=ClaudeHandler,
+        model_handler="bfcl.model_handler.api_inference.claude:ClaudeHandler",
         input_price=3,
         output_price=15,
         is_fc_model=True,
@@ -412,7 +384,7 @@ api_inference_model_map = {
         url="https://www.anthropic.com/news/3-5-models-and-computer-use",
         org="Anthropic",
         license="Proprietary",
-        model_handler=ClaudeHandler,
+        model_handler="bfcl.model_handler.api_inference.claude:ClaudeHandler",
         input_price=3,
         output_price=15,
         is_fc_model=False,
@@ -424,7 +396,7 @@ api_inference_model_map = {
         url="https://www.anthropic.com/news/3-5-models-and-computer-use",
         org="Anthropic",
         license="Proprietary",
-        model_handler=ClaudeHandler,
+        model_handler="bfcl.model_handler.api_inference.claude:ClaudeHandler",
         input_price=3,
         output_price=15,
         is_fc_model=True,
@@ -436,7 +408,7 @@ api_inference_model_map = {
         url="https://www.anthropic.com/news/3-5-models-and-computer-use",
         org="Anthropic",
         license="Proprietary",
-        model_handler=ClaudeHandler,
+        model_handler="bfcl.model_handler.api_inference.claude:ClaudeHandler",
         input_price=1,
         output_price=5,
         is_fc_model=False,
@@ -448,7 +420,7 @@ api_inference_model_map = {
         url="https://www.anthropic.com/news/3-5-models-and-computer-use",
         org="Anthropic",
         license="Proprietary",
-        model_handler=ClaudeHandler,
+        model_handler="bfcl.model_handler.api_inference.claude:ClaudeHandler",
         input_price=1,
         output_price=5,
         is_fc_model=True,
@@ -460,7 +432,7 @@ api_inference_model_map = {
         url="https://aws.amazon.com/cn/ai/generative-ai/nova/",
         org="Amazon",
         license="Proprietary",
-        model_handler=NovaHandler,
+        model_handler="bfcl.model_handler.api_inference.nova:NovaHandler",
         input_price=0.8,
         output_price=3.2,
         is_fc_model=False,
@@ -472,7 +444,7 @@ api_inference_model_map = {
         url="https://aws.amazon.com/cn/ai/generative-ai/nova/",
         org="Amazon",
         license="Proprietary",
-        model_handler=NovaHandler,
+        model_handler="bfcl.model_handler.api_inference.nova:NovaHandler",
         input_price=0.06,
         output_price=0.24,
         is_fc_model=False,
@@ -484,7 +456,7 @@ api_inference_model_map = {
         url="https://aws.amazon.com/cn/ai/generative-ai/nova/",
         org="Amazon",
         license="Proprietary",
-        model_handler=NovaHandler,
+        model_handler="bfcl.model_handler.api_inference.nova:NovaHandler",
         input_price=0.035,
         output_price=0.14,
         is_fc_model=False,
@@ -496,7 +468,7 @@ api_inference_model_map = {
         url="https://mistral.ai/news/mistral-nemo/",
         org="Mistral AI",
         license="Proprietary",
-        model_handler=MistralHandler,
+        model_handler="bfcl.model_handler.api_inference.mistral:MistralHandler",
         input_price=0.3,
         output_price=0.3,
         is_fc_model=False,
@@ -508,7 +480,7 @@ api_inference_model_map = {
         url="https://mistral.ai/news/mistral-nemo/",
         org="Mistral AI",
         license="Proprietary",
-        model_handler=MistralHandler,
+        model_handler="bfcl.model_handler.api_inference.mistral:MistralHandler",
         input_price=0.3,
         output_price=0.3,
         is_fc_model=True,
@@ -520,7 +492,7 @@ api_inference_model_map = {
         url="https://docs.mistral.ai/guides/model-selection/",
         org="Mistral AI",
         license="Proprietary",
-        model_handler=MistralHandler,
+        model_handler="bfcl.model_handler.api_inference.mistral:MistralHandler",
         input_price=3,
         output_price=9,
         is_fc_model=False,
@@ -532,7 +504,7 @@ api_inference_model_map = {
         url="https://docs.mistral.ai/guides/model-selection/",
         org="Mistral AI",
         license="Proprietary",
-        model_handler=MistralHandler,
+        model_handler="bfcl.model_handler.api_inference.mistral:MistralHandler",
         input_price=3,
         output_price=9,
         is_fc_model=True,
@@ -544,7 +516,7 @@ api_inference_model_map = {
         url="https://docs.mistral.ai/guides/model-selection/",
         org="Mistral AI",
         license="Proprietary",
-        model_handler=MistralHandler,
+        model_handler="bfcl.model_handler.api_inference.mistral:MistralHandler",
         input_price=1,
         output_price=3,
         is_fc_model=False,
@@ -556,7 +528,7 @@ api_inference_model_map = {
         url="https://docs.mistral.ai/guides/model-selection/",
         org="Mistral AI",
         license="Proprietary",
-        model_handler=MistralHandler,
+        model_handler="bfcl.model_handler.api_inference.mistral:MistralHandler",
         input_price=1,
         output_price=3,
         is_fc_model=True,
@@ -568,7 +540,7 @@ api_inference_model_map = {
         url="https://huggingface.co/fireworks-ai/firefunction-v2",
         org="Fireworks",
         license="Apache 2.0",
-        model_handler=FireworksHandler,
+        model_handler="bfcl.model_handler.api_inference.fireworks:FireworksHandler",
         input_price=None,
         output_price=None,
         is_fc_model=True,
@@ -580,7 +552,7 @@ api_inference_model_map = {
         url="https://huggingface.co/Nexusflow/NexusRaven-V2-13B",
         org="Nexusflow",
         license="Apache 2.0",
-        model_handler=NexusHandler,
+        model_handler="bfcl.model_handler.api_inference.nexus:NexusHandler",
         input_price=None,
         output_price=None,
         is_fc_model=False,
@@ -592,7 +564,7 @@ api_inference_model_map = {
         url="https://deepmind.google/technologies/gemini/flash-lite/",
         org="Google",
         license="Proprietary",
-        model_handler=GeminiHandler,
+        model_handler="bfcl.model_handler.api_inference.gemini:GeminiHandler",
         input_price=0.075,
         output_price=0.3,
         is_fc_model=True,
@@ -604,7 +576,7 @@ api_inference_model_map = {
         url="https://deepmind.google/technologies/gemini/flash-lite/",
         org="Google",
         license="Proprietary",
-        model_handler=GeminiHandler,
+        model_handler="bfcl.model_handler.api_inference.gemini:GeminiHandler",
         input_price=0.075,
         output_price=0.3,
         is_fc_model=False,
@@ -616,7 +588,7 @@ api_inference_model_map = {
         url="https://deepmind.google/technologies/gemini/flash/",
         org="Google",
         license="Proprietary",
-        model_handler=GeminiHandler,
+        model_handler="bfcl.model_handler.api_inference.gemini:GeminiHandler",
         input_price=0.15,
         output_price=0.6,
         is_fc_model=True,
@@ -628,7 +600,7 @@ api_inference_model_map = {
         url="https://deepmind.google/technologies/gemini/flash/",
         org="Google",
         license="Proprietary",
-        model_handler=GeminiHandler,
+        model_handler="bfcl.model_handler.api_inference.gemini:GeminiHandler",
         input_price=0.15,
         output_price=0.6,
         is_fc_model=False,
@@ -640,7 +612,7 @@ api_inference_model_map = {
         url="https://deepmind.google/technologies/gemini/pro/",
         org="Google",
         license="Proprietary",
-        model_handler=GeminiHandler,
+        model_handler="bfcl.model_handler.api_inference.gemini:GeminiHandler",
         input_price=0,
         output_price=0,
         is_fc_model=True,
@@ -652,7 +624,7 @@ api_inference_model_map = {
         url="https://deepmind.google/technologies/gemini/pro/",
         org="Google",
         license="Proprietary",
-        model_handler=GeminiHandler,
+        model_handler="bfcl.model_handler.api_inference.gemini:GeminiHandler",
         input_price=0,
         output_price=0,
         is_fc_model=False,
@@ -664,7 +636,7 @@ api_inference_model_map = {
         url="https://deepmind.google/technologies/gemini/flash-thinking/",
         org="Google",
         license="Proprietary",
-        model_handler=GeminiHandler,
+        model_handler="bfcl.model_handler.api_inference.gemini:GeminiHandler",
         input_price=0,
         output_price=0,
         is_fc_model=False,
@@ -676,7 +648,7 @@ api_inference_model_map = {
         url="https://huggingface.co/meetkai/functionary-small-v3.1",
         org="MeetKai",
         license="MIT",
-        model_handler=FunctionaryHandler,
+        model_handler="bfcl.model_handler.api_inference.functionary:FunctionaryHandler",
         input_price=None,
         output_price=None,
         is_fc_model=True,
@@ -688,7 +660,7 @@ api_inference_model_map = {
         url="https://huggingface.co/meetkai/functionary-medium-v3.1",
         org="MeetKai",
         license="MIT",
-        model_handler=FunctionaryHandler,
+        model_handler="bfcl.model_handler.api_inference.functionary:FunctionaryHandler",
         input_price=None,
         output_price=None,
         is_fc_model=True,
@@ -700,7 +672,7 @@ api_inference_model_map = {
         url="https://www.databricks.com/blog/introducing-dbrx-new-state-art-open-llm",
         org="Databricks",
         license="Databricks Open Model",
-        model_handler=DatabricksHandler,
+        model_handler="bfcl.model_handler.api_inference.databricks:DatabricksHandler",
         input_price=2.25,
         output_price=6.75,
         is_fc_model=False,
@@ -712,7 +684,7 @@ api_inference_model_map = {
         url="https://txt.cohere.com/command-r-plus-microsoft-azure",
         org="Cohere For AI",
         license="cc-by-nc-4.0",
-        model_handler=CohereHandler,
+        model_handler="bfcl.model_handler.api_inference.cohere:CohereHandler",
         input_price=3,
         output_price=15,
         is_fc_model=True,
@@ -724,7 +696,7 @@ api_inference_model_map = {
         url="https://cohere.com/blog/command-r7b",
         org="Cohere",
         license="cc-by-nc-4.0",
-        model_handler=CohereHandler,
+        model_handler="bfcl.model_handler.api_inference.cohere:CohereHandler",
         input_price=0.0375,
         output_price=0.15,
         is_fc_model=True,
@@ -736,7 +708,7 @@ api_inference_model_map = {
         url="https://cohere.com/blog/command-a",
         org="Cohere",
         license="CC-BY-NC 4.0 License (w/ Acceptable Use Addendum)",
-        model_handler=CohereHandler,
+        model_handler="bfcl.model_handler.api_inference.cohere:CohereHandler",
         input_price=2.5,
         output_price=10,
         is_fc_model=True,
@@ -748,7 +720,7 @@ api_inference_model_map = {
         url="https://huggingface.co/Snowflake/snowflake-arctic-instruct",
         org="Snowflake",
         license="apache-2.0",
-        model_handler=NvidiaHandler,
+        model_handler="bfcl.model_handler.api_inference.nvidia:NvidiaHandler",
         input_price=None,
         output_price=None,
         is_fc_model=False,
@@ -760,7 +732,7 @@ api_inference_model_map = {
         url="https://huggingface.co/nvidia/nemotron-4-340b-instruct",
         org="NVIDIA",
         license="nvidia-open-model-license",
-        model_handler=NvidiaHandler,
+        model_handler="bfcl.model_handler.api_inference.nvidia:NvidiaHandler",
         input_price=None,
         output_price=None,
         is_fc_model=False,
@@ -772,7 +744,7 @@ api_inference_model_map = {
         url="https://gogoagent.ai",
         org="BitAgent",
         license="Proprietary",
-        model_handler=GoGoAgentHandler,
+        model_handler="bfcl.model_handler.api_inference.gogoagent:GoGoAgentHandler",
         input_price=None,
         output_price=None,
         is_fc_model=False,
@@ -784,7 +756,7 @@ api_inference_model_map = {
         url="https://writer.com/engineering/actions-with-palmyra-x-004/",
         org="Writer",
         license="Proprietary",
-        model_handler=WriterHandler,
+        model_handler="bfcl.model_handler.api_inference.writer:WriterHandler",
         input_price=5,
         output_price=12,
         is_fc_model=False,
@@ -796,7 +768,7 @@ api_inference_model_map = {
         url="https://docs.x.ai/docs/models",
         org="xAI",
         license="Proprietary",
-        model_handler=GrokHandler,
+        model_handler="bfcl.model_handler.api_inference.grok:GrokHandler",
         input_price=3,
         output_price=15,
         is_fc_model=True,
@@ -808,7 +780,7 @@ api_inference_model_map = {
         url="https://docs.x.ai/docs/models",
         org="xAI",
         license="Proprietary",
-        model_handler=GrokHandler,
+        model_handler="bfcl.model_handler.api_inference.grok:GrokHandler",
         input_price=3,
         output_price=15,
         is_fc_model=False,
@@ -820,7 +792,7 @@ api_inference_model_map = {
         url="https://docs.x.ai/docs/models",
         org="xAI",
         license="Proprietary",
-        model_handler=GrokHandler,
+        model_handler="bfcl.model_handler.api_inference.grok:GrokHandler",
         input_price=0.3,
         output_price=0.5,
         is_fc_model=True,
@@ -832,7 +804,7 @@ api_inference_model_map = {
         url="https://docs.x.ai/docs/models",
         org="xAI",
         license="Proprietary",
-        model_handler=GrokHandler,
+        model_handler="bfcl.model_handler.api_inference.grok:GrokHandler",
         input_price=0.3,
         output_price=0.5,
         is_fc_model=False,
@@ -844,7 +816,7 @@ api_inference_model_map = {
         url="https://www.mininglamp.com/",
         org="Mininglamp",
         license="Proprietary",
-        model_handler=MiningHandler,
+        model_handler="bfcl.model_handler.api_inference.mining:MiningHandler",
         input_price=None,
         output_price=None,
         is_fc_model=False,
@@ -861,7 +833,7 @@ local_inference_model_map = {
         url="https://huggingface.co/deepseek-ai/DeepSeek-R1",
         org="DeepSeek",
         license="MIT",
-        model_handler=DeepseekReasoningHandler,
+        model_handler="bfcl.model_handler.local_inference.deepseek_reasoning:DeepseekReasoningHandler",
         input_price=None,
         output_price=None,
         is_fc_model=False,
@@ -873,7 +845,7 @@ local_inference_model_map = {
         url="https://blog.google/technology/developers/gemma-3/",
         org="Google",
         license="gemma-terms-of-use",
-        model_handler=GemmaHandler,
+        model_handler="bfcl.model_handler.local_inference.gemma:GemmaHandler",
         input_price=None,
         output_price=None,
         is_fc_model=False,
@@ -885,7 +857,7 @@ local_inference_model_map = {
         url="https://blog.google/technology/developers/gemma-3/",
         org="Google",
         license="gemma-terms-of-use",
-        model_handler=GemmaHandler,
+        model_handler="bfcl.model_handler.local_inference.gemma:GemmaHandler",
         input_price=None,
         output_price=None,
         is_fc_model=False,
@@ -897,7 +869,7 @@ local_inference_model_map = {
         url="https://blog.google/technology/developers/gemma-3/",
         org="Google",
         license="gemma-terms-of-use",
-        model_handler=GemmaHandler,
+        model_handler="bfcl.model_handler.local_inference.gemma:GemmaHandler",
         input_price=None,
         output_price=None,
         is_fc_model=False,
@@ -909,7 +881,7 @@ local_inference_model_map = {
         url="https://blog.google/technology/developers/gemma-3/",
         org="Google",
         license="gemma-terms-of-use",
-        model_handler=GemmaHandler,
+        model_handler="bfcl.model_handler.local_inference.gemma:GemmaHandler",
         input_price=None,
         output_price=None,
         is_fc_model=False,
@@ -921,7 +893,7 @@ local_inference_model_map = {
         url="https://llama.meta.com/llama3",
         org="Meta",
         license="Meta Llama 3 Community",
-        model_handler=LlamaHandler_3_1,
+        model_handler="bfcl.model_handler.local_inference.llama_3_1:LlamaHandler_3_1",
         input_price=None,
         output_price=None,
         is_fc_model=True,
@@ -933,7 +905,7 @@ local_inference_model_map = {
         url="https://llama.meta.com/llama3",
         org="Meta",
         license="Meta Llama 3 Community",
-        model_handler=LlamaHandler,
+        model_handler="bfcl.model_handler.local_inference.llama:LlamaHandler",
         input_price=None,
         output_price=None,
         is_fc_model=False,
@@ -945,7 +917,7 @@ local_inference_model_map = {
         url="https://llama.meta.com/llama3",
         org="Meta",
         license="Meta Llama 3 Community",
-        model_handler=LlamaHandler_3_1,
+        model_handler="bfcl.model_handler.local_inference.llama_3_1:LlamaHandler_3_1",
         input_price=None,
         output_price=None,
         is_fc_model=True,
@@ -957,7 +929,7 @@ local_inference_model_map = {
         url="https://llama.meta.com/llama3",
         org="Meta",
         license="Meta Llama 3 Community",
-        model_handler=LlamaHandler,
+        model_handler="bfcl.model_handler.local_inference.llama:LlamaHandler",
         input_price=None,
         output_price=None,
         is_fc_model=False,
@@ -969,7 +941,7 @@ local_inference_model_map = {
         url="https://llama.meta.com/llama3",
         org="Meta",
         license="Meta Llama 3 Community",
-        model_handler=LlamaHandler,
+        model_handler="bfcl.model_handler.local_inference.llama:LlamaHandler",
         input_price=None,
         output_price=None,
         is_fc_model=True,
@@ -981,7 +953,7 @@ local_inference_model_map = {
         url="https://llama.meta.com/llama3",
         org="Meta",
         license="Meta Llama 3 Community",
-        model_handler=LlamaHandler,
+        model_handler="bfcl.model_handler.local_inference.llama:LlamaHandler",
         input_price=None,
         output_price=None,
         is_fc_model=True,
@@ -993,7 +965,7 @@ local_inference_model_map = {
         url="https://llama.meta.com/llama3",
         org="Meta",
         license="Meta Llama 3 Community",
-        model_handler=LlamaHandler,
+        model_handler="bfcl.model_handler.local_inference.llama:LlamaHandler",
         input_price=None,
         output_price=None,
         is_fc_model=True,
@@ -1005,7 +977,7 @@ local_inference_model_map = {
         url="https://huggingface.co/meta-llama/Llama-4-Scout-17B-16E-Instruct",
         org="Meta",
         license="Meta Llama 4 Community",
-        model_handler=LlamaHandler,
+        model_handler="bfcl.model_handler.local_inference.llama:LlamaHandler",
         input_price=None,
         output_price=None,
         is_fc_model=True,
@@ -1017,7 +989,7 @@ local_inference_model_map = {
         url="https://huggingface.co/meta-llama/Llama-4-Maverick-17B-128E-Instruct-FP8",
         org="Meta",
         license="Meta Llama 4 Community",
-        model_handler=LlamaHandler,
+        model_handler="bfcl.model_handler.local_inference.llama:LlamaHandler",
         input_price=None,
         output_price=None,
         is_fc_model=True,
@@ -1029,7 +1001,7 @@ local_inference_model_map = {
         url="https://huggingface.co/Salesforce/Llama-xLAM-2-70b-fc-r",
         org="Salesforce",
         license="cc-by-nc-4.0",
-        model_handler=SalesforceLlamaHandler,
+        model_handler="bfcl.model_handler.local_inference.salesforce_llama:SalesforceLlamaHandler",
         input_price=None,
         output_price=None,
         is_fc_model=False,
@@ -1041,7 +1013,7 @@ local_inference_model_map = {
         url="https://huggingface.co/Salesforce/Llama-xLAM-2-8b-fc-r",
         org="Salesforce",
         license="cc-by-nc-4.0",
-        model_handler=SalesforceLlamaHandler,
+        model_handler="bfcl.model_handler.local_inference.salesforce_llama:SalesforceLlamaHandler",
         input_price=None,
         output_price=None,
         is_fc_model=False,
@@ -1053,7 +1025,7 @@ local_inference_model_map = {
         url="https://huggingface.co/Salesforce/xLAM-2-32b-fc-r",
         org="Salesforce",
         license="cc-by-nc-4.0",
-        model_handler=SalesforceQwenHandler,
+        model_handler="bfcl.model_handler.local_inference.salesforce_qwen:SalesforceQwenHandler",
         input_price=None,
         output_price=None,
         is_fc_model=False,
@@ -1065,7 +1037,7 @@ local_inference_model_map = {
         url="https://huggingface.co/Salesforce/xLAM-2-3b-fc-r",
         org="Salesforce",
         license="cc-by-nc-4.0",
-        model_handler=SalesforceQwenHandler,
+        model_handler="bfcl.model_handler.local_inference.salesforce_qwen:SalesforceQwenHandler",
         input_price=None,
         output_price=None,
         is_fc_model=False,
@@ -1077,7 +1049,7 @@ local_inference_model_map = {
         url="https://huggingface.co/Salesforce/xLAM-2-1b-fc-r",
         org="Salesforce",
         license="cc-by-nc-4.0",
-        model_handler=SalesforceQwenHandler,
+        model_handler="bfcl.model_handler.local_inference.salesforce_qwen:SalesforceQwenHandler",
         input_price=None,
         output_price=None,
         is_fc_model=False,
@@ -1089,7 +1061,7 @@ local_inference_model_map = {
         url="https://huggingface.co/mistralai/Ministral-8B-Instruct-2410",
         org="Mistral AI",
         license="Mistral AI Research License",
-        model_handler=MistralFCHandler,
+        model_handler="bfcl.model_handler.local_inference.mistral_fc:MistralFCHandler",
         input_price=None,
         output_price=None,
         is_fc_model=False,
@@ -1101,7 +1073,7 @@ local_inference_model_map = {
         url="https://huggingface.co/microsoft/phi-4",
         org="Microsoft",
         license="MIT",
-        model_handler=PhiHandler,
+        model_handler="bfcl.model_handler.local_inference.phi:PhiHandler",
         input_price=None,
         output_price=None,
         is_fc_model=False,
@@ -1113,7 +1085,7 @@ local_inference_model_map = {
         url="https://huggingface.co/microsoft/Phi-4-mini-instruct",
         org="Microsoft",
         license="MIT",
-        model_handler=PhiHandler,
+        model_handler="bfcl.model_handler.local_inference.phi:PhiHandler",
         input_price=None,
         output_price=None,
         is_fc_model=False,
@@ -1125,7 +1097,7 @@ local_inference_model_map = {
         url="https://huggingface.co/microsoft/Phi-4-mini-instruct",
         org="Microsoft",
         license="MIT",
-        model_handler=PhiFCHandler,
+        model_handler="bfcl.model_handler.local_inference.phi_fc:PhiFCHandler",
         input_price=None,
         output_price=None,
         is_fc_model=True,
@@ -1137,7 +1109,7 @@ local_inference_model_map = {
         url="https://huggingface.co/ibm-granite/granite-20b-functioncalling",
         org="IBM",
         license="Apache-2.0",
-        model_handler=GraniteHandler,
+        model_handler="bfcl.model_handler.local_inference.granite:GraniteHandler",
         input_price=None,
         output_price=None,
         is_fc_model=False,
@@ -1149,7 +1121,7 @@ local_inference_model_map = {
         url="https://huggingface.co/MadeAgents/Hammer2.1-7b",
         org="MadeAgents",
         license="cc-by-nc-4.0",
-        model_handler=HammerHandler,
+        model_handler="bfcl.model_handler.local_inference.hammer:HammerHandler",
         input_price=None,
         output_price=None,
         is_fc_model=False,
@@ -1161,7 +1133,7 @@ local_inference_model_map = {
         url="https://huggingface.co/MadeAgents/Hammer2.1-3b",
         org="MadeAgents",
         license="qwen-research",
-        model_handler=HammerHandler,
+        model_handler="bfcl.model_handler.local_inference.hammer:HammerHandler",
         input_price=None,
         output_price=None,
         is_fc_model=False,
@@ -1173,7 +1145,7 @@ local_inference_model_map = {
         url="https://huggingface.co/MadeAgents/Hammer2.1-1.5b",
         org="MadeAgents",
         license="cc-by-nc-4.0",
-        model_handler=HammerHandler,
+        model_handler="bfcl.model_handler.local_inference.hammer:HammerHandler",
         input_price=None,
         output_price=None,
         is_fc_model=False,
@@ -1185,7 +1157,7 @@ local_inference_model_map = {
         url="https://huggingface.co/MadeAgents/Hammer2.1-0.5b",
         org="MadeAgents",
         license="cc-by-nc-4.0",
-        model_handler=HammerHandler,
+        model_handler="bfcl.model_handler.local_inference.hammer:HammerHandler",
         input_price=None,
         output_price=None,
         is_fc_model=False,
@@ -1197,7 +1169,7 @@ local_inference_model_map = {
         url="https://huggingface.co/THUDM/glm-4-9b-chat",
         org="THUDM",
         license="glm-4",
-        model_handler=GLMHandler,
+        model_handler="bfcl.model_handler.local_inference.glm:GLMHandler",
         input_price=None,
         output_price=None,
         is_fc_model=False,
@@ -1209,7 +1181,7 @@ local_inference_model_map = {
         url="https://huggingface.co/Qwen/Qwen2.5-0.5B-Instruct",
         org="Qwen",
         license="apache-2.0",
-        model_handler=QwenFCHandler,
+        model_handler="bfcl.model_handler.local_inference.qwen_fc:QwenFCHandler",
         input_price=None,
         output_price=None,
         is_fc_model=True,
@@ -1221,7 +1193,7 @@ local_inference_model_map = {
         url="https://huggingface.co/Qwen/Qwen2.5-0.5B-Instruct",
         org="Qwen",
         license="apache-2.0",
-        model_handler=QwenHandler,
+        model_handler="bfcl.model_handler.local_inference.qwen:QwenHandler",
         input_price=None,
         output_price=None,
         is_fc_model=False,
@@ -1233,7 +1205,7 @@ local_inference_model_map = {
         url="https://huggingface.co/Qwen/Qwen2.5-1.5B-Instruct",
         org="Qwen",
         license="apache-2.0",
-        model_handler=QwenFCHandler,
+        model_handler="bfcl.model_handler.local_inference.qwen_fc:QwenFCHandler",
         input_price=None,
         output_price=None,
         is_fc_model=True,
@@ -1245,7 +1217,7 @@ local_inference_model_map = {
         url="https://huggingface.co/Qwen/Qwen2.5-1.5B-Instruct",
         org="Qwen",
         license="apache-2.0",
-        model_handler=QwenHandler,
+        model_handler="bfcl.model_handler.local_inference.qwen:QwenHandler",
         input_price=None,
         output_price=None,
         is_fc_model=False,
@@ -1257,7 +1229,7 @@ local_inference_model_map = {
         url="https://huggingface.co/Qwen/Qwen2.5-3B-Instruct",
         org="Qwen",
         license="qwen",
-        model_handler=QwenFCHandler,
+        model_handler="bfcl.model_handler.local_inference.qwen_fc:QwenFCHandler",
         input_price=None,
         output_price=None,
         is_fc_model=True,
@@ -1269,7 +1241,7 @@ local_inference_model_map = {
         url="https://huggingface.co/Qwen/Qwen2.5-3B-Instruct",
         org="Qwen",
         license="qwen",
-        model_handler=QwenHandler,
+        model_handler="bfcl.model_handler.local_inference.qwen:QwenHandler",
         input_price=None,
         output_price=None,
         is_fc_model=False,
@@ -1281,7 +1253,7 @@ local_inference_model_map = {
         url="https://huggingface.co/Qwen/Qwen2.5-7B-Instruct",
         org="Qwen",
         license="apache-2.0",
-        model_handler=QwenFCHandler,
+        model_handler="bfcl.model_handler.local_inference.qwen_fc:QwenFCHandler",
         input_price=None,
         output_price=None,
         is_fc_model=True,
@@ -1293,7 +1265,7 @@ local_inference_model_map = {
         url="https://huggingface.co/Qwen/Qwen2.5-7B-Instruct",
         org="Qwen",
         license="apache-2.0",
-        model_handler=QwenHandler,
+        model_handler="bfcl.model_handler.local_inference.qwen:QwenHandler",
         input_price=None,
         output_price=None,
         is_fc_model=False,
@@ -1305,7 +1277,7 @@ local_inference_model_map = {
         url="https://huggingface.co/Qwen/Qwen2.5-14B-Instruct",
         org="Qwen",
         license="apache-2.0",
-        model_handler=QwenFCHandler,
+        model_handler="bfcl.model_handler.local_inference.qwen_fc:QwenFCHandler",
         input_price=None,
         output_price=None,
         is_fc_model=True,
@@ -1317,7 +1289,7 @@ local_inference_model_map = {
         url="https://huggingface.co/Qwen/Qwen2.5-14B-Instruct",
         org="Qwen",
         license="apache-2.0",
-        model_handler=QwenHandler,
+        model_handler="bfcl.model_handler.local_inference.qwen:QwenHandler",
         input_price=None,
         output_price=None,
         is_fc_model=False,
@@ -1329,7 +1301,7 @@ local_inference_model_map = {
         url="https://huggingface.co/Qwen/Qwen2.5-32B-Instruct",
         org="Qwen",
         license="apache-2.0",
-        model_handler=QwenFCHandler,
+        model_handler="bfcl.model_handler.local_inference.qwen_fc:QwenFCHandler",
         input_price=None,
         output_price=None,
         is_fc_model=True,
@@ -1341,7 +1313,7 @@ local_inference_model_map = {
         url="https://huggingface.co/Qwen/Qwen2.5-32B-Instruct",
         org="Qwen",
         license="apache-2.0",
-        model_handler=QwenHandler,
+        model_handler="bfcl.model_handler.local_inference.qwen:QwenHandler",
         input_price=None,
         output_price=None,
         is_fc_model=False,
@@ -1353,7 +1325,7 @@ local_inference_model_map = {
         url="https://huggingface.co/Qwen/Qwen2.5-72B-Instruct",
         org="Qwen",
         license="qwen",
-        model_handler=QwenFCHandler,
+        model_handler="bfcl.model_handler.local_inference.qwen_fc:QwenFCHandler",
         input_price=None,
         output_price=None,
         is_fc_model=True,
@@ -1365,7 +1337,7 @@ local_inference_model_map = {
         url="https://huggingface.co/Qwen/Qwen2.5-72B-Instruct",
         org="Qwen",
         license="qwen",
-        model_handler=QwenHandler,
+        model_handler="bfcl.model_handler.local_inference.qwen:QwenHandler",
         input_price=None,
         output_price=None,
         is_fc_model=False,
@@ -1377,7 +1349,7 @@ local_inference_model_map = {
         url="https://huggingface.co/Team-ACE/ToolACE-2-8B",
         org="Huawei Noah & USTC",
         license="Apache-2.0",
-        model_handler=LlamaHandler,
+        model_handler="bfcl.model_handler.local_inference.llama:LlamaHandler",
         input_price=None,
         output_price=None,
         is_fc_model=False,
@@ -1389,7 +1361,7 @@ local_inference_model_map = {
         url="https://huggingface.co/openbmb/MiniCPM3-4B",
         org="openbmb",
         license="Apache-2.0",
-        model_handler=MiniCPMHandler,
+        model_handler="bfcl.model_handler.local_inference.minicpm:MiniCPMHandler",
         input_price=None,
         output_price=None,
         is_fc_model=False,
@@ -1401,7 +1373,7 @@ local_inference_model_map = {
         url="https://huggingface.co/openbmb/MiniCPM3-4B",
         org="openbmb",
         license="Apache-2.0",
-        model_handler=MiniCPMFCHandler,
+        model_handler="bfcl.model_handler.local_inference.minicpm_fc:MiniCPMFCHandler",
         input_price=None,
         output_price=None,
         is_fc_model=True,
@@ -1413,7 +1385,7 @@ local_inference_model_map = {
         url="https://huggingface.co/watt-ai/watt-tool-8B/",
         org="Watt AI Lab",
         license="Apache-2.0",
-        model_handler=LlamaHandler,
+        model_handler="bfcl.model_handler.local_inference.llama:LlamaHandler",
         input_price=None,
         output_price=None,
         is_fc_model=False,
@@ -1425,7 +1397,7 @@ local_inference_model_map = {
         url="https://huggingface.co/watt-ai/watt-tool-70B/",
         org="Watt AI Lab",
         license="Apache-2.0",
-        model_handler=LlamaHandler,
+        model_handler="bfcl.model_handler.local_inference.llama:LlamaHandler",
         input_price=None,
         output_price=None,
         is_fc_model=False,
@@ -1437,7 +1409,7 @@ local_inference_model_map = {
         url="https://huggingface.co/ZJared/Haha-7B",
         org="TeleAI",
         license="Apache 2.0",
-        model_handler=QwenHandler,
+        model_handler="bfcl.model_handler.local_inference.qwen:QwenHandler",
         input_price=None,
         output_price=None,
         is_fc_model=False,
@@ -1449,7 +1421,7 @@ local_inference_model_map = {
         url="https://huggingface.co/speakleash/Bielik-11B-v2.3-Instruct",
         org="SpeakLeash & ACK Cyfronet AGH",
         license="Apache 2.0",
-        model_handler=BielikHandler,
+        model_handler="bfcl.model_handler.local_inference.bielik:BielikHandler",
         input_price=None,
         output_price=None,
         is_fc_model=False,
@@ -1461,7 +1433,7 @@ local_inference_model_map = {
         url="https://huggingface.co/NovaSky-AI/Sky-T1-32B-Preview",
         org="NovaSky-AI",
         license="apache-2.0",
-        model_handler=QwenHandler,
+        model_handler="bfcl.model_handler.local_inference.qwen:QwenHandler",
         input_price=None,
         output_price=None,
         is_fc_model=False,
@@ -1473,7 +1445,7 @@ local_inference_model_map = {
         url="https://huggingface.co/Qwen/QwQ-32B-Preview",
         org="Qwen",
         license="apache-2.0",
-        model_handler=QwenHandler,
+        model_handler="bfcl.model_handler.local_inference.qwen:QwenHandler",
         input_price=None,
         output_price=None,
         is_fc_model=False,
@@ -1485,7 +1457,7 @@ local_inference_model_map = {
         url="https://huggingface.co/tiiuae/Falcon3-10B-Instruct",
         org="TII UAE",
         license="falcon-llm-license",
-        model_handler=Falcon3FCHandler,
+        model_handler="bfcl.model_handler.local_inference.falcon_fc:Falcon3FCHandler",
         input_price=None,
         output_price=None,
         is_fc_model=True,
@@ -1497,7 +1469,7 @@ local_inference_model_map = {
         url="https://huggingface.co/tiiuae/Falcon3-7B-Instruct",
         org="TII UAE",
         license="falcon-llm-license",
-        model_handler=Falcon3FCHandler,
+        model_handler="bfcl.model_handler.local_inference.falcon_fc:Falcon3FCHandler",
         input_price=None,
         output_price=None,
         is_fc_model=True,
@@ -1509,7 +1481,7 @@ local_inference_model_map = {
         url="https://huggingface.co/tiiuae/Falcon3-3B-Instruct",
         org="TII UAE",
         license="falcon-llm-license",
-        model_handler=Falcon3FCHandler,
+        model_handler="bfcl.model_handler.local_inference.falcon_fc:Falcon3FCHandler",
         input_price=None,
         output_price=None,
         is_fc_model=True,
@@ -1521,7 +1493,7 @@ local_inference_model_map = {
         url="https://huggingface.co/tiiuae/Falcon3-1B-Instruct",
         org="TII UAE",
         license="falcon-llm-license",
-        model_handler=Falcon3FCHandler,
+        model_handler="bfcl.model_handler.local_inference.falcon_fc:Falcon3FCHandler",
         input_price=None,
         output_price=None,
         is_fc_model=True,
@@ -1533,7 +1505,7 @@ local_inference_model_map = {
         url="https://huggingface.co/uiuc-convai/CoALM-8B",
         org="UIUC + Oumi",
         license="Meta Llama 3 Community",
-        model_handler=LlamaHandler,
+        model_handler="bfcl.model_handler.local_inference.llama:LlamaHandler",
         input_price=None,
         output_price=None,
         is_fc_model=False,
@@ -1545,7 +1517,7 @@ local_inference_model_map = {
         url="https://huggingface.co/uiuc-convai/CoALM-70B",
         org="UIUC + Oumi",
         license="Meta Llama 3 Community",
-        model_handler=LlamaHandler,
+        model_handler="bfcl.model_handler.local_inference.llama:LlamaHandler",
         input_price=None,
         output_price=None,
         is_fc_model=False,
@@ -1557,7 +1529,7 @@ local_inference_model_map = {
         url="https://huggingface.co/uiuc-convai/CoALM-405B",
         org="UIUC + Oumi",
         license="Meta Llama 3 Community",
-        model_handler=LlamaHandler,
+        model_handler="bfcl.model_handler.local_inference.llama:LlamaHandler",
         input_price=None,
         output_price=None,
         is_fc_model=False,
@@ -1569,7 +1541,7 @@ local_inference_model_map = {
         url="https://huggingface.co/BitAgent/BitAgent-8B/",
         org="Bittensor",
         license="Apache-2.0",
-        model_handler=LlamaHandler,
+        model_handler="bfcl.model_handler.local_inference.llama:LlamaHandler",
         input_price=None,
         output_price=None,
         is_fc_model=False,
@@ -1581,7 +1553,7 @@ local_inference_model_map = {
         url="https://huggingface.co/ThinkAgents/ThinkAgent-1B",
         org="ThinkAgents",
         license="apache-2.0",
-        model_handler=ThinkAgentHandler,
+        model_handler="bfcl.model_handler.local_inference.think_agent:ThinkAgentHandler",
         input_price=None,
         output_price=None,
         is_fc_model=False,
@@ -1598,7 +1570,7 @@ third_party_inference_model_map = {
         url="https://huggingface.co/meta-llama/Llama-4-Maverick-17B-128E-Instruct-FP8",
         org="Meta",
         license="Meta Llama 4 Community",
-        model_handler=NovitaHandler,
+        model_handler="bfcl.model_handler.api_inference.novita:NovitaHandler",
         input_price=0.2,
         output_price=0.85,
         is_fc_model=False,
@@ -1610,7 +1582,7 @@ third_party_inference_model_map = {
         url="https://huggingface.co/meta-llama/Llama-4-Maverick-17B-128E-Instruct-FP8",
         org="Meta",
         license="Meta Llama 4 Community",
-        model_handler=NovitaHandler,
+        model_handler="bfcl.model_handler.api_inference.novita:NovitaHandler",
         input_price=0.2,
         output_price=0.85,
         is_fc_model=True,
@@ -1622,7 +1594,7 @@ third_party_inference_model_map = {
         url="https://huggingface.co/meta-llama/Llama-4-Scout-17B-16E-Instruct",
         org="Meta",
         license="Meta Llama 4 Community",
-        model_handler=NovitaHandler,
+        model_handler="bfcl.model_handler.api_inference.novita:NovitaHandler",
         input_price=0.1,
         output_price=0.5,
         is_fc_model=False,
@@ -1634,7 +1606,7 @@ third_party_inference_model_map = {
         url="https://huggingface.co/meta-llama/Llama-4-Scout-17B-16E-Instruct",
         org="Meta",
         license="Meta Llama 4 Community",
-        model_handler=NovitaHandler,
+        model_handler="bfcl.model_handler.api_inference.novita:NovitaHandler",
         input_price=0.1,
         output_price=0.5,
         is_fc_model=True,
@@ -1646,7 +1618,7 @@ third_party_inference_model_map = {
         url="https://huggingface.co/Qwen/QwQ-32B",
         org="Qwen",
         license="apache-2.0",
-        model_handler=NovitaHandler,
+        model_handler="bfcl.model_handler.api_inference.novita:NovitaHandler",
         input_price=0.18,
         output_price=0.2,
         is_fc_model=True,
@@ -1658,7 +1630,7 @@ third_party_inference_model_map = {
         url="https://huggingface.co/Qwen/QwQ-32B",
         org="Qwen",
         license="apache-2.0",
-        model_handler=NovitaHandler,
+        model_handler="bfcl.model_handler.api_inference.novita:NovitaHandler",
         input_price=0.18,
         output_price=0.2,
         is_fc_model=False,
@@ -257,6 +257,9 @@ PROMPT_VARIATIONS = {
     },
 }
 
+# Formats in which the function docs can be presented to the model (`doc_fmt`), see `bfcl/model_handler/func_doc_formatters.py`
+DOC_FORMATS = ["json", "python", "xml"]
+
 # Additional function prompts (same for all variations)
 DEFAULT_USER_PROMPT_FOR_ADDITIONAL_FUNCTION_FC = "I have updated some more functions you can choose from. What about now?"
 DEFAULT_USER_PROMPT_FOR_ADDITIONAL_FUNCTION_PROMPTING = "{functions}\n" + DEFAULT_USER_PROMPT_FOR_ADDITIONAL_FUNCTION_FC
@@ -0,0 +1,341 @@
+"""
+Process-wide, read-only access to the dataset files (test entries, possible answers and multi-turn function docs).
+
+Each file is parsed at most once per process; afterwards every lookup is served from memory. The returned entries are
+shared by all callers, so they must never be modified in place. Callers that need to modify an entry should copy it
+first (a shallow copy is enough when only top-level keys are replaced, as in `process_multi_turn_test_case`).
+
+Id subsets, ranges of entries and entry counts can also be served from a compiled dataset (see `compile_dataset`),
+without parsing the whole file. The JSON files remain the source of truth; a compiled dataset is only used while it
+matches them.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+from typing import Mapping, Optional
+
+from bfcl.constants.category_mapping import MULTI_TURN_FUNC_DOC_FILE_MAPPING, TEST_FILE_MAPPING
+from bfcl.constants.eval_config import (
+    COMPILED_DATASET_PATH,
+    MULTI_TURN_FUNC_DOC_PATH,
+    POSSIBLE_ANSWER_PATH,
+    PROMPT_PATH,
+)
+from bfcl.utils import extract_test_category, load_file, sort_key
+
+# Layout of a compiled dataset: MAGIC, the header length (uint32, little endian), the JSON header, then the records.
+# Each record is the JSON line of one entry, exactly as in the source file; the header holds the id -> (offset, length)
+# index of every section (`prompt`, `possible_answer`) and the fingerprint of the source file of each section.
+PACK_MAGIC = b"BFCLPACK"
+PACK_FORMAT_VERSION = 1
+PACK_SUFFIX = ".pack"
+PROMPT_SECTION = "prompt"
+POSSIBLE_ANSWER_SECTION = "possible_answer"
+
+_DATASET_FILES: dict[Path, tuple[dict, ...]] = {}
+_COMPILED_DATASETS: dict[Path, Optional["CompiledDataset"]] = {}
+_LOCK = threading.Lock()
+
+
+def load_dataset_file(file_path: Path) -> tuple[dict, ...]:
+    """All entries of a dataset file, in file order."""
+    file_path = Path(file_path)
+    if file_path not in _DATASET_FILES:
+        entries = tuple(load_file(file_path))
+        with _LOCK:
+            _DATASET_FILES.setdefault(file_path, entries)
+    return _DATASET_FILES[file_path]
+
+
+def get_dataset_entries_by_ids(file_path: Path, test_ids) -> list[dict]:
+    """The entries of the given ids that exist in the file, in file order."""
+    file_path = Path(file_path)
+    test_ids = set(test_ids)
+    if file_path not in _DATASET_FILES:
+        compiled = _get_compiled_section(file_path)
+        if compiled is not None:
+            compiled_dataset, section = compiled
+            return compiled_dataset.get_many(section, test_ids)
+    return [entry for entry in load_dataset_file(file_path) if entry["id"] in test_ids]
+
+
+def get_dataset_range(file_path: Path, start: int, end: int) -> Optional[list[dict]]:
+    """
+    The entries at positions [start, end) of a dataset file once sorted by id, read from its compiled dataset without
+    decoding the other entries. The entries are fresh copies, which the caller may modify.
+    None if the file is already parsed in memory, or has no up-to-date compiled dataset; slice the parsed file instead.
+    """
+    file_path = Path(file_path)
+    if file_path in _DATASET_FILES:
+        return None
+    compiled = _get_compiled_section(file_path)
+    if compiled is None:
+        return None
+    compiled_dataset, section = compiled
+    return compiled_dataset.get_range(section, start, end, sort_by_id=True)
+
+
+def has_compiled_dataset(file_path: Path) -> bool:
+    """Whether the dataset file has an up-to-date compiled dataset."""
+    return _get_compiled_section(Path(file_path)) is not None
+
+
+def get_dataset_entry_count(file_path: Path) -> int:
+    file_path = Path(file_path)
+    if file_path not in _DATASET_FILES:
+        compiled = _get_compiled_section(file_path)
+        if compiled is not None:
+            compiled_dataset, section = compiled
+            return compiled_dataset.count(section)
+    return len(load_dataset_file(file_path))
+
+
+def load_multi_turn_func_doc(func_collection: str) -> tuple[dict, ...]:
+    """The function docs of one multi-turn API class, eg. `GorillaFileSystem`."""
+    return load_dataset_file(
+        MULTI_TURN_FUNC_DOC_PATH / MULTI_TURN_FUNC_DOC_FILE_MAPPING[func_collection]
+    )
+
+
+@lru_cache(maxsize=None)
+def _index_dataset_folder(folder_path: Path) -> Mapping[str, Path]:
+    files_by_category = {}
+    for json_file in folder_path.glob("*.json"):
+        try:
+            test_category = extract_test_category(json_file)
+        except ValueError:
+            continue
+        # Keep the first match, same as a linear scan would
+        files_by_category.setdefault(test_category, json_file)
+    return MappingProxyType(files_by_category)
+
+
+def find_dataset_file(folder_path: Path, test_category: str) -> Path:
+    """
+    Same as `bfcl.utils.find_file_with_suffix`, but the folder is only listed once.
+    Only use it for the dataset folders, whose content does not change during a run.
+    """
+    files_by_category = _index_dataset_folder(Path(folder_path))
+    if test_category not in files_by_category:
+        raise FileNotFoundError(f"No JSON file found with suffix: {test_category}")
+    return files_by_category[test_category]
+
+
+#### Compiled datasets ####
+
+
+def _fingerprint_file(file_path: Path, with_hash: bool = True) -> dict:
+    stat = file_path.stat()
+    fingerprint = {"name": file_path.name, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    if with_hash:
+        with open(file_path, "rb") as f:
+            fingerprint["sha256"] = hashlib.sha256(f.read()).hexdigest()
+    return fingerprint
+
+
+def _source_matches(file_path: Path, fingerprint: dict) -> bool:
+    if not file_path.exists():
+        return False
+    current = _fingerprint_file(file_path, with_hash=False)
+    if current["size"] != fingerprint["size"]:
+        return False
+    if current["mtime_ns"] == fingerprint["mtime_ns"]:
+        return True
+    # Touched (eg. by a git checkout), but possibly not changed; the content hash decides
+    return _fingerprint_file(file_path)["sha256"] == fingerprint["sha256"]
+
+
+def get_compiled_dataset_path(test_category: str, output_dir: Path = COMPILED_DATASET_PATH) -> Path:
+    return Path(output_dir) / TEST_FILE_MAPPING[test_category].replace(".json", PACK_SUFFIX)
+
+
+def _get_source_paths(test_category: str) -> dict[str, Path]:
+    file_name = TEST_FILE_MAPPING[test_category]
+    source_paths = {PROMPT_SECTION: PROMPT_PATH / file_name}
+    # Relevance and irrelevance categories have no possible answer file
+    if (POSSIBLE_ANSWER_PATH / file_name).exists():
+        source_paths[POSSIBLE_ANSWER_SECTION] = POSSIBLE_ANSWER_PATH / file_name
+    return source_paths
+
+
+class CompiledDataset:
+    """
+    A memory-mapped compiled dataset of one test category: its entries and possible answers, with an id index.
+    An entry is only decoded when it is requested.
+    """
+
+    def __init__(self, pack_path: Path) -> None:
+        self.pack_path = Path(pack_path)
+        with open(self.pack_path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mmap[: len(PACK_MAGIC)] != PACK_MAGIC:
+            raise ValueError(f"{self.pack_path} is not a compiled dataset.")
+        (header_length,) = struct.unpack_from("<I", self._mmap, len(PACK_MAGIC))
+        header_start = len(PACK_MAGIC) + 4
+        header = json.loads(self._mmap[header_start : header_start + header_length])
+
+        self.version = header["version"]
+        self.test_category = header["test_category"]
+        self.sources = header["sources"]
+        self._data_start = header_start + header_length
+        # Mapping from section to its [(id, offset, length)] records, in file order
+        self.records = {
+            section: list(
+                zip(section_index["ids"], section_index["offsets"], section_index["lengths"])
+            )
+            for section, section_index in header["sections"].items()
+        }
+        # Mapping from section to its records sorted by id, built on first use
+        self._sorted_records: dict[str, list[tuple[str, int, int]]] = {}
+
+    def is_fresh(self) -> bool:
+        """Whether the compiled dataset still matches its JSON source files."""
+        if self.version != PACK_FORMAT_VERSION:
+            return False
+        source_paths = _get_source_paths(self.test_category)
+        if set(source_paths) != set(self.sources):
+            return False
+        return all(
+            _source_matches(source_paths[section], fingerprint)
+            for section, fingerprint in self.sources.items()
+        )
+
+    def _read(self, offset: int, length: int) -> dict:
+        start = self._data_start + offset
+        return json.loads(self._mmap[start : start + length])
+
+    def count(self, section: str) -> int:
+        return len(self.records[section])
+
+    def get_many(self, section: str, test_ids) -> list[dict]:
+        """The entries of the given ids that exist in the section, in file order."""
+        return [
+            self._read(offset, length)
+            for test_id, offset, length in self.records[section]
+            if test_id in test_ids
+        ]
+
+    def get_range(self, section: str, start: int, end: int, sort_by_id: bool = False) -> list[dict]:
+        """
+        The entries at positions [start, end) of the section, in file order, or once sorted by id (in the same order as
+        `load_file(..., sort_by_id=True)`, duplicates included).
+        """
+        records = self.records[section]
+        if sort_by_id:
+            if section not in self._sorted_records:
+                # `sort_key` only looks at the id; the sort is stable, like the one of the parsed entries
+                self._sorted_records[section] = sorted(
+                    records, key=lambda record: sort_key({"id": record[0]})
+                )
+            records = self._sorted_records[section]
+        return [self._read(offset, length) for _, offset, length in records[start:end]]
+
+    def close(self) -> None:
+        self._mmap.close()
+
+
+def compile_dataset(
+    test_category: str, output_dir: Path = COMPILED_DATASET_PATH, force: bool = False
+) -> tuple[Path, bool]:
+    """
+    Compile the entries and possible answers of a test category into one file.
+    Returns the path of the compiled dataset, and whether it was (re)compiled; an up-to-date one is left as is.
+    """
+    pack_path = get_compiled_dataset_path(test_category, output_dir)
+    if not force and pack_path.exists():
+        try:
+            compiled_dataset = CompiledDataset(pack_path)
+            is_fresh = compiled_dataset.is_fresh()
+            compiled_dataset.close()
+            if is_fresh:
+                return pack_path, False
+        except (ValueError, KeyError, json.JSONDecodeError, struct.error):
+            # Corrupted or from an incompatible version; compile it again
+            pass
+
+    sources = {}
+    sections = {}
+    records = []
+    offset = 0
+    for section, source_path in _get_source_paths(test_category).items():
+        sources[section] = _fingerprint_file(source_path)
+        section_index = {"ids": [], "offsets": [], "lengths": []}
+        with open(source_path, "rb") as f:
+            for line in f:
+                record = line.strip()
+                if not record:
+                    continue
+                section_index["ids"].append(json.loads(record)["id"])
+                section_index["offsets"].append(offset)
+                section_index["lengths"].append(len(record))
+                records.append(record)
+                offset += len(record)
+        sections[section] = section_index
+
+    header = json.dumps(
+        {
+            "version": PACK_FORMAT_VERSION,
+            "test_category": test_category,
+            "sources": sources,
+            "sections": sections,
+        }
+    ).encode("utf-8")
+
+    pack_path.parent.mkdir(parents=True, exist_ok=True)
+    # Write to a temporary file first so that a reader never sees a half-written file
+    temp_path = pack_path.with_name(pack_path.name + ".tmp")
+    with open(temp_path, "wb") as f:
+        f.write(PACK_MAGIC)
+        f.write(struct.pack("<I", len(header)))
+        f.write(header)
+        for record in records:
+            f.write(record)
+    os.replace(temp_path, pack_path)
+
+    with _LOCK:
+        _COMPILED_DATASETS.pop(pack_path, None)
+    return pack_path, True
+
+
+def _get_compiled_section(file_path: Path) -> Optional[tuple[CompiledDataset, str]]:
+    """The up-to-date compiled dataset holding the given JSON file, and its section, if there is one."""
+    if file_path.parent == PROMPT_PATH:
+        section = PROMPT_SECTION
+    elif file_path.parent == POSSIBLE_ANSWER_PATH:
+        section = POSSIBLE_ANSWER_SECTION
+    else:
+        return None
+    try:
+        test_category = extract_test_category(file_path)
+    except ValueError:
+        return None
+    if test_category not in TEST_FILE_MAPPING:
+        return None
+
+    pack_path = get_compiled_dataset_path(test_category)
+    with _LOCK:
+        if pack_path not in _COMPILED_DATASETS:
+            compiled_dataset = None
+            if pack_path.exists():
+                try:
+                    compiled_dataset = CompiledDataset(pack_path)
+                    if not compiled_dataset.is_fresh():
+                        # Stale; fall back to the JSON file until `bfcl data compile` is run again
+                        compiled_dataset.close()
+                        compiled_dataset = None
+                except (ValueError, KeyError, json.JSONDecodeError, struct.error):
+                    compiled_dataset = None
+            _COMPILED_DATASETS[pack_path] = compiled_dataset
+        compiled_dataset = _COMPILED_DATASETS[pack_path]
+
+    if compiled_dataset is None or section not in compiled_dataset.records:
+        return None
+    return compiled_dataset, section
@@ -3,6 +3,10 @@ from bfcl.constants.type_mappings import (
     JAVA_TYPE_CONVERSION,
     JS_TYPE_CONVERSION,
 )
+from bfcl.eval_checker.ast_eval.possible_answer import (
+    PossibleAnswerList,
+    standardize_string,
+)
 from bfcl.eval_checker.ast_eval.type_convertor.java_type_converter import java_type_converter
 from bfcl.eval_checker.ast_eval.type_convertor.js_type_converter import js_type_converter
 import re
@@ -66,6 +70,8 @@ def find_description(func_descriptions, name):
 
 
 def get_possible_answer_type(possible_answer: list):
+    if type(possible_answer) == PossibleAnswerList:
+        return possible_answer.answer_type
     for answer in possible_answer:
         if answer != "":  # Optional parameter
             return type(answer)
@@ -163,21 +169,24 @@ def type_checker(
     return result
 
 
-def standardize_string(input_string: str):
-    # This function standardizes the string by removing all the spaces, ",./-_*^" punctuation, and converting it to lowercase
-    # It will also convert all the single quotes to double quotes
-    # This is used to compare the model output with the possible answers
-    # We don't want to punish model for answer like April 1, 2024 vs April 1,2024, vs April 1 2024
-    regex_string = r"[ \,\.\/\-\_\*\^]"
-    return re.sub(regex_string, "", input_string).lower().replace("'", '"')
+def get_standardized_possible_answer(possible_answer: list) -> list:
+    # String values standardized, other values as is
+    if type(possible_answer) == PossibleAnswerList:
+        return possible_answer.standardized
+    return [
+        standardize_string(answer) if type(answer) == str else answer
+        for answer in possible_answer
+    ]
 
 
 def string_checker(param: str, model_output: str, possible_answer: list):
-    standardize_possible_answer = []
     standardize_model_output = standardize_string(model_output)
-    for i in range(len(possible_answer)):
-        if type(possible_answer[i]) == str:
-            standardize_possible_answer.append(standardize_string(possible_answer[i]))
+    if type(possible_answer) == PossibleAnswerList:
+        standardize_possible_answer = possible_answer.standardized_strings
+    else:
+        standardize_possible_answer = [
+            standardize_string(answer) for answer in possible_answer if type(answer) == str
+        ]
 
     if standardize_model_output not in standardize_possible_answer:
         return {
@@ -201,19 +210,27 @@ def list_checker(param: str, model_output: list, possible_answer: list):
         if type(standardize_model_output[i]) == str:
             standardize_model_output[i] = standardize_string(model_output[i])
 
-    standardize_possible_answer = []
-    # We also need to standardize the possible answers
-    for i in range(len(possible_answer)):
-        standardize_possible_answer.append([])
-        for j in range(len(possible_answer[i])):
-            if type(possible_answer[i][j]) == str:
-                standardize_possible_answer[i].append(
-                    standardize_string(possible_answer[i][j])
-                )
-            else:
-                standardize_possible_answer[i].append(possible_answer[i][j])
+    # We also need to standardize the possible answers (done once at load time for the dataset entries)
+    if type(possible_answer) == PossibleAnswerList:
+        is_match = False
+        candidate_set = possible_answer.standardized_candidate_set
+        if candidate_set is not None:
+            try:
+                is_match = tuple(standardize_model_output) in candidate_set
+            except TypeError:
+                # Unhashable items in the model output (e.g. nested lists); compare one by one
+                candidate_set = None
+        if candidate_set is None:
+            is_match = standardize_model_output in possible_answer.standardized_candidates
+    else:
+        is_match = standardize_model_output in [
+            get_standardized_possible_answer(
+                [candidate[j] for j in range(len(candidate))]
+            )
+            for candidate in possible_answer
+        ]
 
-    if standardize_model_output not in standardize_possible_answer:
+    if not is_match:
         return {
             "valid": False,
             "error": [
@@ -256,16 +273,14 @@ def dict_checker(param: str, model_output: dict, possible_answers: list):
                 standardize_value = standardize_string(value)
                 
             # We also need to standardize the possible answers if they are string
-            standardize_possible_answer = []
-            for i in range(len(possible_answer[key])):
-                if type(possible_answer[key][i]) == str:
-                    standardize_possible_answer.append(
-                        standardize_string(possible_answer[key][i])
-                    )
-                else:
-                    standardize_possible_answer.append(possible_answer[key][i])
+            standardize_possible_answer = get_standardized_possible_answer(possible_answer[key])
 
-            if standardize_value not in standardize_possible_answer:
+            if type(standardize_value) == str and type(possible_answer[key]) == PossibleAnswerList:
+                is_match = standardize_value in possible_answer[key].standardized_strings
+            else:
+                is_match = standardize_value in standardize_possible_answer
+
+            if not is_match:
                 result["valid"] = False
                 result["error"].append(
                     f"Invalid value for parameter {repr(key)}: {repr(value)}. Expected one of {standardize_possible_answer}."
@@ -556,58 +571,82 @@ def parallel_function_checker_no_order(
             "error_type": "parallel_function_checker_no_order:wrong_count",
         }
 
-    matched_indices = []
-
-    # We go throught the possible answers one by one, and eliminate the model output that matches the possible answer
-    # It must be this way because we need ground truth to fetch the correct function description
-    for i in range(len(possible_answers)):
-        # possible_answers[i] is a dictionary with only one key
-        func_name_expected = list(possible_answers[i].keys())[0]
-        func_description = find_description(func_descriptions, func_name_expected)
-
-
-        all_errors = []
-
-        for index in range(len(model_output)):
-            if index in matched_indices:
-                continue
-
-            result = simple_function_checker(
+    # Result of checking a model output against a possible answer, keyed by (possible answer index, model output index).
+    # Filled in lazily; each pair is checked at most once.
+    pair_check_results = {}
+
+    def check_pair(answer_index, output_index):
+        if (answer_index, output_index) not in pair_check_results:
+            # possible_answers[i] is a dictionary with only one key
+            func_name_expected = list(possible_answers[answer_index].keys())[0]
+            # It must be this way because we need ground truth to fetch the correct function description
+            func_description = find_description(func_descriptions, func_name_expected)
+            pair_check_results[(answer_index, output_index)] = simple_function_checker(
                 func_description,
-                model_output[index],
-                possible_answers[i],
+                model_output[output_index],
+                possible_answers[answer_index],
                 language,
                 model_name,
             )
+        return pair_check_results[(answer_index, output_index)]
+
+    # Mapping from model output index to the index of the possible answer it is matched with
+    matched_answer_indices = {}
+
+    def find_augmenting_path(answer_index, visited_output_indices):
+        """
+        Try to match the possible answer with a model output that is already matched, by moving the possible answer
+        currently matched with that output to another output it also matches (recursively). This is what makes the
+        result independent of the order of the calls: a valid assignment is found whenever one exists.
+        """
+        for output_index in range(len(model_output)):
+            if output_index in visited_output_indices or not check_pair(answer_index, output_index)["valid"]:
+                continue
+            visited_output_indices.add(output_index)
+            if output_index not in matched_answer_indices or find_augmenting_path(
+                matched_answer_indices[output_index], visited_output_indices
+            ):
+                matched_answer_indices[output_index] = answer_index
+                return True
+        return False
+
+    # We go throught the possible answers one by one, and match each with a model output
+    for i in range(len(possible_answers)):
+        unmatched_indices = [
+            index for index in range(len(model_output)) if index not in matched_answer_indices
+        ]
+        # The first unmatched model output that matches the possible answer, if any
+        matched_index = next(
+            (index for index in unmatched_indices if check_pair(i, index)["valid"]), None
+        )
+        if matched_index is not None:
+            matched_answer_indices[matched_index] = i
+            continue
 
-            if result["valid"]:
-                matched_indices.append(index)
-                break
-            else:
-                all_errors.append(
-                    {
-                        f"Model Result Index {index}": {
-                            "sub_error": result["error"],
-                            "sub_error_type": result["error_type"],
-                            "model_output_item": model_output[index],
-                            "possible_answer_item": possible_answers[i],
-                        }
-                    }
-                )
+        # Otherwise, the possible answer may match a model output that was matched with an earlier possible answer
+        if find_augmenting_path(i, set()):
+            continue
 
-        if not result["valid"]:
-            considered_indices = [
-                i for i in range(len(model_output)) if i not in matched_indices
-            ]
-            all_errors.insert(
-                0,
-                f"Could not find a matching function among index {considered_indices} of model output for index {i} of possible answers.",
+        all_errors = [
+            f"Could not find a matching function among index {unmatched_indices} of model output for index {i} of possible answers."
+        ]
+        for index in unmatched_indices:
+            result = check_pair(i, index)
+            all_errors.append(
+                {
+                    f"Model Result Index {index}": {
+                        "sub_error": result["error"],
+                        "sub_error_type": result["error_type"],
+                        "model_output_item": model_output[index],
+                        "possible_answer_item": possible_answers[i],
+                    }
+                }
             )
-            return {
-                "valid": False,
-                "error": all_errors,
-                "error_type": "parallel_function_checker_no_order:cannot_find_match",
-            }
+        return {
+            "valid": False,
+            "error": all_errors,
+            "error_type": "parallel_function_checker_no_order:cannot_find_match",
+        }
 
     return {"valid": True, "error": []}
 
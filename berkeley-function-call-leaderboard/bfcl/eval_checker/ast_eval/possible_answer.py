@@ -0,0 +1,101 @@
+import re
+from functools import cached_property
+
+STANDARDIZE_STRING_PATTERN = re.compile(r"[ \,\.\/\-\_\*\^]")
+
+
+def standardize_string(input_string: str):
+    # This function standardizes the string by removing all the spaces, ",./-_*^" punctuation, and converting it to lowercase
+    # It will also convert all the single quotes to double quotes
+    # This is used to compare the model output with the possible answers
+    # We don't want to punish model for answer like April 1, 2024 vs April 1,2024, vs April 1 2024
+    return STANDARDIZE_STRING_PATTERN.sub("", input_string).lower().replace("'", '"')
+
+
+def _standardize_values(values) -> list:
+    return [standardize_string(value) if type(value) == str else value for value in values]
+
+
+class PossibleAnswerList(list):
+    """
+    The list of accepted values of a parameter in a possible answer, together with the standardized forms that the AST
+    checker compares the model output against.
+
+    The checker used to standardize every accepted value (a regex substitution) again for every model output it
+    checked; here it is done once, when the possible answers of a category are loaded, and membership checks become
+    hash lookups. It is still a plain list to everything else (equality, `in`, iteration, repr and JSON serialization),
+    so the score files are unchanged.
+    """
+
+    def __init__(self, values) -> None:
+        super().__init__(values)
+        # String values standardized, other values as is
+        self.standardized: list = _standardize_values(self)
+        self.standardized_strings: frozenset = frozenset(
+            value for value in self.standardized if type(value) == str
+        )
+        self.answer_type = None
+        for value in self:
+            if value != "":  # Optional parameter
+                self.answer_type = type(value)
+                break
+
+    @cached_property
+    def standardized_candidates(self) -> list[list]:
+        """For list parameters: each accepted list, with its string items standardized."""
+        # Computed on first use, as only list parameters need it
+        # Indexed (rather than iterated) like the checker always did, so a malformed candidate fails the same way
+        return [
+            _standardize_values([candidate[j] for j in range(len(candidate))]) for candidate in self
+        ]
+
+    @cached_property
+    def standardized_candidate_set(self):
+        """The standardized accepted lists as a set of tuples, or None if some of them cannot be hashed."""
+        try:
+            return frozenset(tuple(candidate) for candidate in self.standardized_candidates)
+        except TypeError:
+            return None
+
+    def __reduce_ex__(self, protocol):
+        # Rebuilt from the values (the derived attributes are recomputed) when copied or sent to a worker process
+        return (PossibleAnswerList, (list(self),))
+
+
+def _compile_candidate(candidate):
+    # The keys of a dict parameter (or of each dict of a list-of-dicts parameter) have their own lists of accepted values
+    if type(candidate) == dict:
+        return {
+            key: PossibleAnswerList(values) if type(values) == list else values
+            for key, values in candidate.items()
+        }
+    if type(candidate) == list and any(type(item) == dict for item in candidate):
+        return [_compile_candidate(item) for item in candidate]
+    return candidate
+
+
+def compile_possible_answers(possible_answer_entries) -> list[dict]:
+    """
+    Return the possible answer entries of a single-turn category, with the lists of accepted values in their ground
+    truth turned into `PossibleAnswerList`s. The given entries (which may be shared through the dataset cache) are left
+    untouched. Done once per category and process; the result can be used for any number of models and prompt
+    variations, as the checker never modifies it.
+    """
+    compiled_entries = []
+    for entry in possible_answer_entries:
+        ground_truth = [
+            {
+                func_name: {
+                    param: (
+                        PossibleAnswerList(_compile_candidate(value) for value in values)
+                        if type(values) == list
+                        else values
+                    )
+                    for param, values in params.items()
+                }
+                for func_name, params in function_call.items()
+            }
+            for function_call in entry["ground_truth"]
+        ]
+        compiled_entries.append({**entry, "ground_truth": ground_truth})
+    return compiled_entries
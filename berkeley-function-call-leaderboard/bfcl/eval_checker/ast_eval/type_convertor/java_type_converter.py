@@ -2,6 +2,23 @@ import re
 from typing import List, Dict, Union
 from bfcl.constants.type_mappings import JAVA_TYPE_CONVERSION
 
+# Compiled once at import; the converters run for every parameter of every Java entry checked
+INTEGER_PATTERN = re.compile(r"^-?\d+$")
+FLOAT_PATTERN = re.compile(r"^-?\d+(\.\d+)?([eE][+-]?\d+)?[fF]$")
+FLOAT_SUFFIX_PATTERN = re.compile(r"[fF]$")
+DOUBLE_PATTERN = re.compile(r"^-?\d+(\.\d+)?([eE][+-]?\d+)?$")
+LONG_PATTERN = re.compile(r"^-?\d+[lL]$")
+LONG_SUFFIX_PATTERN = re.compile(r"[lL]$")
+CHAR_PATTERN = re.compile(r"^\'.$\'")
+ARRAYLIST_AS_LIST_PATTERN = re.compile(r"new\s+ArrayList<\w*>\(Arrays\.asList\((.+?)\)\)")
+ARRAYLIST_ADD_PATTERN = re.compile(r"new\s+ArrayList<\w*>\(\)\s*\{\{\s*(.+?)\s*\}\}", re.DOTALL)
+ADD_CALL_PATTERN = re.compile(r"add\((.+?)\)")
+EMPTY_ARRAYLIST_PATTERN = re.compile(r"new\s+ArrayList<\w*>\(\)")
+ARRAY_PATTERN = re.compile(r"new\s+\w+\[\]\s*\{(.*?)\}")
+HASHMAP_PATTERN = re.compile(r"new\s+HashMap<.*?>\s*\(\)\s*\{\s*\{?\s*(.*?)\s*\}?\s*\}", re.DOTALL)
+PUT_CALL_PATTERN = re.compile(r"put\(\"(.*?)\",\s*(.*?)\)")
+EMPTY_HASHMAP_PATTERN = re.compile(r"new\s+HashMap<.*?>\s*\(\)")
+
 
 def java_type_converter(value, expected_type, nested_type=None):
     if expected_type not in JAVA_TYPE_CONVERSION:
@@ -11,27 +28,27 @@ def java_type_converter(value, expected_type, nested_type=None):
         or expected_type == "short"
         or expected_type == "integer"
     ):
-        if not re.match(r"^-?\d+$", value):
+        if not INTEGER_PATTERN.match(value):
             return str(value)  # default to string
         return int(value)
     elif expected_type == "float":
-        if not re.match(r"^-?\d+(\.\d+)?([eE][+-]?\d+)?[fF]$", value):
+        if not FLOAT_PATTERN.match(value):
             return str(value)  # default to string
-        return float(re.sub(r"[fF]$", "", value))
+        return float(FLOAT_SUFFIX_PATTERN.sub("", value))
     elif expected_type == "double":
-        if not re.match(r"^-?\d+(\.\d+)?([eE][+-]?\d+)?$", value):
+        if not DOUBLE_PATTERN.match(value):
             return str(value)  # default to string
         return float(value)
     elif expected_type == "long":
-        if not re.match(r"^-?\d+[lL]$", value):
+        if not LONG_PATTERN.match(value):
             return str(value)  # default to string
-        return int(re.sub(r"[lL]$", "", value))
+        return int(LONG_SUFFIX_PATTERN.sub("", value))
     elif expected_type == "boolean":
         if value not in ["true", "false"]:
             return str(value)  # default to string
         return parse_java_boolean(value)
     elif expected_type == "char":
-        if not re.match(r"^\'.$\'", value):
+        if not CHAR_PATTERN.match(value):
             return str(value)  # default to string
         return value  # Remove the single quotes
     elif expected_type == "Array" or expected_type == "ArrayList":
@@ -68,9 +85,7 @@ def parse_java_collection(
 
 
 def parse_arraylist(input_str: str, nested_type=None) -> List:
-    match_asList = re.search(
-        r"new\s+ArrayList<\w*>\(Arrays\.asList\((.+?)\)\)", input_str
-    )
+    match_asList = ARRAYLIST_AS_LIST_PATTERN.search(input_str)
     if match_asList:
         elements_str = match_asList.group(1)
         elements = []
@@ -89,13 +104,11 @@ def parse_arraylist(input_str: str, nested_type=None) -> List:
             elements.append(element)
         return elements
 
-    match_add = re.search(
-        r"new\s+ArrayList<\w*>\(\)\s*\{\{\s*(.+?)\s*\}\}", input_str, re.DOTALL
-    )
+    match_add = ARRAYLIST_ADD_PATTERN.search(input_str)
     if match_add:
         adds_str = match_add.group(1)
         elements = []
-        matches = re.findall(r"add\((.+?)\)", adds_str)
+        matches = ADD_CALL_PATTERN.findall(adds_str)
         for match in matches:
             value_str = match.strip()
             if nested_type == "char":
@@ -111,7 +124,7 @@ def parse_arraylist(input_str: str, nested_type=None) -> List:
             elements.append(value)
         return elements
 
-    match_empty = re.search(r"new\s+ArrayList<\w*>\(\)", input_str)
+    match_empty = EMPTY_ARRAYLIST_PATTERN.search(input_str)
     if match_empty:
         return []  # Return an empty list for an empty ArrayList
 
@@ -119,7 +132,7 @@ def parse_arraylist(input_str: str, nested_type=None) -> List:
 
 
 def parse_array(input_str: str, nested_type=None) -> List:
-    match = re.search(r"new\s+\w+\[\]\s*\{(.*?)\}", input_str)
+    match = ARRAY_PATTERN.search(input_str)
     if match:
         elements_str = match.group(1)
         if nested_type:
@@ -142,20 +155,18 @@ def parse_array(input_str: str, nested_type=None) -> List:
 
 def parse_hashmap(input_str: str) -> Dict:
     elements = {}
-    match = re.search(
-        r"new\s+HashMap<.*?>\s*\(\)\s*\{\s*\{?\s*(.*?)\s*\}?\s*\}", input_str, re.DOTALL
-    )
+    match = HASHMAP_PATTERN.search(input_str)
     if match:
         puts_str = match.group(1)
         if puts_str.strip():
-            matches = re.findall(r"put\(\"(.*?)\",\s*(.*?)\)", puts_str)
+            matches = PUT_CALL_PATTERN.findall(puts_str)
             for match in matches:
                 key = match[0]
                 value = parse_java_value(match[1].strip())
                 elements[key] = value
         return elements
 
-    match_empty = re.search(r"new\s+HashMap<.*?>\s*\(\)", input_str)
+    match_empty = EMPTY_HASHMAP_PATTERN.search(input_str)
     if match_empty:
         return {}  # Return an empty dictionary for an empty HashMap
 
@@ -173,11 +184,11 @@ def parse_java_value(value_str: str):
     elif value_str.startswith('"') and value_str.endswith('"'):
         return value_str[1:-1]
     # check if it's a long
-    elif re.match(r"^-?\d+[lL]$", value_str):
+    elif LONG_PATTERN.match(value_str):
         return int(value_str[:-1])
     # check if it's a float
-    elif re.match(r"^-?\d+(\.\d+)?([eE][+-]?\d+)?[fF]$", value_str):
-        return float(re.sub(r"[fF]$", "", value_str))
+    elif FLOAT_PATTERN.match(value_str):
+        return float(FLOAT_SUFFIX_PATTERN.sub("", value_str))
     # check if it's a integer-like and float-like types (including byte, short, integer, double, etc)
     else:
         try:
@@ -1,6 +1,18 @@
 import re
 from bfcl.constants.type_mappings import JS_TYPE_CONVERSION
 
+# Compiled once at import; the converters run for every parameter of every JavaScript entry checked
+INTEGER_PATTERN = re.compile(r"^-?\d+$")
+FLOAT_PATTERN = re.compile(r"^-?\d+(\.\d+)?$")
+BIGINT_PATTERN = re.compile(r"^-?\d+n$")
+ARRAY_2D_PATTERN = re.compile(
+    r"\[\s*\[.*?\]\s*(,\s*\[.*?\]\s*)*\]|\bnew\s+Array\(\s*\[.*?\]\s*(,\s*\[.*?\]\s*)*\)"
+)
+INNER_ARRAY_PATTERN = re.compile(r"\[(.*?)\]")
+ARRAY_PATTERN = re.compile(r"\[(.*?)\]|\bnew\s+Array\((.*?)\)")
+DICT_PATTERN = re.compile(r"\{(.*?)\}")
+DICT_PAIR_PATTERN = re.compile(r"([^:]+):\s*(.*?)(?:,\s*(?=[^,]+:)|$)")
+
 
 def js_type_converter(value, expected_type, nested_type=None):
     if expected_type not in JS_TYPE_CONVERSION:
@@ -14,15 +26,15 @@ def js_type_converter(value, expected_type, nested_type=None):
         return value[1:-1]
 
     elif expected_type == "integer":
-        if not re.match(r"^-?\d+$", value):
+        if not INTEGER_PATTERN.match(value):
             return str(value)  # default to string
         return int(value)
     elif expected_type == "float":
-        if not re.match(r"^-?\d+(\.\d+)?$", value):
+        if not FLOAT_PATTERN.match(value):
             return str(value)  # default to string
         return float(value)
     elif expected_type == "Bigint":
-        if not re.match(r"^-?\d+n$", value):
+        if not BIGINT_PATTERN.match(value):
             return str(value)  # default to string
         return int(value[:-1])
     elif expected_type == "Boolean":
@@ -42,16 +54,12 @@ def js_type_converter(value, expected_type, nested_type=None):
 def parse_js_collection(code, type_str, nested_type=None):
     code = code.strip()
     if type_str == "array":
-        # Regular expression patterns
-        array_2d_pattern = r"\[\s*\[.*?\]\s*(,\s*\[.*?\]\s*)*\]|\bnew\s+Array\(\s*\[.*?\]\s*(,\s*\[.*?\]\s*)*\)"
-        array_pattern = r"\[(.*?)\]|\bnew\s+Array\((.*?)\)"
-
         # Check if the code is a 2D array
-        array_2d_match = re.match(array_2d_pattern, code)
+        array_2d_match = ARRAY_2D_PATTERN.match(code)
         try:
             if array_2d_match:
                 elements_str = array_2d_match.group(0)
-                inner_arrays = re.findall(r"\[(.*?)\]", elements_str)
+                inner_arrays = INNER_ARRAY_PATTERN.findall(elements_str)
                 elements = []
                 for idx, inner_array_str in enumerate(inner_arrays):
                     inner_array_str = inner_array_str.strip()
@@ -68,7 +76,7 @@ def parse_js_collection(code, type_str, nested_type=None):
                 return elements
 
             # Check if the code is a 1D array
-            array_match = re.match(array_pattern, code)
+            array_match = ARRAY_PATTERN.match(code)
             if array_match:
                 if array_match.group(1) is not None:
                     elements_str = array_match.group(1).strip()
@@ -104,13 +112,12 @@ def parse_js_collection(code, type_str, nested_type=None):
     elif type_str == "dict":
         if code == "{}":
             return {}  # Return an empty dictionary for an empty object
-        dict_pattern = r"\{(.*?)\}"
         # Check if the code is a dictionary
-        dict_match = re.match(dict_pattern, code)
+        dict_match = DICT_PATTERN.match(code)
         if dict_match:
             try:
                 content = dict_match.group(1)
-                pairs = re.findall(r"([^:]+):\s*(.*?)(?:,\s*(?=[^,]+:)|$)", content)
+                pairs = DICT_PAIR_PATTERN.findall(content)
                 dictionary = {}
                 for key, value in pairs:
                     key = key.strip().strip("'\"")
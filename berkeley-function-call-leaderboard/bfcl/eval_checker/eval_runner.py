@@ -1,4 +1,7 @@
 import argparse
+import copy
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
 
 from bfcl.constants.category_mapping import (
     TEST_COLLECTION_MAPPING,
@@ -13,33 +16,121 @@ from bfcl.constants.eval_config import (
     RESULT_PATH,
     SCORE_PATH,
 )
+from bfcl.dataset import (
+    find_dataset_file,
+    get_dataset_entry_count,
+    get_dataset_range,
+    has_compiled_dataset,
+    load_dataset_file,
+)
 from bfcl.eval_checker.ast_eval.ast_checker import ast_checker
+from bfcl.eval_checker.ast_eval.possible_answer import compile_possible_answers
 from bfcl.eval_checker.eval_runner_helper import *
 from bfcl.eval_checker.multi_turn_eval.multi_turn_checker import (
     multi_turn_checker,
     multi_turn_irrelevance_checker,
 )
-from bfcl.eval_checker.multi_turn_eval.multi_turn_utils import is_empty_execute_response
+from bfcl.eval_checker.multi_turn_eval.multi_turn_utils import (
+    is_empty_execute_response,
+    release_multi_turn_instances,
+)
+from bfcl.eval_checker.score_cache import get_score_cache, score_with_cache
+from bfcl.eval_checker.score_store import get_score_store
 from bfcl.constants.model_config import MODEL_CONFIG_MAPPING
+from bfcl.model_handler.result_store import compact_result_dir
 from bfcl.model_handler.utils import set_prompt_variation, get_res_fmt
 from bfcl.utils import *
 from dotenv import load_dotenv
 from tqdm import tqdm
 
+# With `--num-workers`, each category is split into shards of this many entries, so that large categories are spread over several workers.
+# Multi-turn entries are much more expensive to evaluate than single-turn ones, so their shards are smaller.
+EVAL_SHARD_SIZE = 200
+MULTI_TURN_EVAL_SHARD_SIZE = 20
+
+# Per-process caches, so that a worker process only builds each handler and loads each test file once
+_WORKER_HANDLERS = {}
+_WORKER_TEST_DATA = {}
 
 def get_handler(model_name):
-    return MODEL_CONFIG_MAPPING[model_name].model_handler(
+    return MODEL_CONFIG_MAPPING[model_name].get_model_handler()(
         model_name, temperature=0
     )  # Temperature doesn't matter for evaluation
 
 
+def write_score_file(result, correct_count, model_result, model_name, test_category, score_dir):
+    """
+    Write the score file of one category, with the accuracy summary as its first entry, followed by the records of the failed entries.
+    The summary and the outcome of each entry are also indexed in the score store.
+    """
+    total_count = len(model_result)
+    accuracy = correct_count / total_count
+    header = {
+        "accuracy": accuracy,
+        "correct_count": correct_count,
+        "total_count": total_count,
+    }
+    output_file_name = f"{VERSION_PREFIX}_{test_category}_score.json"
+    output_file_dir = score_dir / model_name
+    # Streamed, rather than copying the (possibly large) records into a new list behind the header
+    write_list_of_dicts_to_file(output_file_name, chain([header], result), output_file_dir)
+
+    get_score_store().record_category(
+        output_file_dir / output_file_name,
+        model_name,
+        test_category,
+        accuracy,
+        correct_count,
+        total_count,
+        test_entry_ids=[entry["id"] for entry in model_result],
+        failed_records=result,
+    )
+
+    return accuracy, total_count
+
+
 def multi_turn_runner(
-    handler, model_result, prompt, possible_answer, model_name, test_category, score_dir
+    handler,
+    model_result,
+    prompt,
+    possible_answer,
+    model_name,
+    test_category,
+    score_dir,
+    use_score_cache=True,
 ):
     assert (
         len(model_result) == len(prompt) == len(possible_answer)
     ), f"The length of the model result ({len(model_result)}) does not match the length of the prompt ({len(prompt)}) or possible answer ({len(possible_answer)}). Please check the input files for completeness."
 
+    def shard_runner(model_result, prompt, possible_answer):
+        return multi_turn_shard_runner(
+            handler, model_result, prompt, possible_answer, model_name, test_category
+        )
+
+    result, correct_count, _ = run_shard_with_score_cache(
+        shard_runner,
+        handler,
+        model_name,
+        test_category,
+        None,
+        model_result,
+        prompt,
+        possible_answer,
+        use_score_cache,
+    )
+    return write_score_file(
+        result, correct_count, model_result, model_name, test_category, score_dir
+    )
+
+
+def multi_turn_shard_runner(
+    handler, model_result, prompt, possible_answer, model_name, test_category
+):
+    """
+    Evaluate a (contiguous) slice of the entries of a multi-turn category.
+    Returns the score records of the failed entries and the number of correct entries.
+    """
     result = []
     correct_count = 0
     for i in range(len(model_result)):
@@ -119,13 +210,17 @@ def multi_turn_runner(
             )
 
         # Check if the model output the correct function calls
-        accuracy_checker_result = multi_turn_checker(
-            multi_turn_model_result_list_decoded,
-            multi_turn_ground_truth_list,
-            test_entry,
-            test_category,
-            model_name,
-        )
+        try:
+            accuracy_checker_result = multi_turn_checker(
+                multi_turn_model_result_list_decoded,
+                multi_turn_ground_truth_list,
+                test_entry,
+                test_category,
+                model_name,
+            )
+        finally:
+            # Free the simulated API instances of this entry
+            release_multi_turn_instances(model_name, index, is_evaL_run=True)
 
         # Perform additional check for multi-turn irrelevance
         # This happens when the model is expected to not output any function calls in a certain turn due to miss parameters or miss functions
@@ -150,25 +245,32 @@ def multi_turn_runner(
         else:
             correct_count += 1
 
-    accuracy = correct_count / len(model_result)
-    result.insert(
-        0,
-        {
-            "accuracy": accuracy,
-            "correct_count": correct_count,
-            "total_count": len(model_result),
-        },
-    )
-    output_file_name = f"{VERSION_PREFIX}_{test_category}_score.json"
-    output_file_dir = score_dir / model_name
-    write_list_of_dicts_to_file(output_file_name, result, output_file_dir)
-
-    return accuracy, len(model_result)
+    return result, correct_count
 
 
 def relevance_file_runner(
-    handler, model_result, prompt, model_name, test_category, score_dir
+    handler, model_result, prompt, model_name, test_category, score_dir, use_score_cache=True
 ):
+    def shard_runner(model_result, prompt, possible_answer):
+        return relevance_shard_runner(handler, model_result, prompt, model_name, test_category)
+
+    result, correct_count, _ = run_shard_with_score_cache(
+        shard_runner,
+        handler,
+        model_name,
+        test_category,
+        None,
+        model_result,
+        prompt,
+        None,
+        use_score_cache,
+    )
+    return write_score_file(
+        result, correct_count, model_result, model_name, test_category, score_dir
+    )
+
+
+def relevance_shard_runner(handler, model_result, prompt, model_name, test_category):
     # This function serves for both relevance and irrelevance tests, which share the exact opposite logic.
     # If `test_category` is "irrelevance", the model is expected to output no function call.
     # No function call means either the AST decoding fails (a error message is generated) or the decoded AST does not contain any function call (such as a empty list, `[]`).
@@ -225,20 +327,7 @@ def relevance_file_runner(
 
             result.append(temp)
 
-    accuracy = correct_count / len(model_result)
-    result.insert(
-        0,
-        {
-            "accuracy": accuracy,
-            "correct_count": correct_count,
-            "total_count": len(model_result),
-        },
-    )
-    output_file_name = f"{VERSION_PREFIX}_{test_category}_score.json"
-    output_file_dir = score_dir / model_name
-    write_list_of_dicts_to_file(output_file_name, result, output_file_dir)
-
-    return accuracy, len(model_result)
+    return result, correct_count
 
 
 def ast_file_runner(
@@ -250,11 +339,52 @@ def ast_file_runner(
     test_category,
     model_name,
     score_dir,
+    use_score_cache=True,
 ):
     assert (
         len(model_result) == len(prompt) == len(possible_answer)
     ), f"The length of the model result ({len(model_result)}) does not match the length of the prompt ({len(prompt)}) or possible answer ({len(possible_answer)}). Please check the input files for completeness."
 
+    def shard_runner(model_result, prompt, possible_answer):
+        return ast_shard_runner(
+            handler,
+            model_result,
+            prompt,
+            possible_answer,
+            language,
+            test_category,
+            model_name,
+        )
+
+    result, correct_count, _ = run_shard_with_score_cache(
+        shard_runner,
+        handler,
+        model_name,
+        test_category,
+        language,
+        model_result,
+        prompt,
+        possible_answer,
+        use_score_cache,
+    )
+    return write_score_file(
+        result, correct_count, model_result, model_name, test_category, score_dir
+    )
+
+
+def ast_shard_runner(
+    handler,
+    model_result,
+    prompt,
+    possible_answer,
+    language,
+    test_category,
+    model_name,
+):
+    """
+    Evaluate a (contiguous) slice of the entries of a single-turn AST category.
+    Returns the score records of the failed entries and the number of correct entries.
+    """
     result = []
     correct_count = 0
     for i in range(len(model_result)):
@@ -327,24 +457,19 @@ def ast_file_runner(
             temp["possible_answer"] = possible_answer_item
             result.append(temp)
 
-    accuracy = correct_count / len(model_result)
-    result.insert(
-        0,
-        {
-            "accuracy": accuracy,
-            "correct_count": correct_count,
-            "total_count": len(model_result),
-        },
-    )
-    output_file_name = f"{VERSION_PREFIX}_{test_category}_score.json"
-    output_file_dir = score_dir / model_name
-    write_list_of_dicts_to_file(output_file_name, result, output_file_dir)
-
-    return accuracy, len(model_result)
+    return result, correct_count
 
 
 #### Main runner function ####
-def runner(model_names, test_categories, result_dir, score_dir, prompt_variation=None):
+def runner(
+    model_names,
+    test_categories,
+    result_dir,
+    score_dir,
+    prompt_variation=None,
+    num_workers=1,
+    use_score_cache=True,
+):
 
     # State udpated by each eval subtask.
     state = dict(
@@ -360,6 +485,9 @@ def runner(model_names, test_categories, result_dir, score_dir, prompt_variation
     # Filter out the subdirectories
     subdirs = [entry for entry in entries if entry.is_dir()]
 
+    # (model_name, model_name_escaped, test_category, model_result) to evaluate in parallel, when `num_workers` > 1
+    evaluation_tasks = []
+
     # Traverse each subdirectory
     for subdir in tqdm(subdirs, desc="Number of models evaluated"):
 
@@ -371,12 +499,24 @@ def runner(model_names, test_categories, result_dir, score_dir, prompt_variation
 
         print(f"🦍 Model: {model_name}")
 
+        # Finalize the result files of a generation run that was interrupted before it could do so itself
+        compact_result_dir(subdir)
+
         # Find and process all JSON files in the subdirectory
         for model_result_json in subdir.glob("*.json"):
             test_category = extract_test_category(model_result_json)
             if test_category not in test_categories:
                 continue
 
+            if num_workers > 1:
+                if is_chatable(test_category) or is_sql(test_category) or is_executable(test_category):
+                    continue
+                model_result = load_file(model_result_json, sort_by_id=True)
+                evaluation_tasks.append(
+                    (model_name, model_name_escaped, test_category, model_result)
+                )
+                continue
+
             handler = get_handler(model_name_escaped)
 
             # We don't evaluate the following categories in the current iteration of the benchmark
@@ -394,8 +534,17 @@ def runner(model_names, test_categories, result_dir, score_dir, prompt_variation
                 handler,
                 state,
                 prompt_variation,
+                use_score_cache,
             )
 
+    if evaluation_tasks:
+        state = evaluate_tasks_in_parallel(
+            evaluation_tasks, score_dir, state, prompt_variation, num_workers, use_score_cache
+        )
+
+    if use_score_cache:
+        print(get_score_cache().summary())
+
     # This function reads all the score files from local folder and updates the
     # leaderboard table. This is helpful when you only want to run the
     # evaluation for a subset of models and test categories.
@@ -421,21 +570,293 @@ def runner(model_names, test_categories, result_dir, score_dir, prompt_variation
     return state
 
 
-def evaluate_task(
+def evaluate_tasks_in_parallel(
+    evaluation_tasks, score_dir, state, prompt_variation, num_workers, use_score_cache=True
+):
+    """
+    Evaluate (model, category) pairs on a pool of worker processes.
+    Each category is split into contiguous shards of entries. The per-entry score records of the shards are merged
+    back in shard order, so the score files are identical to the ones produced by a serial run.
+    """
+    # Load the test files once in the parent process. On platforms that fork, the workers inherit them instead of
+    # each parsing them again; elsewhere the workers load them lazily. A compiled category is not loaded: each worker
+    # only reads the entries of its shards from the compiled dataset.
+    for _, _, test_category, _ in evaluation_tasks:
+        if not has_compiled_dataset(find_dataset_file(PROMPT_PATH, test_category)):
+            load_test_data(test_category)
+
+    all_shard_futures = []
+    with ProcessPoolExecutor(max_workers=num_workers) as executor:
+        for model_name, model_name_escaped, test_category, model_result in evaluation_tasks:
+            shard_size = (
+                MULTI_TURN_EVAL_SHARD_SIZE if is_multi_turn(test_category) else EVAL_SHARD_SIZE
+            )
+            shard_futures = [
+                executor.submit(
+                    evaluate_shard,
+                    model_name,
+                    model_name_escaped,
+                    test_category,
+                    model_result[start_index : start_index + shard_size],
+                    start_index,
+                    len(model_result),
+                    prompt_variation,
+                    use_score_cache,
+                )
+                for start_index in range(0, len(model_result), shard_size)
+            ]
+            all_shard_futures.append(shard_futures)
+
+        for (model_name, _, test_category, model_result), shard_futures in tqdm(
+            zip(evaluation_tasks, all_shard_futures),
+            total=len(evaluation_tasks),
+            desc="Number of categories evaluated",
+        ):
+            result = []
+            correct_count = 0
+            # Always merge in shard order, regardless of which shard finished first
+            for future in shard_futures:
+                (
+                    shard_result,
+                    shard_correct_count,
+                    shard_cache_lookups,
+                    (shard_cost_data, shard_latency_data),
+                ) = future.result()
+                result.extend(shard_result)
+                correct_count += shard_correct_count
+                get_score_cache().record_lookups(*shard_cache_lookups)
+                merge_cost_latency_stats(
+                    state["leaderboard_table"], model_name, shard_cost_data, shard_latency_data
+                )
+
+            accuracy, total_count = write_score_file(
+                result, correct_count, model_result, model_name, test_category, score_dir
+            )
+            record_result(state, model_name, test_category, accuracy, total_count)
+            print(
+                f"✅ Test completed: {model_name}, {test_category}. 🎯 Accuracy: {accuracy}"
+            )
+
+    return state
+
+
+def load_test_data(test_category):
+    """
+    Load the prompt and possible answer (None for relevance categories) of a category, sorted by id. Cached per process.
+    """
+    if test_category not in _WORKER_TEST_DATA:
+        # The shards work on deep copies, so the shared dataset entries can be used as is
+        prompt = sorted(
+            load_dataset_file(find_dataset_file(PROMPT_PATH, test_category)), key=sort_key
+        )
+        possible_answer = None
+        if not is_relevance_or_irrelevance(test_category):
+            possible_answer = sorted(
+                load_dataset_file(find_dataset_file(POSSIBLE_ANSWER_PATH, test_category)),
+                key=sort_key,
+            )
+            if not is_multi_turn(test_category):
+                # Standardize the accepted values once, rather than for every model output checked against them
+                possible_answer = compile_possible_answers(possible_answer)
+        _WORKER_TEST_DATA[test_category] = (prompt, possible_answer)
+    return _WORKER_TEST_DATA[test_category]
+
+
+def load_test_data_range(test_category, start_index, end_index):
+    """
+    The prompt and possible answer (None for relevance categories) of the entries `start_index` to `end_index` of a
+    category, sorted by id, as copies the caller may modify. When the category is compiled (see `bfcl data compile`),
+    only these entries are read, from the compiled dataset; otherwise they are sliced from `load_test_data`.
+    """
+    if test_category not in _WORKER_TEST_DATA:
+        prompt = get_dataset_range(
+            find_dataset_file(PROMPT_PATH, test_category), start_index, end_index
+        )
+        possible_answer = None
+        if prompt is not None and not is_relevance_or_irrelevance(test_category):
+            possible_answer = get_dataset_range(
+                find_dataset_file(POSSIBLE_ANSWER_PATH, test_category), start_index, end_index
+            )
+            if possible_answer is None:
+                prompt = None
+            elif not is_multi_turn(test_category):
+                possible_answer = compile_possible_answers(possible_answer)
+        if prompt is not None:
+            return prompt, possible_answer
+
+    prompt, possible_answer = load_test_data(test_category)
+    # The runners may modify the test entries (eg, remove the function doc), so don't let that leak into the cache
+    prompt = copy.deepcopy(prompt[start_index:end_index])
+    if possible_answer is not None:
+        possible_answer = possible_answer[start_index:end_index]
+        if is_multi_turn(test_category):
+            possible_answer = copy.deepcopy(possible_answer)
+    return prompt, possible_answer
+
+
+def evaluate_shard(
+    model_name,
+    model_name_escaped,
     test_category,
-    result_dir,
-    score_dir,
     model_result,
-    model_name,
-    handler,
-    state,
+    start_index,
+    total_count,
     prompt_variation=None,
+    use_score_cache=True,
 ):
+    """
+    Evaluate the entries `start_index` to `start_index + len(model_result)` of a category. Runs in a worker process.
+    Returns the score records of the failed entries, the number of correct entries, the number of score cache hits
+    and misses of the shard, and its token count and latency statistics (to be merged into those of the model).
+    """
+    return (
+        *score_shard(
+            model_name,
+            model_name_escaped,
+            test_category,
+            model_result,
+            start_index,
+            total_count,
+            prompt_variation,
+            use_score_cache,
+        ),
+        compute_cost_latency_stats(model_result),
+    )
 
-    # Set prompt variation globally if provided
+
+def score_shard(
+    model_name,
+    model_name_escaped,
+    test_category,
+    model_result,
+    start_index,
+    total_count,
+    prompt_variation=None,
+    use_score_cache=True,
+):
+    # Worker processes don't share the prompt variation of the parent process
     if prompt_variation:
         set_prompt_variation(prompt_variation)
-    
+
+    language = get_evaluation_language(test_category, prompt_variation)
+
+    if model_name_escaped not in _WORKER_HANDLERS:
+        _WORKER_HANDLERS[model_name_escaped] = get_handler(model_name_escaped)
+    handler = _WORKER_HANDLERS[model_name_escaped]
+
+    end_index = start_index + len(model_result)
+    prompt, possible_answer = load_test_data_range(test_category, start_index, end_index)
+
+    if is_relevance_or_irrelevance(test_category):
+
+        def shard_runner(model_result, prompt, possible_answer):
+            return relevance_shard_runner(handler, model_result, prompt, model_name, test_category)
+
+        return run_shard_with_score_cache(
+            shard_runner,
+            handler,
+            model_name,
+            test_category,
+            None,
+            model_result,
+            prompt,
+            None,
+            use_score_cache,
+        )
+
+    prompt_count = get_dataset_entry_count(find_dataset_file(PROMPT_PATH, test_category))
+    possible_answer_count = get_dataset_entry_count(
+        find_dataset_file(POSSIBLE_ANSWER_PATH, test_category)
+    )
+    assert (
+        total_count == prompt_count == possible_answer_count
+    ), f"The length of the model result ({total_count}) does not match the length of the prompt ({prompt_count}) or possible answer ({possible_answer_count}). Please check the input files for completeness."
+
+    if is_multi_turn(test_category):
+
+        def shard_runner(model_result, prompt, possible_answer):
+            return multi_turn_shard_runner(
+                handler, model_result, prompt, possible_answer, model_name, test_category
+            )
+
+        return run_shard_with_score_cache(
+            shard_runner,
+            handler,
+            model_name,
+            test_category,
+            None,
+            model_result,
+            prompt,
+            possible_answer,
+            use_score_cache,
+        )
+
+    def shard_runner(model_result, prompt, possible_answer):
+        return ast_shard_runner(
+            handler,
+            model_result,
+            prompt,
+            possible_answer,
+            language,
+            test_category,
+            model_name,
+        )
+
+    # The AST checker only reads the possible answers
+    return run_shard_with_score_cache(
+        shard_runner,
+        handler,
+        model_name,
+        test_category,
+        language,
+        model_result,
+        prompt,
+        possible_answer,
+        use_score_cache,
+    )
+
+
+def run_shard_with_score_cache(
+    shard_runner,
+    handler,
+    model_name,
+    test_category,
+    language,
+    model_result,
+    prompt,
+    possible_answer,
+    use_score_cache,
+):
+    """
+    Run a shard runner through the score cache, unless disabled, so that only the entries whose inputs changed are
+    scored. Also returns the number of cache hits and misses, for a worker process to report them to the parent process.
+    """
+    if not use_score_cache:
+        return (*shard_runner(model_result, prompt, possible_answer), (0, 0))
+
+    score_cache = get_score_cache()
+    hit_count, miss_count = score_cache.hit_count, score_cache.miss_count
+    result, correct_count = score_with_cache(
+        shard_runner,
+        handler,
+        model_name,
+        test_category,
+        language,
+        model_result,
+        prompt,
+        possible_answer,
+    )
+    return (
+        result,
+        correct_count,
+        (score_cache.hit_count - hit_count, score_cache.miss_count - miss_count),
+    )
+
+
+def get_evaluation_language(test_category, prompt_variation=None):
+    """
+    Determine the language the model output should be decoded in. Assumes the prompt variation has already been set.
+    """
     # Determine language based on prompt_variation or test_category
     if prompt_variation:
         # Get the response format from the prompt variation
@@ -457,26 +878,46 @@ def evaluate_task(
             language = "Java"
         if is_js(test_category):
             language = "JavaScript"
+    return language
+
+
+def evaluate_task(
+    test_category,
+    result_dir,
+    score_dir,
+    model_result,
+    model_name,
+    handler,
+    state,
+    prompt_variation=None,
+    use_score_cache=True,
+):
+
+    # Set prompt variation globally if provided
+    if prompt_variation:
+        set_prompt_variation(prompt_variation)
+
+    language = get_evaluation_language(test_category, prompt_variation)
 
     print(f"🔍 Running test: {test_category}")
 
     record_cost_latency(state["leaderboard_table"], model_name, model_result)
 
     # Find the corresponding test file.
-    prompt_file = find_file_with_suffix(PROMPT_PATH, test_category)
+    prompt_file = find_dataset_file(PROMPT_PATH, test_category)
     prompt = load_file(prompt_file, sort_by_id=True)
 
     if is_relevance_or_irrelevance(test_category):
         accuracy, total_count = relevance_file_runner(
-            handler, model_result, prompt, model_name, test_category, score_dir
+            handler, model_result, prompt, model_name, test_category, score_dir, use_score_cache
         )
 
     else:
-        # Find the corresponding possible answer file
-        possible_answer_file = find_file_with_suffix(POSSIBLE_ANSWER_PATH, test_category)
-        possible_answer = load_file(possible_answer_file, sort_by_id=True)
-
         if is_multi_turn(test_category):
+            # Find the corresponding possible answer file
+            possible_answer_file = find_dataset_file(POSSIBLE_ANSWER_PATH, test_category)
+            possible_answer = load_file(possible_answer_file, sort_by_id=True)
+
             accuracy, total_count = multi_turn_runner(
                 handler,
                 model_result,
@@ -485,10 +926,13 @@ def evaluate_task(
                 model_name,
                 test_category,
                 score_dir,
+                use_score_cache,
             )
 
         # Single turn test
         else:
+            # Loaded and compiled once per category, and shared by all the models evaluated
+            possible_answer = load_test_data(test_category)[1]
             accuracy, total_count = ast_file_runner(
                 handler,
                 model_result,
@@ -498,6 +942,7 @@ def evaluate_task(
                 test_category,
                 model_name,
                 score_dir,
+                use_score_cache,
             )
 
     record_result(state, model_name, test_category, accuracy, total_count)
@@ -506,7 +951,15 @@ def evaluate_task(
     return state
 
 
-def main(model, test_categories, result_dir, score_dir, prompt_variation=None):
+def main(
+    model,
+    test_categories,
+    result_dir,
+    score_dir,
+    prompt_variation=None,
+    num_workers=1,
+    use_score_cache=True,
+):
     if result_dir is None:
         result_dir = RESULT_PATH
     else:
@@ -534,7 +987,15 @@ def main(model, test_categories, result_dir, score_dir, prompt_variation=None):
             model_names.append(model_name.replace("/", "_"))
 
     # Driver function to run the evaluation for all categories involved.
-    runner(model_names, all_test_categories, result_dir, score_dir, prompt_variation)
+    runner(
+        model_names,
+        all_test_categories,
+        result_dir,
+        score_dir,
+        prompt_variation,
+        num_workers,
+        use_score_cache,
+    )
 
     print(
         f"🏁 Evaluation completed. See {score_dir / 'data_overall.csv'} for overall evaluation results on BFCL V3."
@@ -570,6 +1031,18 @@ if __name__ == "__main__":
         type=str,
         help="Path to the folder where the evaluation score files will be stored; relative to the `berkeley-function-call-leaderboard` root folder",
     )
+    parser.add_argument(
+        "--num-workers",
+        default=1,
+        type=int,
+        help="The number of worker processes to evaluate with",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        default=False,
+        help="Score every entry, without reading or updating the score cache",
+    )
 
     args = parser.parse_args()
 
@@ -579,4 +1052,6 @@ if __name__ == "__main__":
         args.test_category,
         args.result_dir,
         args.score_dir,
+        num_workers=args.num_workers,
+        use_score_cache=not args.no_cache,
     )
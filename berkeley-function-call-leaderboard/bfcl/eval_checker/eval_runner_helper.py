@@ -1,15 +1,14 @@
 import os
-import statistics
 from datetime import datetime
 from pathlib import Path
 
-import numpy as np
-import pandas as pd
 from bfcl.constants.category_mapping import TEST_FILE_MAPPING
 from bfcl.constants.column_headers import *
 from bfcl.constants.eval_config import *
 from bfcl.constants.model_config import MODEL_CONFIG_MAPPING
-from bfcl.utils import extract_test_category, load_file
+from bfcl.dataset import get_dataset_entry_count
+from bfcl.eval_checker.score_store import get_score_store
+from bfcl.eval_checker.streaming_stats import QuantileSketch, RunningStats
 
 
 def calculate_weighted_accuracy(accuracy_dict_list, display_na_if_category_missing=True):
@@ -71,35 +70,62 @@ def record_result(leaderboard_table, model_name, test_category, accuracy, total_
     }
 
 
-def record_cost_latency(leaderboard_table, model_name, model_output_data):
-    def process_data(key, data, output_list):
+def new_cost_data():
+    return {"input_data": RunningStats(), "output_data": RunningStats()}
+
+
+def new_latency_data():
+    return {"data": RunningStats(), "quantiles": QuantileSketch()}
+
+
+def compute_cost_latency_stats(model_output_data):
+    """
+    The token count and latency statistics of some result entries, accumulated as the entries are read (the values
+    themselves are not kept). The statistics of different entries, e.g. the shards of a category evaluated by different
+    worker processes, are combined with `merge_cost_latency_stats`.
+    """
+
+    def iter_values(key, data):
         # All entries are either a list of list (in multi-turn), or a single value (in single-turn)
         if key in data:
             if isinstance(data[key], list) and all(
                 isinstance(inner_item, list) for inner_item in data[key]
             ):
-                flattened_list = sum(data[key], [])
-                output_list.extend([item for item in flattened_list if item != 0])
+                for inner_item in data[key]:
+                    yield from (item for item in inner_item if item != 0)
             else:
                 if data[key] != 0:
-                    output_list.append(data[key])
+                    yield data[key]
+
+    cost_data = new_cost_data()
+    latency_data = new_latency_data()
+    for data in model_output_data:
+        for latency in iter_values("latency", data):
+            latency_data["data"].add(latency)
+            latency_data["quantiles"].add(latency)
+        cost_data["input_data"].update(iter_values("input_token_count", data))
+        cost_data["output_data"].update(iter_values("output_token_count", data))
+    return cost_data, latency_data
+
 
+def merge_cost_latency_stats(leaderboard_table, model_name, cost_data, latency_data):
     if model_name not in leaderboard_table:
         leaderboard_table[model_name] = {}
-        leaderboard_table[model_name]["cost"] = {"input_data": [], "output_data": []}
-        leaderboard_table[model_name]["latency"] = {"data": []}
+    model_table = leaderboard_table[model_name]
+    if "cost" not in model_table:
+        model_table["cost"] = new_cost_data()
+        model_table["latency"] = new_latency_data()
 
-    input_token = []
-    output_token = []
-    latency = []
-    for data in model_output_data:
-        process_data("latency", data, latency)
-        process_data("input_token_count", data, input_token)
-        process_data("output_token_count", data, output_token)
+    for stats_name, stats in cost_data.items():
+        model_table["cost"][stats_name].merge(stats)
+    for stats_name, stats in latency_data.items():
+        model_table["latency"][stats_name].merge(stats)
 
-    leaderboard_table[model_name]["cost"]["input_data"].extend(input_token)
-    leaderboard_table[model_name]["cost"]["output_data"].extend(output_token)
-    leaderboard_table[model_name]["latency"]["data"].extend(latency)
+
+def record_cost_latency(leaderboard_table, model_name, model_output_data):
+    merge_cost_latency_stats(
+        leaderboard_table, model_name, *compute_cost_latency_stats(model_output_data)
+    )
 
 
 def get_cost_letency_info(model_name, cost_data, latency_data):
@@ -108,22 +134,23 @@ def get_cost_letency_info(model_name, cost_data, latency_data):
 
     if (
         model_config.input_price is not None
-        and len(cost_data["input_data"]) > 0
-        and len(cost_data["output_data"]) > 0
+        and cost_data["input_data"].count > 0
+        and cost_data["output_data"].count > 0
     ):
 
-        mean_input_token = statistics.mean(cost_data["input_data"])
-        mean_output_token = statistics.mean(cost_data["output_data"])
+        mean_input_token = cost_data["input_data"].mean
+        mean_output_token = cost_data["output_data"].mean
         cost = (
             mean_input_token * model_config.input_price
             + mean_output_token * model_config.output_price
         ) / 1000
         cost = round(cost, 2)
 
-    if len(latency_data["data"]) != 0:
-        mean_latency = statistics.mean(latency_data["data"])
-        std_latency = statistics.stdev(latency_data["data"])
-        percentile_95_latency = np.percentile(latency_data["data"], 95)
+    if latency_data["data"].count != 0:
+        mean_latency = latency_data["data"].mean
+        # 0 for a single value, rather than failing
+        std_latency = latency_data["data"].stdev
+        percentile_95_latency = latency_data["quantiles"].quantile(0.95)
         mean_latency = round(mean_latency, 2)
         std_latency = round(std_latency, 2)
         percentile_95_latency = round(percentile_95_latency, 2)
@@ -141,7 +168,7 @@ def get_category_score(score_dict: dict, test_category: str) -> dict:
         return score
     else:
         test_file_path = TEST_FILE_MAPPING[test_category]
-        num_entry = len(load_file(PROMPT_PATH / test_file_path))
+        num_entry = get_dataset_entry_count(PROMPT_PATH / test_file_path)
         # If a category is not being evaluated, it needs to be distinguished from the situation where the evaluation score is 0
         # It will still be considered 0 in the overall score calculation though
         # We use `display_accuracy` to special handle
@@ -191,8 +218,8 @@ def generate_leaderboard_csv(
         model_name_escaped = model_name.replace("_", "/")
         model_config = MODEL_CONFIG_MAPPING[model_name_escaped]
 
-        cost_data = value.get("cost", {"input_data": [], "output_data": []})
-        latency_data = value.get("latency", {"data": []})
+        cost_data = value.get("cost", new_cost_data())
+        latency_data = value.get("latency", new_latency_data())
         cost, latency_mean, latency_std, percentile_95_latency = get_cost_letency_info(
             model_name_escaped, cost_data, latency_data
         )
@@ -416,6 +443,7 @@ def generate_leaderboard_csv(
 
     wandb_project = os.getenv("WANDB_BFCL_PROJECT")
     if wandb_project and wandb_project != "ENTITY:PROJECT":
+        import pandas as pd
         import wandb
 
         # Initialize WandB run
@@ -473,23 +501,15 @@ def update_leaderboard_table_with_local_score_file(
     leaderboard_table, score_path: Path
 ) -> None:
 
-    entries = score_path.iterdir()
-
-    # Filter out the subdirectories
-    subdirs = [entry for entry in entries if entry.is_dir()]
+    # The summaries come from the score store; only the score files that changed since they were indexed are read
+    category_scores = get_score_store().sync_score_dir(score_path)
 
-    # Traverse each subdirectory
-    for subdir in subdirs:
-        model_name = subdir.relative_to(score_path).name
-        # Find and process all JSON files in the subdirectory
-        for model_score_json in subdir.glob("*.json"):
-            metadata = load_file(model_score_json)[0]
-            accuracy, total_count = metadata["accuracy"], metadata["total_count"]
-            test_category = extract_test_category(model_score_json)
+    for model_name, model_category_scores in category_scores.items():
+        for test_category, metadata in model_category_scores.items():
             if model_name not in leaderboard_table:
                 leaderboard_table[model_name] = {}
             if test_category not in leaderboard_table[model_name]:
                 leaderboard_table[model_name][test_category] = {
-                    "accuracy": accuracy,
-                    "total_count": total_count,
+                    "accuracy": metadata["accuracy"],
+                    "total_count": metadata["total_count"],
                 }
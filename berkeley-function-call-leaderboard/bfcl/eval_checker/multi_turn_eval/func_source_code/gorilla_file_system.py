@@ -1,10 +1,14 @@
 import datetime
 import subprocess
-from copy import deepcopy
 from typing import Dict, List, Optional, Union
 
 from bfcl.eval_checker.multi_turn_eval.func_source_code.long_context import (
     FILE_CONTENT_EXTENSION, FILES_TAIL_USED, POPULATE_FILE_EXTENSION)
+from bfcl.eval_checker.multi_turn_eval.func_source_code.state_snapshot import (
+    StateSnapshotMixin,
+    restore_state,
+    snapshot_state,
+)
 
 
 class File:
@@ -58,6 +62,10 @@ class File:
             return False
         return self.name == other.name and self.content == other.content
 
+    def _get_fingerprint_state(self) -> tuple:
+        # The fields that `__eq__` compares
+        return self.name, self.content
+
 
 class Directory:
 
@@ -130,11 +138,17 @@ class Directory:
             return False
         return self.name == other.name and self.contents == other.contents
 
+    def _get_fingerprint_state(self) -> tuple:
+        # The fields that `__eq__` compares; not the parent, which would make the state cyclic
+        return self.name, self.contents
+
 
 DEFAULT_STATE = {"root": Directory("/", None)}
+# Restored for every scenario load, instead of deep-copying the default state each time
+DEFAULT_STATE_SNAPSHOT = snapshot_state(DEFAULT_STATE)
 
 
-class GorillaFileSystem:
+class GorillaFileSystem(StateSnapshotMixin):
 
     def __init__(self) -> None:
         """
@@ -189,7 +203,7 @@ class GorillaFileSystem:
             }
         }
         """
-        DEFAULT_STATE_COPY = deepcopy(DEFAULT_STATE)
+        DEFAULT_STATE_COPY = restore_state(DEFAULT_STATE_SNAPSHOT)
         self.long_context = long_context
         self.root = DEFAULT_STATE_COPY["root"]
         if "root" in scenario:
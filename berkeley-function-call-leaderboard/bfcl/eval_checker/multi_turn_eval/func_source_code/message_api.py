@@ -1,7 +1,12 @@
 import random
-from copy import deepcopy
 from typing import Dict, List, Optional, Union
 
+from bfcl.eval_checker.multi_turn_eval.func_source_code.state_snapshot import (
+    StateSnapshotMixin,
+    restore_state,
+    snapshot_state,
+)
+
 DEFAULT_STATE = {
     "generated_ids": set(),
     "user_count": 4,
@@ -25,9 +30,11 @@ DEFAULT_STATE = {
     "message_count": 3,
     "current_user": None,
 }
+# Restored for every scenario load, instead of deep-copying the default state each time
+DEFAULT_STATE_SNAPSHOT = snapshot_state(DEFAULT_STATE)
 
 
-class MessageAPI:
+class MessageAPI(StateSnapshotMixin):
     """
     A class representing a Message API for managing user interactions in a workspace.
 
@@ -73,7 +80,7 @@ class MessageAPI:
         Args:
             scenario (Dict): A dictionary containing message data.
         """
-        DEFAULT_STATE_COPY = deepcopy(DEFAULT_STATE)
+        DEFAULT_STATE_COPY = restore_state(DEFAULT_STATE_SNAPSHOT)
         self._random = random.Random((scenario.get("random_seed", 200191)))
         self.generated_ids = scenario.get(
             "generated_ids", DEFAULT_STATE_COPY["generated_ids"]
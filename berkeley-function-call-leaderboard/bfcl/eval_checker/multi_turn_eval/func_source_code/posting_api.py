@@ -1,6 +1,11 @@
-from copy import deepcopy
 from typing import Dict, List, Optional, Union
 
+from bfcl.eval_checker.multi_turn_eval.func_source_code.state_snapshot import (
+    StateSnapshotMixin,
+    restore_state,
+    snapshot_state,
+)
+
 DEFAULT_STATE = {
     "username": "john",
     "password": "john123",
@@ -11,9 +16,11 @@ DEFAULT_STATE = {
     "following_list": ["alice", "bob"],
     "tweet_counter": 0,
 }
+# Restored for every scenario load, instead of deep-copying the default state each time
+DEFAULT_STATE_SNAPSHOT = snapshot_state(DEFAULT_STATE)
 
 
-class TwitterAPI:
+class TwitterAPI(StateSnapshotMixin):
     def __init__(self):
         self.username: str
         self.password: str
@@ -32,7 +39,7 @@ class TwitterAPI:
         Args:
             scenario (dict): A dictionary containing Twitter data.
         """
-        DEFAULT_STATE_COPY = deepcopy(DEFAULT_STATE)
+        DEFAULT_STATE_COPY = restore_state(DEFAULT_STATE_SNAPSHOT)
         self.username = scenario.get("username", DEFAULT_STATE_COPY["username"])
         self.password = scenario.get("password", DEFAULT_STATE_COPY["password"])
         self.authenticated = scenario.get(
@@ -0,0 +1,167 @@
+import copy
+import datetime
+import decimal
+import hashlib
+import inspect
+import io
+import pickle
+import types
+from functools import wraps
+from typing import Optional
+
+FINGERPRINT_DIGEST_SIZE = 16
+# Compared by value, and pickled by value
+_VALUE_TYPES = (
+    str,
+    bytes,
+    int,
+    float,
+    list,
+    tuple,
+    dict,
+    set,
+    frozenset,
+    datetime.date,
+    datetime.time,
+    datetime.timedelta,
+    datetime.tzinfo,
+    decimal.Decimal,
+)
+
+
+def snapshot_state(state) -> bytes:
+    """
+    Take a compact, immutable snapshot of some state (an API instance, a scenario, a default state, ...).
+    The state only holds plain data (dicts, lists, strings, numbers, files and directories, datetimes), which pickle
+    copies several times faster than `copy.deepcopy`, while preserving shared and circular references the same way.
+    """
+    return pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def restore_state(snapshot: bytes):
+    """Return a new, independent copy of the state that the snapshot was taken from."""
+    return pickle.loads(snapshot)
+
+
+def fast_deepcopy(state):
+    """A drop-in replacement for `copy.deepcopy` of the API states."""
+    try:
+        return restore_state(snapshot_state(state))
+    except Exception:
+        # Not picklable (not the case for the built-in APIs); fall back to the slow path
+        return copy.deepcopy(state)
+
+
+def _identity(object_id: int) -> None:
+    """Stands for an object compared by identity in a fingerprint; never called."""
+
+
+class _FingerprintPickler(pickle.Pickler):
+    """
+    Encodes a state into bytes that are only equal for states that compare equal:
+    - without the memo, so that a value is encoded the same whether or not it is shared with another part of the state;
+    - an object that defines `_get_fingerprint_state` is encoded by the fields it returns, which are the ones its
+      `__eq__` compares (e.g. not the parent of a directory, nor the modification time of a file);
+    - any other object is compared by identity, so it is encoded by its id.
+    """
+
+    def reducer_override(self, obj):
+        if isinstance(obj, (type, types.FunctionType, types.BuiltinFunctionType, *_VALUE_TYPES)):
+            return NotImplemented
+        get_fingerprint_state = getattr(obj, "_get_fingerprint_state", None)
+        if get_fingerprint_state is not None:
+            return type(obj), get_fingerprint_state()
+        return _identity, (id(obj),)
+
+
+def fingerprint_state(state) -> Optional[bytes]:
+    """
+    A digest of some state, such that two states with the same digest compare equal. The converse doesn't always hold
+    (e.g. the same dict entries inserted in a different order), so different digests only mean the states have to be
+    compared in full. None if the state can't be fingerprinted (e.g. it is cyclic).
+    """
+    buffer = io.BytesIO()
+    pickler = _FingerprintPickler(buffer, protocol=pickle.HIGHEST_PROTOCOL)
+    pickler.fast = True
+    try:
+        pickler.dump(state)
+    except Exception:
+        return None
+    return hashlib.blake2b(buffer.getvalue(), digest_size=FINGERPRINT_DIGEST_SIZE).digest()
+
+
+def _invalidates_state_fingerprint(method):
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            # Anything reachable from the instance may have changed
+            self._state_fingerprint = None
+
+    return wrapper
+
+
+class StateSnapshotMixin:
+    """
+    Snapshot, restore and fingerprint for the stateful API classes.
+
+    The fingerprint of an instance is a hash of the fingerprints of its public attributes, which are the state that the
+    checker compares. It is kept until the state changes: every public method (as well as `_load_scenario`) and every
+    assignment to a public attribute discards it. The ground truth instances are fingerprinted once, when their
+    execution is cached, and the fingerprint is stored with their snapshot. A model instance is never fingerprinted on
+    its own (hashing its state would cost more than comparing it); once it is found equal to a ground truth instance,
+    it takes that instance's fingerprint, so that as long as no call touches it, the next check against the same
+    ground truth state is a compare of the fingerprints.
+
+    The methods are private on purpose: every public method of an API class is exposed to the model as a function.
+    """
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        for name, member in list(vars(cls).items()):
+            if inspect.isfunction(member) and (not name.startswith("_") or name == "_load_scenario"):
+                setattr(cls, name, _invalidates_state_fingerprint(member))
+
+    def __setattr__(self, name: str, value) -> None:
+        if not name.startswith("_"):
+            object.__setattr__(self, "_state_fingerprint", None)
+        object.__setattr__(self, name, value)
+
+    def _get_state_fingerprint(self) -> Optional[bytes]:
+        fingerprint = self.__dict__.get("_state_fingerprint")
+        if fingerprint is None:
+            digest = hashlib.blake2b(digest_size=FINGERPRINT_DIGEST_SIZE)
+            for attr_name in sorted(vars(self)):
+                if attr_name.startswith("_"):
+                    continue
+                attr_fingerprint = fingerprint_state(getattr(self, attr_name))
+                if attr_fingerprint is None:
+                    return None
+                digest.update(attr_name.encode("utf-8"))
+                digest.update(attr_fingerprint)
+            fingerprint = digest.digest()
+            self._state_fingerprint = fingerprint
+        return fingerprint
+
+    def _has_state_fingerprint(self, fingerprint: Optional[bytes]) -> bool:
+        """Whether the instance is known to be in the state of that fingerprint, without fingerprinting it."""
+        return fingerprint is not None and self.__dict__.get("_state_fingerprint") == fingerprint
+
+    def _adopt_state_fingerprint(self, fingerprint: Optional[bytes]) -> None:
+        """Take the fingerprint of an instance whose state was just found equal to this one's."""
+        self._state_fingerprint = fingerprint
+
+    def _snapshot(self) -> bytes:
+        return snapshot_state(self)
+
+    def _restore(self, snapshot: bytes) -> None:
+        """Bring this instance back to the state of the snapshot."""
+        self.__dict__.clear()
+        self.__dict__.update(restore_state(snapshot).__dict__)
+
+    def _copy_public_state(self) -> dict:
+        """A copy of the public attributes, which are the state that the checker compares and the state log records."""
+        return fast_deepcopy(
+            {key: value for key, value in vars(self).items() if not key.startswith("_")}
+        )
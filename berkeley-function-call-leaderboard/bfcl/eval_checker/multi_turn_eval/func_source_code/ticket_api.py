@@ -1,14 +1,21 @@
-from copy import deepcopy
 from typing import Dict, List, Optional, Union
 
+from bfcl.eval_checker.multi_turn_eval.func_source_code.state_snapshot import (
+    StateSnapshotMixin,
+    restore_state,
+    snapshot_state,
+)
+
 DEFAULT_STATE = {
     "ticket_queue": [],
     "ticket_counter": 1,
     "current_user": None,
 }
+# Restored for every scenario load, instead of deep-copying the default state each time
+DEFAULT_STATE_SNAPSHOT = snapshot_state(DEFAULT_STATE)
 
 
-class TicketAPI:
+class TicketAPI(StateSnapshotMixin):
     """
     A class representing the Ticket API for managing support tickets.
 
@@ -39,7 +46,7 @@ class TicketAPI:
         Args:
             scenario (Dict): A dictionary containing ticket data.
         """
-        DEFAULT_STATE_COPY = deepcopy(DEFAULT_STATE)
+        DEFAULT_STATE_COPY = restore_state(DEFAULT_STATE_SNAPSHOT)
         self.ticket_queue = scenario.get("ticket_queue", DEFAULT_STATE_COPY["ticket_queue"])
         self.ticket_counter = scenario.get(
             "ticket_counter", DEFAULT_STATE_COPY["ticket_counter"]
@@ -1,5 +1,4 @@
 import random
-from copy import deepcopy
 from datetime import datetime, time, timedelta
 from typing import Dict, List, Optional, Union
 
@@ -12,6 +11,11 @@ from bfcl.eval_checker.multi_turn_eval.func_source_code.long_context import (
     TRANSACTION_HISTORY_EXTENSION,
     WATCH_LIST_EXTENSION,
 )
+from bfcl.eval_checker.multi_turn_eval.func_source_code.state_snapshot import (
+    StateSnapshotMixin,
+    restore_state,
+    snapshot_state,
+)
 
 CURRENT_TIME = datetime(2024, 9, 1, 10, 30)
 
@@ -125,9 +129,11 @@ DEFAULT_STATE = {
     "transaction_history": [],
     "random_seed": 1053520,
 }
+# Restored for every scenario load, instead of deep-copying the default state each time
+DEFAULT_STATE_SNAPSHOT = snapshot_state(DEFAULT_STATE)
 
 
-class TradingBot:
+class TradingBot(StateSnapshotMixin):
     """
     A class representing a trading bot for executing stock trades and managing a trading account.
 
@@ -163,7 +169,7 @@ class TradingBot:
         Args:
             scenario (dict): A scenario dictionary containing data to load.
         """
-        DEFAULT_STATE_COPY = deepcopy(DEFAULT_STATE)
+        DEFAULT_STATE_COPY = restore_state(DEFAULT_STATE_SNAPSHOT)
         self.orders = scenario.get("orders", DEFAULT_STATE_COPY["orders"])
         # Convert all string keys that can be interpreted as integers to integer keys
         self.orders = {
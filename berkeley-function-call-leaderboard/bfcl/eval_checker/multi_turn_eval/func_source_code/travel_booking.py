@@ -1,10 +1,14 @@
 import random
-from copy import deepcopy
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple, Union
 
 from bfcl.eval_checker.multi_turn_eval.func_source_code.long_context import (
     BOOKING_RECORD_EXTENSION, CREDIT_CARD_EXTENSION)
+from bfcl.eval_checker.multi_turn_eval.func_source_code.state_snapshot import (
+    StateSnapshotMixin,
+    restore_state,
+    snapshot_state,
+)
 
 DEFAULT_STATE = {
     "random_seed": 141053,
@@ -18,9 +22,11 @@ DEFAULT_STATE = {
     "user_last_name": None,
     "budget_limit": None,
 }
+# Restored for every scenario load, instead of deep-copying the default state each time
+DEFAULT_STATE_SNAPSHOT = snapshot_state(DEFAULT_STATE)
 
 
-class TravelAPI:
+class TravelAPI(StateSnapshotMixin):
     # Adapted from source : https://developer.concur.com/api-reference/
     def __init__(self):
         super().__init__()
@@ -45,7 +51,7 @@ class TravelAPI:
         Args:
             scenario (Dict[str, str]): The scenario to load
         """
-        DEFAULT_STATE_COPY = deepcopy(DEFAULT_STATE)
+        DEFAULT_STATE_COPY = restore_state(DEFAULT_STATE_SNAPSHOT)
         self._random = random.Random(
             (scenario.get("random_seed", DEFAULT_STATE_COPY["random_seed"]))
         )
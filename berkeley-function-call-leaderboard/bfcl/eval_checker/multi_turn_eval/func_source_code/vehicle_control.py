@@ -1,5 +1,4 @@
 import random
-from copy import deepcopy
 from typing import Dict, List, Union
 
 from bfcl.eval_checker.multi_turn_eval.func_source_code.long_context import (
@@ -8,6 +7,11 @@ from bfcl.eval_checker.multi_turn_eval.func_source_code.long_context import (
     LONG_WEATHER_EXTENSION,
     PARKING_BRAKE_INSTRUCTION,
 )
+from bfcl.eval_checker.multi_turn_eval.func_source_code.state_snapshot import (
+    StateSnapshotMixin,
+    restore_state,
+    snapshot_state,
+)
 
 MAX_FUEL_LEVEL = 50
 MIN_FUEL_LEVEL = 0.0
@@ -45,9 +49,11 @@ DEFAULT_STATE = {
     "rearLeftTirePressure": 30.0,
     "rearRightTirePressure": 30.0,
 }
+# Restored for every scenario load, instead of deep-copying the default state each time
+DEFAULT_STATE_SNAPSHOT = snapshot_state(DEFAULT_STATE)
 
 
-class VehicleControlAPI:
+class VehicleControlAPI(StateSnapshotMixin):
 
     def __init__(self):
         """
@@ -84,7 +90,7 @@ class VehicleControlAPI:
         Args:
             scenario (Dict): The scenario to load.
         """
-        DEFAULT_STATE_COPY = deepcopy(DEFAULT_STATE)
+        DEFAULT_STATE_COPY = restore_state(DEFAULT_STATE_SNAPSHOT)
         self._random = random.Random(
             (scenario.get("random_seed", DEFAULT_STATE_COPY["random_seed"]))
         )
@@ -0,0 +1,232 @@
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterator, Optional
+
+from bfcl.constants.eval_config import GROUND_TRUTH_EXECUTION_CACHE_PATH
+from bfcl.eval_checker.multi_turn_eval.func_source_code.state_snapshot import (
+    StateSnapshotMixin,
+    restore_state,
+    snapshot_state,
+)
+from bfcl.eval_checker.multi_turn_eval.multi_turn_utils import (
+    execute_multi_turn_func_call,
+    release_multi_turn_instances,
+)
+
+CACHE_FILE_NAME = "ground_truth_execution.sqlite"
+# Bump this whenever the key derivation or the stored value layout changes, so stale entries are never returned
+CACHE_FORMAT_VERSION = 1
+# Several evaluation worker processes may write to the cache at once
+SQLITE_BUSY_TIMEOUT = 60  # seconds
+GROUND_TRUTH_MODEL_NAME = "ground_truth"
+
+MULTI_TURN_EVAL_DIR = Path(__file__).parent
+# The modules whose code determines the outcome of executing a ground truth trajectory
+EXECUTION_SOURCE_FILES = [MULTI_TURN_EVAL_DIR / "multi_turn_utils.py"] + sorted(
+    (MULTI_TURN_EVAL_DIR / "func_source_code").glob("*.py")
+)
+
+
+@lru_cache(maxsize=1)
+def get_execution_source_hash() -> str:
+    """A hash of the code of the multi-turn backend classes (and of the executor), so that editing them invalidates the cache."""
+    digest = hashlib.sha256()
+    for source_file in EXECUTION_SOURCE_FILES:
+        digest.update(source_file.name.encode("utf-8"))
+        digest.update(source_file.read_bytes())
+    return digest.hexdigest()
+
+
+class GroundTruthExecutionCache:
+    """
+    A persistent cache of the execution of the ground truth trajectory of multi-turn entries.
+
+    The ground truth never changes between runs, but the checker used to execute it again for every model, every prompt
+    variation and every `bfcl evaluate` run. For each entry, the execution results of every turn are stored together
+    with a pickled snapshot of the instances at the end of that turn, which is all the checker compares the model
+    against. The key is a hash of the test entry id, the entry content (initial config, involved classes and ground
+    truth calls) and the code of the backend classes, so changing any of them is a cache miss.
+
+    The cache is backed by a single SQLite file that the worker processes of an evaluation share. Entries are also kept
+    in memory for the lifetime of the process, so a process never executes the same trajectory twice.
+    """
+
+    def __init__(self, cache_dir: Path) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.cache_path = self.cache_dir / CACHE_FILE_NAME
+
+        self.hit_count = 0
+        self.miss_count = 0
+        self._entries: dict[str, list[tuple[list[str], bytes]]] = {}
+        self._lock = threading.Lock()
+        self._connection = None
+        self._connection_pid = None
+
+    def _get_connection(self) -> Optional[sqlite3.Connection]:
+        # A connection must not be shared with a forked worker process; each process opens its own
+        if self._connection_pid != os.getpid():
+            self._connection_pid = os.getpid()
+            try:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                self._connection = sqlite3.connect(
+                    self.cache_path,
+                    timeout=SQLITE_BUSY_TIMEOUT,
+                    check_same_thread=False,
+                    isolation_level=None,
+                )
+                self._connection.execute("PRAGMA journal_mode=WAL")
+                self._connection.execute(
+                    "CREATE TABLE IF NOT EXISTS executions (key TEXT PRIMARY KEY, test_entry_id TEXT, value BLOB)"
+                )
+            except (OSError, sqlite3.Error):
+                # e.g. a read-only checkout; the in-memory cache still applies
+                self._connection = None
+        return self._connection
+
+    @staticmethod
+    def compute_key(
+        test_entry: dict, multi_turn_ground_truth_list: list[list[str]], long_context: bool
+    ) -> str:
+        serialized_entry = json.dumps(
+            [
+                CACHE_FORMAT_VERSION,
+                get_execution_source_hash(),
+                test_entry["id"],
+                test_entry["initial_config"],
+                test_entry["involved_classes"],
+                multi_turn_ground_truth_list,
+                long_context,
+            ],
+            sort_keys=True,
+        )
+        return hashlib.sha256(serialized_entry.encode("utf-8")).hexdigest()
+
+    def _load(self, key: str) -> Optional[list[tuple[list[str], bytes]]]:
+        with self._lock:
+            if key in self._entries:
+                return self._entries[key]
+            connection = self._get_connection()
+            if connection is None:
+                return None
+            try:
+                row = connection.execute(
+                    "SELECT value FROM executions WHERE key = ?", (key,)
+                ).fetchone()
+            except sqlite3.Error:
+                return None
+        if row is None:
+            return None
+        try:
+            turns = pickle.loads(row[0])
+        except Exception:
+            return None
+        with self._lock:
+            self._entries[key] = turns
+        return turns
+
+    def _store(self, key: str, test_entry_id: str, turns: list[tuple[list[str], bytes]]) -> None:
+        with self._lock:
+            self._entries[key] = turns
+            connection = self._get_connection()
+            if connection is None:
+                return
+            try:
+                connection.execute(
+                    "INSERT OR REPLACE INTO executions (key, test_entry_id, value) VALUES (?, ?, ?)",
+                    (key, test_entry_id, pickle.dumps(turns, protocol=pickle.HIGHEST_PROTOCOL)),
+                )
+            except sqlite3.Error:
+                pass
+
+    def get_or_execute(
+        self, test_entry: dict, multi_turn_ground_truth_list: list[list[str]], long_context: bool
+    ) -> list[tuple[list[str], bytes]]:
+        """
+        The execution results and the pickled instance snapshot of every turn of the ground truth trajectory.
+        On a miss, the whole trajectory is executed once and stored.
+        """
+        key = self.compute_key(test_entry, multi_turn_ground_truth_list, long_context)
+        turns = self._load(key)
+        if turns is not None:
+            with self._lock:
+                self.hit_count += 1
+            return turns
+
+        with self._lock:
+            self.miss_count += 1
+        turns = _execute_ground_truth(test_entry, multi_turn_ground_truth_list, long_context)
+        self._store(key, test_entry["id"], turns)
+        return turns
+
+    def summary(self) -> str:
+        total = self.hit_count + self.miss_count
+        hit_rate = self.hit_count / total if total else 0
+        return f"Ground truth execution cache: {self.hit_count} hits, {self.miss_count} misses ({hit_rate:.1%} hit rate). Stored at {self.cache_path}"
+
+
+def _execute_ground_truth(
+    test_entry: dict, multi_turn_ground_truth_list: list[list[str]], long_context: bool
+) -> list[tuple[list[str], bytes]]:
+    initial_config: dict = test_entry["initial_config"]
+    involved_classes: list = test_entry["involved_classes"]
+    test_entry_id: str = test_entry["id"]
+
+    turns = []
+    try:
+        for single_turn_ground_truth_list in multi_turn_ground_truth_list:
+            execution_results, ground_truth_instances = execute_multi_turn_func_call(
+                func_call_list=single_turn_ground_truth_list,
+                initial_config=initial_config,
+                involved_classes=involved_classes,
+                model_name=GROUND_TRUTH_MODEL_NAME,
+                test_entry_id=test_entry_id,
+                long_context=long_context,
+                is_evaL_run=True,
+            )
+            # Fingerprinted before the snapshot, so that the fingerprints are stored with it, and the checker compares
+            # the model instances against them without going through the ground truth state again
+            for instance in ground_truth_instances.values():
+                if isinstance(instance, StateSnapshotMixin):
+                    instance._get_state_fingerprint()
+            # The instances keep changing over the next turns, so the state at the end of this turn is snapshotted
+            turns.append(
+                (
+                    execution_results,
+                    snapshot_state(ground_truth_instances),
+                )
+            )
+    finally:
+        release_multi_turn_instances(GROUND_TRUTH_MODEL_NAME, test_entry_id, is_evaL_run=True)
+    return turns
+
+
+_GROUND_TRUTH_EXECUTION_CACHE: Optional[GroundTruthExecutionCache] = None
+
+
+def get_ground_truth_execution_cache() -> GroundTruthExecutionCache:
+    """Return the process-wide cache."""
+    global _GROUND_TRUTH_EXECUTION_CACHE
+    if _GROUND_TRUTH_EXECUTION_CACHE is None:
+        _GROUND_TRUTH_EXECUTION_CACHE = GroundTruthExecutionCache(GROUND_TRUTH_EXECUTION_CACHE_PATH)
+    return _GROUND_TRUTH_EXECUTION_CACHE
+
+
+def iter_ground_truth_execution(
+    test_entry: dict, multi_turn_ground_truth_list: list[list[str]], long_context: bool
+) -> Iterator[tuple[list[str], dict]]:
+    """
+    Yield the execution results and the instances of the ground truth at the end of each turn.
+    The snapshots are only unpickled when the checker gets to that turn; most failing entries stop at an early turn.
+    """
+    turns = get_ground_truth_execution_cache().get_or_execute(
+        test_entry, multi_turn_ground_truth_list, long_context
+    )
+    for execution_results, pickled_instances in turns:
+        # Copied, as the checker may attach the results to the score record
+        yield list(execution_results), restore_state(pickled_instances)
@@ -0,0 +1,91 @@
+import pickle
+import threading
+from collections import OrderedDict
+from typing import Callable
+
+# Safety net for entries that are never released (e.g. a crashed worker); far more than the number of entries in flight,
+# which is bounded by the number of generation threads. Normally every entry releases its scope when it is done.
+MAX_LIVE_SCOPES = 1024
+
+
+class InstanceRegistry:
+    """
+    Owns the instances of the simulated API classes (`GorillaFileSystem`, `TradingBot`, ...) used by multi-turn entries.
+
+    Instances are grouped in scopes, one per (model, test entry, scope token): within a scope, every call gets the same
+    instances, so that the state carries over between the steps and turns of the entry. The token is unique to each
+    inference, so that the same entry can be in flight more than once (e.g. under several prompt variations). The scope is released once the entry is done,
+    which frees its instances; scopes that are never released are evicted in least-recently-used order beyond
+    `max_scopes`.
+
+    The registry is shared by all worker threads of a process.
+    """
+
+    def __init__(self, max_scopes: int = MAX_LIVE_SCOPES) -> None:
+        self.max_scopes = max_scopes
+        self.evicted_scope_count = 0
+        # Mapping from scope to {instance name: instance}
+        self._scopes: OrderedDict[tuple, dict[str, object]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def acquire(self, scope: tuple, instance_name: str, create_instance: Callable) -> object:
+        """Return the instance of this name in the scope, creating it with `create_instance()` on first use."""
+        with self._lock:
+            instances = self._scopes.get(scope)
+            if instances is None:
+                instances = self._scopes[scope] = {}
+            self._scopes.move_to_end(scope)
+            if instance_name in instances:
+                return instances[instance_name]
+
+        # Loading a scenario can take a while (long context); it is done outside the lock.
+        # Only one thread works on a given entry at a time, so no one else creates the same instance meanwhile.
+        instance = create_instance()
+        with self._lock:
+            instances = self._scopes.setdefault(scope, {})
+            instances[instance_name] = instance
+            self._scopes.move_to_end(scope)
+
+            while len(self._scopes) > self.max_scopes:
+                self._scopes.popitem(last=False)
+                self.evicted_scope_count += 1
+        return instance
+
+    def release(self, scope: tuple) -> None:
+        with self._lock:
+            self._scopes.pop(scope, None)
+
+    def get_metrics(self) -> dict:
+        """
+        The number of live scopes and instances, and an estimate of the memory they retain (the size of their pickled
+        state, which is computed here; do not call this on a hot path).
+        """
+        with self._lock:
+            all_instances = [
+                instance for instances in self._scopes.values() for instance in instances.values()
+            ]
+            live_scope_count = len(self._scopes)
+
+        retained_bytes = 0
+        for instance in all_instances:
+            try:
+                retained_bytes += len(pickle.dumps(instance, protocol=pickle.HIGHEST_PROTOCOL))
+            except Exception:
+                continue
+
+        return {
+            "live_scope_count": live_scope_count,
+            "live_instance_count": len(all_instances),
+            "retained_bytes": retained_bytes,
+            "evicted_scope_count": self.evicted_scope_count,
+        }
+
+    def summary(self) -> str:
+        metrics = self.get_metrics()
+        return (
+            f"Multi-turn instance registry: {metrics['live_instance_count']} live instances in {metrics['live_scope_count']} entries "
+            f"(~{metrics['retained_bytes'] / 1024 / 1024:.1f} MiB retained), {metrics['evicted_scope_count']} entries evicted without release"
+        )
+
+
+INSTANCE_REGISTRY = InstanceRegistry()
@@ -1,3 +1,9 @@
+from bfcl.eval_checker.multi_turn_eval.func_source_code.state_snapshot import (
+    StateSnapshotMixin,
+)
+from bfcl.eval_checker.multi_turn_eval.ground_truth_cache import (
+    iter_ground_truth_execution,
+)
 from bfcl.eval_checker.multi_turn_eval.multi_turn_utils import (
     execute_multi_turn_func_call,
     is_empty_execute_response,
@@ -21,9 +27,15 @@ def multi_turn_checker(
     involved_classes: list = test_entry["involved_classes"]
     test_entry_id: str = test_entry["id"]
     test_category: str = test_entry_id.rsplit("_", 1)[0]
+    long_context: bool = "long_context" in test_category or "composite" in test_category
     execution_results: list[dict] = []
     all_turn_model_execution_results: list[str] = []
 
+    # The ground truth trajectory is the same for every model, so its execution is cached across models and runs
+    ground_truth_execution = iter_ground_truth_execution(
+        test_entry, multi_turn_ground_truth_list, long_context
+    )
+
     # First execute all the function calls
     for turn_index, single_turn_ground_truth_list in enumerate(
         multi_turn_ground_truth_list
@@ -45,28 +57,16 @@ def multi_turn_checker(
                     involved_classes=involved_classes,
                     model_name=model_name,
                     test_entry_id=test_entry_id,
-                    long_context=(
-                        "long_context" in test_category or "composite" in test_category
-                    ),
+                    long_context=long_context,
                     is_evaL_run=True,
                 )
             )
             single_turn_model_execution_results.extend(single_step_model_execution_results)
             single_turn_model_execution_results_uncombined.append(single_step_model_execution_results)
 
-        # Execute the ground truth function calls
-        single_turn_ground_truth_execution_results, ground_truth_instances = (
-            execute_multi_turn_func_call(
-                func_call_list=single_turn_ground_truth_list,
-                initial_config=initial_config,
-                involved_classes=involved_classes,
-                model_name=model_name + "_ground_truth",
-                test_entry_id=test_entry_id,
-                long_context=(
-                    "long_context" in test_category or "composite" in test_category
-                ),
-                is_evaL_run=True,
-            )
+        # Get the result of executing the ground truth function calls
+        single_turn_ground_truth_execution_results, ground_truth_instances = next(
+            ground_truth_execution
         )
 
         all_turn_model_execution_results.extend(single_turn_model_execution_results)
@@ -263,6 +263,14 @@ def _compare_instances(model_obect, ground_truth_object):
     assert type(model_obect) == type(
         ground_truth_object
     ), "Objects are not of the same type."
+    # A model instance that no call touched since it was found equal to the same ground truth state is still equal
+    # to it, which the fingerprints tell without comparing the states
+    ground_truth_fingerprint = None
+    if isinstance(model_obect, StateSnapshotMixin):
+        ground_truth_fingerprint = ground_truth_object._get_state_fingerprint()
+        if model_obect._has_state_fingerprint(ground_truth_fingerprint):
+            return True, {}
+
     differences = {}
     valid = True
     for attr_name in vars(ground_truth_object):
@@ -276,6 +284,8 @@ def _compare_instances(model_obect, ground_truth_object):
             valid = False
             differences[attr_name] = {"model": model_attr, "ground_truth": ground_truth_attr}
 
+    if valid and ground_truth_fingerprint is not None:
+        model_obect._adopt_state_fingerprint(ground_truth_fingerprint)
     return valid, differences
 
 
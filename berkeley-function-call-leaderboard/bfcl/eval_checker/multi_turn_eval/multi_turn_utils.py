@@ -1,8 +1,13 @@
+import ast
 import importlib
 import inspect
 import json
-import re
-import copy
+import operator
+from functools import lru_cache
+from typing import Optional
+
+from bfcl.eval_checker.multi_turn_eval.func_source_code.state_snapshot import fast_deepcopy
+from bfcl.eval_checker.multi_turn_eval.instance_registry import INSTANCE_REGISTRY
 
 CLASS_FILE_PATH_MAPPING = {
     "GorillaFileSystem": "bfcl.eval_checker.multi_turn_eval.func_source_code.gorilla_file_system",
@@ -20,6 +25,43 @@ STATELESS_CLASSES = [
     "MathAPI",
 ]
 
+# Never executed, even if an API class were to define a method of that name
+BLOCKED_FUNCTION_NAMES = ["kill", "exit", "quit", "remove", "unlink", "popen", "Popen", "run"]
+MAX_PARSED_FUNC_CALLS = 65536
+
+UNARY_OPERATORS = {
+    ast.UAdd: operator.pos,
+    ast.USub: operator.neg,
+    ast.Not: operator.not_,
+}
+# Arithmetic that models sometimes write in arguments (e.g. `amount=2*15.5`); no `**`, which can take forever
+BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+}
+# Everything else (attribute access, subscripts, comprehensions, lambdas, ...) is rejected before execution
+ALLOWED_NODE_TYPES = (
+    ast.Expression,
+    ast.Call,
+    ast.Name,
+    ast.Load,
+    ast.keyword,
+    ast.Starred,
+    ast.Constant,
+    ast.List,
+    ast.Tuple,
+    ast.Set,
+    ast.Dict,
+    ast.UnaryOp,
+    ast.BinOp,
+    *UNARY_OPERATORS,
+    *BINARY_OPERATORS,
+)
+
 
 def execute_multi_turn_func_call(
     func_call_list: list[str],  # a list of strings of func calls
@@ -29,6 +71,7 @@ def execute_multi_turn_func_call(
     test_entry_id: str,
     long_context: bool = False,
     is_evaL_run: bool = False,
+    instance_scope_token: Optional[str] = None,
 ) -> tuple[list[str], dict]:
     """
     TODO: Add docstring
@@ -36,61 +79,36 @@ def execute_multi_turn_func_call(
     if is_evaL_run:
         model_name += "_eval"
 
-    class_method_name_mapping = {}
+    # Mapping from method name to the instance that serves it; on a name clash, the class listed last wins
+    method_instance_mapping = {}
     involved_instances = {}
+    scope = _get_instance_scope(model_name, test_entry_id, instance_scope_token)
     for class_name in involved_classes:
-        module_name = CLASS_FILE_PATH_MAPPING[class_name]
-        # TODO: Handler the model name issue from handler more elegantly
-        instance_name = (
-            f"{model_name.replace('-', '_').replace('.', '_').replace('/', '_')}_{test_entry_id}_{class_name.lower()}_instance"
-        )
-        if instance_name not in globals():
-            module = importlib.import_module(module_name)
-            class_ = getattr(module, class_name)
-            class_instance = class_()
+        instance_name = _get_instance_name(model_name, test_entry_id, class_name)
+
+        def create_instance(class_name=class_name):
+            class_instance = _get_api_class(class_name)()
             if class_name not in STATELESS_CLASSES:
                 class_initial_config = initial_config.get(class_name, {})
                 # Deep copy the initial configuration to avoid mutation issues
                 class_instance._load_scenario(
-                    copy.deepcopy(class_initial_config), long_context=long_context
+                    fast_deepcopy(class_initial_config), long_context=long_context
                 )
-            globals()[instance_name] = class_instance
-        # This happens in subsequent turns
-        else:
-            class_instance = globals()[instance_name]
+            return class_instance
 
-        involved_instances[class_name] = class_instance
+        # In subsequent steps and turns, this is the instance created in the first one
+        class_instance = INSTANCE_REGISTRY.acquire(scope, instance_name, create_instance)
 
-        # Retrieve all method names and map them to the instance
-        for method_name, method in inspect.getmembers(
-            class_instance, predicate=inspect.ismethod
-        ):
-            # Skip private methods
-            if method_name.startswith("_"):
-                continue
-            class_method_name_mapping[method_name] = instance_name
+        involved_instances[class_name] = class_instance
+        for method_name in _get_method_table(class_name):
+            method_instance_mapping[method_name] = class_instance
 
     execution_results = []
     for func_call in func_call_list:
-        # Add the instance name to the method calls
-        func_call = _process_method_calls(func_call, class_method_name_mapping)
-
-        # Evaluate the function call
         try:
-            # We need to make a copy here because otherwise the `eval(func_call)` would error. 
-            func_call_copy = func_call
-            # Before calling `eval`, we need to make sure that the function call is safe
-            # We do so by checking if the function is `kill` or `exit`, etc.
-            # Extract the function name first
-            if "(" in func_call_copy:
-                func_call_copy = func_call_copy.split("(")[0]
-            # Situation where the function call is a method call
-            if "." in func_call_copy:
-                func_call_copy = func_call_copy.split(".")[1]
-            if func_call_copy in ["kill", "exit", "quit", "remove", "unlink", "popen", "Popen", "run"]:
-                raise Exception(f"Function call {func_call_copy} is not allowed.")
-
-            func_call_result = eval(func_call)
+            func_call_result = _evaluate_node(
+                _parse_func_call(func_call), method_instance_mapping
+            )
 
             if type(func_call_result) == str:
                 pass
@@ -110,6 +128,39 @@ def execute_multi_turn_func_call(
     return execution_results, involved_instances
 
 
+def release_multi_turn_instances(
+    model_name: str,
+    test_entry_id: str,
+    is_evaL_run: bool = False,
+    instance_scope_token: Optional[str] = None,
+) -> None:
+    """
+    Free the instances created by `execute_multi_turn_func_call` for this model, entry and scope token, once the entry
+    is done. The next call for the same model, entry and token starts again from the initial configuration.
+    """
+    if is_evaL_run:
+        model_name += "_eval"
+
+    INSTANCE_REGISTRY.release(_get_instance_scope(model_name, test_entry_id, instance_scope_token))
+
+
+def _get_instance_scope(
+    model_name: str, test_entry_id: str, instance_scope_token: Optional[str] = None
+) -> tuple[str, str, Optional[str]]:
+    # TODO: Handler the model name issue from handler more elegantly
+    # The token tells apart the inferences of the same entry that run at the same time (e.g. under several prompt variations)
+    return (
+        model_name.replace("-", "_").replace(".", "_").replace("/", "_"),
+        test_entry_id,
+        instance_scope_token,
+    )
+
+
+def _get_instance_name(model_name: str, test_entry_id: str, class_name: str) -> str:
+    escaped_model_name = _get_instance_scope(model_name, test_entry_id)[0]
+    return f"{escaped_model_name}_{test_entry_id}_{class_name.lower()}_instance"
+
+
 def is_empty_execute_response(input_list: list):
     if len(input_list) == 0:
         return True
@@ -118,39 +169,100 @@ def is_empty_execute_response(input_list: list):
     return False
 
 
-def _process_method_calls(function_call_string: str, instance_mapping: dict) -> str:
-    """
-    Prepends the instance name to the function name for each of the function name represented in the string, you will
-    also be provided with the mapping of method name to instance name.
+@lru_cache(maxsize=None)
+def _get_api_class(class_name: str) -> type:
+    module = importlib.import_module(CLASS_FILE_PATH_MAPPING[class_name])
+    return getattr(module, class_name)
 
-    Example input:
-    ```
-    f(x = g((1, 2), h(3)), y = (4), z = (5, 6))
-    ```
 
-    Example return:
-    ```
-    a.f(x=a.g((1, 2), a.h(3)), y=(4), z=(5, 6))
-    ```
+@lru_cache(maxsize=None)
+def _get_method_table(class_name: str) -> tuple[str, ...]:
+    """The names of the public methods of an API class, which are the functions the model can call. Built once per class."""
+    return tuple(
+        method_name
+        for method_name, _ in inspect.getmembers(
+            _get_api_class(class_name), predicate=inspect.isfunction
+        )
+        # Skip private methods
+        if not method_name.startswith("_")
+    )
 
-    Args:
-        function_call_string (str): The function call string to parse.
-        class_mapping (dict): A dictionary mapping method names to instance names.
 
-    Returns:
-        str: The parsed function call string with instance names prepended to method names.
+@lru_cache(maxsize=MAX_PARSED_FUNC_CALLS)
+def _parse_func_call(func_call: str) -> ast.expr:
     """
+    Parse and validate a function call string (e.g. `cd(folder='document')`). The same calls come up again and again
+    (every model executes the ground truth calls, among others), so the parsed trees are cached.
 
-    def replace_function(match):
-        func_name = match.group(1)
-        if func_name in instance_mapping:
-            return f"{instance_mapping[func_name]}.{func_name}"
-        return func_name
+    The call is only ever evaluated by `_evaluate_node`, which supports literals and calls to the API methods, so a
+    string that tries to do anything else (access attributes, import modules, call built-ins) is rejected here, before
+    anything is executed.
+    """
+    # The file name and the stripping of leading spaces are the ones of `eval`, so that syntax errors are reported the same way as before
+    tree = ast.parse(func_call.lstrip(" \t"), filename="<string>", mode="eval")
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call):
+            func_name = node.func.attr if isinstance(node.func, ast.Attribute) else getattr(node.func, "id", None)
+            if func_name in BLOCKED_FUNCTION_NAMES:
+                raise Exception(f"Function call {func_name} is not allowed.")
+        elif not isinstance(node, ALLOWED_NODE_TYPES):
+            raise Exception(
+                f"Unsupported expression `{ast.unparse(node)}` in function call {func_call}."
+            )
+    return tree.body
 
-    # Regular expression to match function names
-    pattern = r"\b([a-zA-Z_]\w*)\s*(?=\()"
 
-    # Replace function names with their class-prepended versions
-    processed_string = re.sub(pattern, replace_function, function_call_string)
+def _evaluate_node(node: ast.expr, method_instance_mapping: dict):
+    """Evaluate a node of a parsed function call, dispatching the calls to the bound methods of the API instances."""
+    if isinstance(node, ast.Constant):
+        return node.value
+    if isinstance(node, ast.Call):
+        if not isinstance(node.func, ast.Name):
+            # e.g. `ls()()`; only the bare method names are callable
+            raise Exception(f"Unsupported function call {ast.unparse(node.func)}.")
+        method_name = node.func.id
+        if method_name not in method_instance_mapping:
+            # Same error as `eval` for an unknown function
+            raise NameError(f"name '{method_name}' is not defined")
+        method = getattr(method_instance_mapping[method_name], method_name)
 
-    return processed_string
+        args = []
+        for arg in node.args:
+            if isinstance(arg, ast.Starred):
+                args.extend(_evaluate_node(arg.value, method_instance_mapping))
+            else:
+                args.append(_evaluate_node(arg, method_instance_mapping))
+        kwargs = {}
+        for keyword in node.keywords:
+            if keyword.arg is None:
+                kwargs.update(_evaluate_node(keyword.value, method_instance_mapping))
+            else:
+                kwargs[keyword.arg] = _evaluate_node(keyword.value, method_instance_mapping)
+        return method(*args, **kwargs)
+    if isinstance(node, ast.Name):
+        raise NameError(f"name '{node.id}' is not defined")
+    if isinstance(node, ast.List):
+        return [_evaluate_node(element, method_instance_mapping) for element in node.elts]
+    if isinstance(node, ast.Tuple):
+        return tuple(_evaluate_node(element, method_instance_mapping) for element in node.elts)
+    if isinstance(node, ast.Set):
+        return {_evaluate_node(element, method_instance_mapping) for element in node.elts}
+    if isinstance(node, ast.Dict):
+        result = {}
+        for key, value in zip(node.keys, node.values):
+            if key is None:
+                # `**mapping` inside a dict literal
+                result.update(_evaluate_node(value, method_instance_mapping))
+            else:
+                result[_evaluate_node(key, method_instance_mapping)] = _evaluate_node(
+                    value, method_instance_mapping
+                )
+        return result
+    if isinstance(node, ast.UnaryOp):
+        return UNARY_OPERATORS[type(node.op)](_evaluate_node(node.operand, method_instance_mapping))
+    if isinstance(node, ast.BinOp):
+        return BINARY_OPERATORS[type(node.op)](
+            _evaluate_node(node.left, method_instance_mapping),
+            _evaluate_node(node.right, method_instance_mapping),
+        )
+    raise Exception(f"Unsupported expression `{ast.unparse(node)}` in function call.")
@@ -0,0 +1,300 @@
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import sqlite3
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from bfcl.constants.eval_config import SCORE_CACHE_PATH
+from bfcl.model_handler.utils import get_prompt_variation
+
+CACHE_FILE_NAME = "score_cache.sqlite"
+# Bump this whenever the key derivation or the stored value layout changes, so stale entries are never returned
+CACHE_FORMAT_VERSION = 2
+# Several evaluation worker processes may write to the cache at once
+SQLITE_BUSY_TIMEOUT = 60  # seconds
+# SQLite limits the number of parameters of a single statement
+LOOKUP_BATCH_SIZE = 500
+
+BFCL_DIR = Path(__file__).parent.parent
+# The code that decides whether an entry is correct, and what its score record contains: the runners and checkers,
+# and the decoders shared by the model handlers
+CHECKER_SOURCE_FILES = sorted((BFCL_DIR / "eval_checker").rglob("*.py")) + sorted(
+    (BFCL_DIR / "model_handler" / "parser").glob("*.py")
+) + [BFCL_DIR / "model_handler" / "utils.py"]
+
+
+@lru_cache(maxsize=1)
+def get_checker_version() -> str:
+    """A hash of the code of the checkers, so that editing them invalidates every stored score."""
+    digest = hashlib.sha256()
+    for source_file in CHECKER_SOURCE_FILES:
+        digest.update(str(source_file.relative_to(BFCL_DIR)).encode("utf-8"))
+        digest.update(source_file.read_bytes())
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def get_handler_source_hash(handler_class: type) -> str:
+    """A hash of the modules defining the handler class and its bases, which implement `decode_ast` and `decode_execute`."""
+    digest = hashlib.sha256()
+    for cls in handler_class.__mro__:
+        try:
+            source_file = inspect.getsourcefile(cls)
+        except TypeError:
+            # Built-in classes, such as `object`
+            continue
+        if source_file is None:
+            continue
+        digest.update(cls.__qualname__.encode("utf-8"))
+        digest.update(Path(source_file).read_bytes())
+    return digest.hexdigest()
+
+
+class ScoreCache:
+    """
+    A persistent cache of the outcome of scoring each entry of a result file.
+
+    The key is a hash of the model name, the test category and the decoding language, the prompt variation (which
+    decides how the handler decodes a prompting model's response), the test entry id, the model result entry, the test
+    entry and its possible answer, and the version of the checker (a hash of its code and of the handler's decoder). The value is the list of score records the entry produced: empty when the entry is correct, the
+    error records otherwise. Re-evaluating a result file thus only runs the checkers on the entries whose inputs changed,
+    e.g. the few entries that were regenerated since the last evaluation.
+
+    The cache is backed by a single SQLite file that the worker processes of an evaluation share.
+    """
+
+    def __init__(self, cache_dir: Path) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.cache_path = self.cache_dir / CACHE_FILE_NAME
+
+        self.hit_count = 0
+        self.miss_count = 0
+        # The test entries are the same for every model evaluated, so they are only serialized once per process
+        self._test_entry_digests: dict[tuple[str, str], Optional[str]] = {}
+        self._lock = threading.Lock()
+        self._connection = None
+        self._connection_pid = None
+
+    def _get_connection(self) -> Optional[sqlite3.Connection]:
+        # A connection must not be shared with a forked worker process; each process opens its own
+        if self._connection_pid != os.getpid():
+            self._connection_pid = os.getpid()
+            try:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                self._connection = sqlite3.connect(
+                    self.cache_path,
+                    timeout=SQLITE_BUSY_TIMEOUT,
+                    check_same_thread=False,
+                    isolation_level=None,
+                )
+                self._connection.execute("PRAGMA journal_mode=WAL")
+                self._connection.execute(
+                    "CREATE TABLE IF NOT EXISTS scores (key TEXT PRIMARY KEY, model_name TEXT, test_entry_id TEXT, value BLOB)"
+                )
+            except (OSError, sqlite3.Error):
+                # e.g. a read-only checkout; every entry is then scored
+                self._connection = None
+        return self._connection
+
+    def _get_test_entry_digest(
+        self, test_category: str, test_entry: dict, possible_answer_entry: Optional[dict]
+    ) -> Optional[str]:
+        digest_key = (test_category, test_entry["id"])
+        if digest_key not in self._test_entry_digests:
+            try:
+                serialized_entry = json.dumps([test_entry, possible_answer_entry], sort_keys=True)
+            except (TypeError, ValueError):
+                self._test_entry_digests[digest_key] = None
+            else:
+                self._test_entry_digests[digest_key] = hashlib.sha256(
+                    serialized_entry.encode("utf-8")
+                ).hexdigest()
+        return self._test_entry_digests[digest_key]
+
+    def compute_key(
+        self,
+        handler,
+        model_name: str,
+        test_category: str,
+        language: Optional[str],
+        model_result_entry: dict,
+        test_entry: dict,
+        possible_answer_entry: Optional[dict],
+    ) -> Optional[str]:
+        test_entry_digest = self._get_test_entry_digest(
+            test_category, test_entry, possible_answer_entry
+        )
+        if test_entry_digest is None:
+            return None
+        try:
+            serialized_inputs = json.dumps(
+                [
+                    CACHE_FORMAT_VERSION,
+                    get_checker_version(),
+                    get_handler_source_hash(type(handler)),
+                    model_name,
+                    test_category,
+                    language,
+                    get_prompt_variation(),
+                    model_result_entry["id"],
+                    model_result_entry,
+                    test_entry_digest,
+                ],
+                sort_keys=True,
+            )
+        except (TypeError, ValueError):
+            # Not serializable, so it can't be keyed; the entry is always scored
+            return None
+        return hashlib.sha256(serialized_inputs.encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: list[Optional[str]]) -> dict[str, list[dict]]:
+        """The score records stored for the given keys; keys that are not stored (or None) are left out."""
+        lookup_keys = [key for key in keys if key is not None]
+        stored = {}
+        with self._lock:
+            connection = self._get_connection()
+            if connection is not None:
+                for start_index in range(0, len(lookup_keys), LOOKUP_BATCH_SIZE):
+                    batch = lookup_keys[start_index : start_index + LOOKUP_BATCH_SIZE]
+                    try:
+                        rows = connection.execute(
+                            f"SELECT key, value FROM scores WHERE key IN ({', '.join('?' * len(batch))})",
+                            batch,
+                        ).fetchall()
+                    except sqlite3.Error:
+                        break
+                    for key, value in rows:
+                        try:
+                            stored[key] = pickle.loads(value)
+                        except Exception:
+                            continue
+            self.hit_count += len(stored)
+            self.miss_count += len(keys) - len(stored)
+        return stored
+
+    def set_many(self, items: list[tuple[str, str, str, list[dict]]]) -> None:
+        """Store `(key, model name, test entry id, score records)` items, in one transaction."""
+        with self._lock:
+            connection = self._get_connection()
+            if connection is None:
+                return
+            try:
+                connection.execute("BEGIN")
+                connection.executemany(
+                    "INSERT OR REPLACE INTO scores (key, model_name, test_entry_id, value) VALUES (?, ?, ?, ?)",
+                    [
+                        (
+                            key,
+                            model_name,
+                            test_entry_id,
+                            pickle.dumps(records, protocol=pickle.HIGHEST_PROTOCOL),
+                        )
+                        for key, model_name, test_entry_id, records in items
+                    ],
+                )
+                connection.execute("COMMIT")
+            except sqlite3.Error:
+                try:
+                    connection.execute("ROLLBACK")
+                except sqlite3.Error:
+                    pass
+
+    def record_lookups(self, hit_count: int, miss_count: int) -> None:
+        """Account for the lookups made by worker processes, which have their own instance."""
+        with self._lock:
+            self.hit_count += hit_count
+            self.miss_count += miss_count
+
+    def summary(self) -> str:
+        total = self.hit_count + self.miss_count
+        hit_rate = self.hit_count / total if total else 0
+        return f"Score cache: {self.hit_count} entries reused, {self.miss_count} entries scored ({hit_rate:.1%} reused). Stored at {self.cache_path}"
+
+
+_SCORE_CACHE: Optional[ScoreCache] = None
+
+
+def get_score_cache() -> ScoreCache:
+    """Return the process-wide cache."""
+    global _SCORE_CACHE
+    if _SCORE_CACHE is None:
+        _SCORE_CACHE = ScoreCache(SCORE_CACHE_PATH)
+    return _SCORE_CACHE
+
+
+def score_with_cache(
+    shard_runner,
+    handler,
+    model_name: str,
+    test_category: str,
+    language: Optional[str],
+    model_result: list[dict],
+    prompt: list[dict],
+    possible_answer: Optional[list[dict]],
+) -> tuple[list[dict], int]:
+    """
+    Score a slice of entries with `shard_runner(model_result, prompt, possible_answer)`, but only the entries that are
+    not in the score cache. Returns the same score records, in the same order, and correct count as the runner would
+    on the whole slice.
+    """
+    score_cache = get_score_cache()
+    # Keyed before running, as the runners may modify the test entries
+    keys = [
+        score_cache.compute_key(
+            handler,
+            model_name,
+            test_category,
+            language,
+            model_result[i],
+            prompt[i],
+            possible_answer[i] if possible_answer is not None else None,
+        )
+        for i in range(len(model_result))
+    ]
+    stored = score_cache.get_many(keys)
+    miss_indices = [i for i, key in enumerate(keys) if key not in stored]
+
+    entry_records = [stored.get(key) for key in keys]
+    # The records of the runner are matched to the entries by id, so a result file with the same id more than once
+    # is scored in batches that each hold one entry of that id: the first occurrences, then the second, and so on
+    miss_batches = []
+    occurrence_counts = {}
+    for i in miss_indices:
+        occurrence = occurrence_counts.get(model_result[i]["id"], 0)
+        occurrence_counts[model_result[i]["id"]] = occurrence + 1
+        if occurrence == len(miss_batches):
+            miss_batches.append([])
+        miss_batches[occurrence].append(i)
+
+    new_items = []
+    for batch_indices in miss_batches:
+        batch_result, _ = shard_runner(
+            [model_result[i] for i in batch_indices],
+            [prompt[i] for i in batch_indices],
+            [possible_answer[i] for i in batch_indices] if possible_answer is not None else None,
+        )
+        # Every record of the runner belongs to the entry with the same id; a correct entry has none
+        records_by_id = {}
+        for record in batch_result:
+            records_by_id.setdefault(record["id"], []).append(record)
+        for i in batch_indices:
+            test_entry_id = model_result[i]["id"]
+            entry_records[i] = records_by_id.get(test_entry_id, [])
+            if keys[i] is not None:
+                new_items.append((keys[i], model_name, test_entry_id, entry_records[i]))
+    if new_items:
+        score_cache.set_many(new_items)
+
+    result = []
+    correct_count = 0
+    for records in entry_records:
+        if records:
+            result.extend(records)
+        else:
+            correct_count += 1
+    return result, correct_count
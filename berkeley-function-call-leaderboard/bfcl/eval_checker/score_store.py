@@ -0,0 +1,259 @@
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Optional
+
+from bfcl.constants.eval_config import SCORE_STORE_PATH
+from bfcl.utils import extract_test_category, load_file_header
+
+STORE_FILE_NAME = "scores.sqlite"
+SQLITE_BUSY_TIMEOUT = 60  # seconds
+
+
+def get_error_type(score_record: dict) -> Optional[str]:
+    # Multi-turn records nest the error type in the error, the other categories have it at the top level
+    if "error_type" in score_record:
+        return score_record["error_type"]
+    if type(score_record.get("error")) == dict:
+        return score_record["error"].get("error_type")
+    return None
+
+
+class ScoreStore:
+    """
+    An index of the evaluation scores, so that the leaderboard does not have to read the score files back in.
+
+    It holds two tables, for every score folder (each prompt variation is scored into its own folder):
+    - `category_scores`: the accuracy summary of each (model, test category), together with the modification time and
+      size of the score file it was read from. A score file that changed since (or that was never indexed, e.g. copied
+      from another machine) is read again, but only its first line, which holds the summary.
+    - `entry_scores`: whether each entry is correct and, if not, its error type. Only recorded by `bfcl evaluate`.
+
+    The score files remain the source of truth; the store is backed by a single SQLite file and can be deleted at any
+    time.
+    """
+
+    def __init__(self, store_dir: Path) -> None:
+        self.store_dir = Path(store_dir)
+        self.store_path = self.store_dir / STORE_FILE_NAME
+
+        self._lock = threading.Lock()
+        self._connection = None
+        self._connection_opened = False
+
+    def _get_connection(self) -> Optional[sqlite3.Connection]:
+        if not self._connection_opened:
+            self._connection_opened = True
+            try:
+                self.store_dir.mkdir(parents=True, exist_ok=True)
+                self._connection = sqlite3.connect(
+                    self.store_path,
+                    timeout=SQLITE_BUSY_TIMEOUT,
+                    check_same_thread=False,
+                    isolation_level=None,
+                )
+                self._connection.execute("PRAGMA journal_mode=WAL")
+                self._connection.execute(
+                    "CREATE TABLE IF NOT EXISTS category_scores ("
+                    "score_dir TEXT, model_name TEXT, test_category TEXT, accuracy REAL, correct_count INTEGER, "
+                    "total_count INTEGER, file_mtime_ns INTEGER, file_size INTEGER, "
+                    "PRIMARY KEY (score_dir, model_name, test_category))"
+                )
+                self._connection.execute(
+                    "CREATE TABLE IF NOT EXISTS entry_scores ("
+                    "score_dir TEXT, model_name TEXT, test_category TEXT, test_entry_id TEXT, valid INTEGER, "
+                    "error_type TEXT, PRIMARY KEY (score_dir, model_name, test_category, test_entry_id))"
+                )
+            except (OSError, sqlite3.Error):
+                # e.g. a read-only checkout; the score files are then read directly
+                self._connection = None
+        return self._connection
+
+    def record_category(
+        self,
+        score_file: Path,
+        model_name: str,
+        test_category: str,
+        accuracy: float,
+        correct_count: int,
+        total_count: int,
+        test_entry_ids: Optional[list[str]] = None,
+        failed_records: Optional[list[dict]] = None,
+    ) -> None:
+        """Index a score file that was just written, with the outcome of each of its entries when they are given."""
+        score_file = Path(score_file)
+        score_dir = str(score_file.parent.parent.resolve())
+        file_stat = score_file.stat()
+        with self._lock:
+            connection = self._get_connection()
+            if connection is None:
+                return
+            try:
+                connection.execute("BEGIN")
+                connection.execute(
+                    "INSERT OR REPLACE INTO category_scores VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        score_dir,
+                        model_name,
+                        test_category,
+                        accuracy,
+                        correct_count,
+                        total_count,
+                        file_stat.st_mtime_ns,
+                        file_stat.st_size,
+                    ),
+                )
+                connection.execute(
+                    "DELETE FROM entry_scores WHERE score_dir = ? AND model_name = ? AND test_category = ?",
+                    (score_dir, model_name, test_category),
+                )
+                if test_entry_ids is not None:
+                    error_types = {}
+                    for record in failed_records or []:
+                        # An entry can have several records; the first one is the reason it failed
+                        error_types.setdefault(record["id"], get_error_type(record))
+                    connection.executemany(
+                        "INSERT OR REPLACE INTO entry_scores VALUES (?, ?, ?, ?, ?, ?)",
+                        [
+                            (
+                                score_dir,
+                                model_name,
+                                test_category,
+                                test_entry_id,
+                                test_entry_id not in error_types,
+                                error_types.get(test_entry_id),
+                            )
+                            for test_entry_id in test_entry_ids
+                        ],
+                    )
+                connection.execute("COMMIT")
+            except sqlite3.Error:
+                try:
+                    connection.execute("ROLLBACK")
+                except sqlite3.Error:
+                    pass
+
+    def _load_category_scores(self, score_dir: str) -> dict[tuple[str, str], tuple]:
+        with self._lock:
+            connection = self._get_connection()
+            if connection is None:
+                return {}
+            try:
+                rows = connection.execute(
+                    "SELECT model_name, test_category, accuracy, correct_count, total_count, file_mtime_ns, file_size "
+                    "FROM category_scores WHERE score_dir = ?",
+                    (score_dir,),
+                ).fetchall()
+            except sqlite3.Error:
+                return {}
+        return {(row[0], row[1]): row[2:] for row in rows}
+
+    def _update_category_scores(
+        self, score_dir: str, changed_rows: list[tuple], removed_keys: list[tuple[str, str]]
+    ) -> None:
+        if not changed_rows and not removed_keys:
+            return
+        with self._lock:
+            connection = self._get_connection()
+            if connection is None:
+                return
+            try:
+                connection.execute("BEGIN")
+                connection.executemany(
+                    "INSERT OR REPLACE INTO category_scores VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(score_dir, *row) for row in changed_rows],
+                )
+                # The per-entry outcomes of a score file that changed behind our back are stale
+                connection.executemany(
+                    "DELETE FROM entry_scores WHERE score_dir = ? AND model_name = ? AND test_category = ?",
+                    [(score_dir, row[0], row[1]) for row in changed_rows],
+                )
+                connection.executemany(
+                    "DELETE FROM category_scores WHERE score_dir = ? AND model_name = ? AND test_category = ?",
+                    [(score_dir, *key) for key in removed_keys],
+                )
+                connection.executemany(
+                    "DELETE FROM entry_scores WHERE score_dir = ? AND model_name = ? AND test_category = ?",
+                    [(score_dir, *key) for key in removed_keys],
+                )
+                connection.execute("COMMIT")
+            except sqlite3.Error:
+                try:
+                    connection.execute("ROLLBACK")
+                except sqlite3.Error:
+                    pass
+
+    def sync_score_dir(self, score_path: Path) -> dict[str, dict[str, dict]]:
+        """
+        The accuracy summary of every score file in the folder, as `{model_name: {test_category: summary}}`.
+        Only the score files that changed since they were last indexed are read, and only their first line.
+        """
+        score_path = Path(score_path)
+        score_dir = str(score_path.resolve())
+        indexed = self._load_category_scores(score_dir)
+
+        category_scores = {}
+        changed_rows = []
+        for subdir in score_path.iterdir():
+            if not subdir.is_dir():
+                continue
+            model_name = subdir.name
+            for model_score_json in subdir.glob("*.json"):
+                test_category = extract_test_category(model_score_json)
+                file_stat = model_score_json.stat()
+                row = indexed.pop((model_name, test_category), None)
+                if row is not None and row[3:] == (file_stat.st_mtime_ns, file_stat.st_size):
+                    accuracy, correct_count, total_count = row[:3]
+                else:
+                    metadata = load_file_header(model_score_json)
+                    accuracy, total_count = metadata["accuracy"], metadata["total_count"]
+                    correct_count = metadata.get("correct_count")
+                    changed_rows.append(
+                        (
+                            model_name,
+                            test_category,
+                            accuracy,
+                            correct_count,
+                            total_count,
+                            file_stat.st_mtime_ns,
+                            file_stat.st_size,
+                        )
+                    )
+                category_scores.setdefault(model_name, {})[test_category] = {
+                    "accuracy": accuracy,
+                    "correct_count": correct_count,
+                    "total_count": total_count,
+                }
+
+        # Whatever is left was indexed, but its score file is gone
+        self._update_category_scores(score_dir, changed_rows, list(indexed))
+        return category_scores
+
+    def get_error_type_counts(
+        self, score_path: Path, model_name: str, test_category: str
+    ) -> list[tuple[str, int]]:
+        """The error types of the failed entries of a (model, test category), from the most to the least frequent."""
+        with self._lock:
+            connection = self._get_connection()
+            if connection is None:
+                return []
+            try:
+                return connection.execute(
+                    "SELECT error_type, COUNT(*) AS error_count FROM entry_scores "
+                    "WHERE score_dir = ? AND model_name = ? AND test_category = ? AND NOT valid "
+                    "GROUP BY error_type ORDER BY error_count DESC, error_type",
+                    (str(Path(score_path).resolve()), model_name, test_category),
+                ).fetchall()
+            except sqlite3.Error:
+                return []
+
+
+_SCORE_STORE: Optional[ScoreStore] = None
+
+
+def get_score_store() -> ScoreStore:
+    """Return the process-wide store."""
+    global _SCORE_STORE
+    if _SCORE_STORE is None:
+        _SCORE_STORE = ScoreStore(SCORE_STORE_PATH)
+    return _SCORE_STORE
@@ -0,0 +1,153 @@
+import math
+from array import array
+from typing import Iterable
+
+import numpy as np
+
+# The quantiles reported by `QuantileSketch` are within this relative error of the exact ones
+DEFAULT_RELATIVE_ACCURACY = 0.0005
+# Up to this many values, `QuantileSketch` also keeps the values themselves (8 bytes each) and reports the exact
+# quantiles. This covers the latencies of a model on the whole leaderboard, whose rounded p95 even a 0.05% error can change.
+DEFAULT_EXACT_VALUE_LIMIT = 100_000
+
+
+class RunningStats:
+    """
+    Count, mean and variance of a stream of values, in constant memory (Welford's algorithm).
+    Two instances can be merged, e.g. the statistics of the shards of a category, or of several categories.
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0  # Sum of the squared differences from the mean
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    def update(self, values: Iterable[float]) -> None:
+        for value in values:
+            self.add(value)
+
+    def merge(self, other: "RunningStats") -> None:
+        if other.count == 0:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self._m2 += other._m2 + delta * delta * self.count * other.count / count
+        self.count = count
+
+    @property
+    def variance(self) -> float:
+        """The sample variance; 0 for fewer than two values."""
+        if self.count < 2:
+            return 0.0
+        return self._m2 / (self.count - 1)
+
+    @property
+    def stdev(self) -> float:
+        return math.sqrt(self.variance)
+
+
+class QuantileSketch:
+    """
+    A mergeable sketch of the distribution of a stream of non-negative values, in the style of DDSketch.
+
+    Each positive value is counted in a bucket covering `[gamma^(k-1), gamma^k)`, with `gamma` chosen so that every
+    value of a bucket is within `relative_accuracy` of the bucket's representative value. The memory used grows with
+    the logarithm of the range of the values, not with their number, and merging two sketches adds up their buckets.
+
+    As long as there are at most `exact_value_limit` values, the values are kept as well, and the quantiles are exact.
+    """
+
+    def __init__(
+        self,
+        relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY,
+        exact_value_limit: int = DEFAULT_EXACT_VALUE_LIMIT,
+    ) -> None:
+        self.relative_accuracy = relative_accuracy
+        self.exact_value_limit = exact_value_limit
+        # None once there are more values than the limit
+        self._values = array("d")
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._buckets: dict[int, int] = {}
+        self._zero_count = 0
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if self._values is not None:
+            if len(self._values) < self.exact_value_limit:
+                self._values.append(value)
+            else:
+                self._values = None
+        if value <= 0:
+            self._zero_count += 1
+            return
+        key = math.ceil(math.log(value) / self._log_gamma)
+        self._buckets[key] = self._buckets.get(key, 0) + 1
+
+    def update(self, values: Iterable[float]) -> None:
+        for value in values:
+            self.add(value)
+
+    def merge(self, other: "QuantileSketch") -> None:
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError(
+                f"Cannot merge sketches of different relative accuracies ({self.relative_accuracy} and {other.relative_accuracy})."
+            )
+        for key, bucket_count in other._buckets.items():
+            self._buckets[key] = self._buckets.get(key, 0) + bucket_count
+        self._zero_count += other._zero_count
+        if (
+            self._values is not None
+            and other._values is not None
+            and len(self._values) + len(other._values) <= self.exact_value_limit
+        ):
+            self._values.extend(other._values)
+        else:
+            self._values = None
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def _values_at_ranks(self, ranks: list[int]) -> list[float]:
+        # `ranks` are 0-based and sorted
+        values = []
+        cumulative_count = self._zero_count
+        rank_index = 0
+        while rank_index < len(ranks) and ranks[rank_index] < cumulative_count:
+            values.append(0.0)
+            rank_index += 1
+        for key in sorted(self._buckets):
+            cumulative_count += self._buckets[key]
+            representative_value = 2 * self._gamma**key / (self._gamma + 1)
+            while rank_index < len(ranks) and ranks[rank_index] < cumulative_count:
+                # The extremes are tracked exactly
+                values.append(min(max(representative_value, self.min), self.max))
+                rank_index += 1
+        return values
+
+    def quantile(self, q: float) -> float:
+        """
+        The `q` quantile (between 0 and 1), interpolated between the two closest ranks like `numpy.percentile` (with
+        its default, linear method) does.
+        """
+        if self.count == 0:
+            raise ValueError("Cannot compute a quantile of an empty sketch.")
+        if self._values is not None:
+            return float(np.quantile(self._values, q))
+        position = (self.count - 1) * q
+        lower_rank = math.floor(position)
+        upper_rank = min(lower_rank + 1, self.count - 1)
+        lower_value, upper_value = self._values_at_ranks([lower_rank, upper_rank])
+        return lower_value + (upper_value - lower_value) * (position - lower_rank)
@@ -1,6 +1,5 @@
-import json
 import time
-from copy import deepcopy
+import uuid
 
 from bfcl.constants.category_mapping import VERSION_PREFIX
 from bfcl.constants.default_prompts import (
@@ -13,9 +12,11 @@ from bfcl.eval_checker.multi_turn_eval.multi_turn_utils import (
     STATELESS_CLASSES,
     execute_multi_turn_func_call,
     is_empty_execute_response,
+    release_multi_turn_instances,
 )
 from bfcl.model_handler.model_style import ModelStyle
-from bfcl.utils import load_file, make_json_serializable, sort_key
+from bfcl.model_handler.response_cache import ResponseCache
+from bfcl.model_handler.result_store import ResultStore
 from overrides import final
 
 
@@ -32,6 +33,14 @@ class BaseHandler:
         )
         self.temperature = temperature
         self.is_fc_model = False  # Whether the model is a function calling model
+        # Shared per-provider limiter, attached by the generation scheduler. See `bfcl/model_handler/rate_limiter.py`
+        self.rate_limiter = None
+        # Persistent response cache, attached by the generation pipeline unless `--no-cache` is set. See `bfcl/model_handler/response_cache.py`
+        self.response_cache = None
+        # Set under `--allow-overwrite`: the cached responses are not read, the fresh ones replace them in the cache
+        self.refresh_response_cache = False
+        # Mapping from result file path to its open ResultStore; compacted at the end of the run by `compact_results`
+        self._result_stores: dict = {}
 
     def inference(self, test_entry: dict, include_input_log: bool, exclude_state_log: bool):
         # This method is used to retrive model response for each model.
@@ -57,6 +66,29 @@ class BaseHandler:
     @final
     def inference_multi_turn_FC(
         self, test_entry: dict, include_input_log: bool, exclude_state_log: bool
+    ) -> tuple[list[list], dict]:
+        # The same entry can be in flight more than once at a time (e.g. under several prompt variations), so every
+        # inference gets simulated API instances of its own
+        instance_scope_token = uuid.uuid4().hex
+        try:
+            return self._inference_multi_turn_FC(
+                test_entry, include_input_log, exclude_state_log, instance_scope_token
+            )
+        finally:
+            # Free the simulated API instances of this inference, also when it failed
+            release_multi_turn_instances(
+                self.model_name_underline_replaced,
+                test_entry["id"],
+                instance_scope_token=instance_scope_token,
+            )
+
+    @final
+    def _inference_multi_turn_FC(
+        self,
+        test_entry: dict,
+        include_input_log: bool,
+        exclude_state_log: bool,
+        instance_scope_token: str,
     ) -> tuple[list[list], dict]:
         initial_config: dict = test_entry["initial_config"]
         involved_classes: list = test_entry["involved_classes"]
@@ -91,22 +123,18 @@ class BaseHandler:
                     "long_context" in test_category or "composite" in test_category
                 ),
                 is_evaL_run=False,
+                instance_scope_token=instance_scope_token,
             )
             state_log = []
             for class_name, class_instance in involved_instances.items():
                 if class_name in STATELESS_CLASSES:
                     continue
-                # Avoid modification in future turns
-                class_instance = deepcopy(class_instance)
                 state_log.append(
                     {
                         "role": "state_info",
                         "class_name": class_name,
-                        "content": {
-                            key: value
-                            for key, value in vars(class_instance).items()
-                            if not key.startswith("_")
-                        },
+                        # A copy, to avoid modification in future turns
+                        "content": class_instance._copy_public_state(),
                     }
                 )
             all_inference_log.append(state_log)
@@ -161,7 +189,7 @@ class BaseHandler:
                 # Add to the current_turn_inference_log at beginning of each step so that we don't need to bother dealing with the break statements
                 current_turn_inference_log[f"step_{count}"] = current_step_inference_log
 
-                api_response, query_latency = self._query_FC(inference_data)
+                api_response, query_latency = self._query_with_cache(self._query_FC, inference_data)
 
                 # This part of logging is disabled by default because it is too verbose and will make the result file extremely large
                 # It is only useful to see if the inference pipeline is working as expected (eg, does it convert all the inputs correctly)
@@ -245,6 +273,7 @@ class BaseHandler:
                         "long_context" in test_category or "composite" in test_category
                     ),
                     is_evaL_run=False,
+                    instance_scope_token=instance_scope_token,
                 )
 
                 # Add the execution results to the chat history for the next turn
@@ -286,17 +315,12 @@ class BaseHandler:
                 for class_name, class_instance in involved_instances.items():
                     if class_name in STATELESS_CLASSES:
                         continue
-                    # Avoid modification in future turns
-                    class_instance = deepcopy(class_instance)
                     state_log.append(
                         {
                             "role": "state_info",
                             "class_name": class_name,
-                            "content": {
-                                key: value
-                                for key, value in vars(class_instance).items()
-                                if not key.startswith("_")
-                            },
+                            # A copy, to avoid modification in future turns
+                            "content": class_instance._copy_public_state(),
                         }
                     )
                 all_inference_log.append(state_log)
@@ -322,6 +346,29 @@ class BaseHandler:
     @final
     def inference_multi_turn_prompting(
         self, test_entry: dict, include_input_log: bool, exclude_state_log: bool
+    ) -> tuple[list[list], dict]:
+        # The same entry can be in flight more than once at a time (e.g. under several prompt variations), so every
+        # inference gets simulated API instances of its own
+        instance_scope_token = uuid.uuid4().hex
+        try:
+            return self._inference_multi_turn_prompting(
+                test_entry, include_input_log, exclude_state_log, instance_scope_token
+            )
+        finally:
+            # Free the simulated API instances of this inference, also when it failed
+            release_multi_turn_instances(
+                self.model_name_underline_replaced,
+                test_entry["id"],
+                instance_scope_token=instance_scope_token,
+            )
+
+    @final
+    def _inference_multi_turn_prompting(
+        self,
+        test_entry: dict,
+        include_input_log: bool,
+        exclude_state_log: bool,
+        instance_scope_token: str,
     ) -> tuple[list[list], dict]:
         initial_config: dict = test_entry["initial_config"]
         involved_classes: list = test_entry["involved_classes"]
@@ -335,6 +382,8 @@ class BaseHandler:
         total_input_token_count: list[list[float]] = []
         total_output_token_count: list[list[float]] = []
         total_latency: list[list[float]] = []
+        # Only for handlers that tokenize the prompt locally (OSS models); time spent counting the prompt tokens
+        total_tokenization_latency: list[list[float]] = []
         # The model response that will be used for later evaluation
         all_model_response: list[list] = []
         # Only for reasoning models, reasoning content will be stored as part of metadata and in inference log
@@ -355,22 +404,18 @@ class BaseHandler:
                     "long_context" in test_category or "composite" in test_category
                 ),
                 is_evaL_run=False,
+                instance_scope_token=instance_scope_token,
             )
             state_log = []
             for class_name, class_instance in involved_instances.items():
                 if class_name in STATELESS_CLASSES:
                     continue
-                # Avoid modification in future turns
-                class_instance = deepcopy(class_instance)
                 state_log.append(
                     {
                         "role": "state_info",
                         "class_name": class_name,
-                        "content": {
-                            key: value
-                            for key, value in vars(class_instance).items()
-                            if not key.startswith("_")
-                        },
+                        # A copy, to avoid modification in future turns
+                        "content": class_instance._copy_public_state(),
                     }
                 )
             all_inference_log.append(state_log)
@@ -411,6 +456,7 @@ class BaseHandler:
             current_turn_input_token_count: list[float] = []
             current_turn_output_token_count: list[float] = []
             current_turn_latency: list[float] = []
+            current_turn_tokenization_latency: list[float] = []
 
             count = 0
             while True:
@@ -422,7 +468,11 @@ class BaseHandler:
                 # Add to the current_turn_inference_log at beginning of each step so that we don't need to bother dealing with the break statements
                 current_turn_inference_log[f"step_{count}"] = current_step_inference_log
 
-                api_response, query_latency = self._query_prompting(inference_data)
+                api_response, query_latency = self._query_with_cache(self._query_prompting, inference_data)
+                # Not set on a response cache hit, as nothing is tokenized then
+                current_turn_tokenization_latency.append(
+                    inference_data.pop("tokenization_latency", 0)
+                )
 
                 # This part of logging is disabled by default because it is too verbose and will make the result file extremely large
                 # It is only useful to see if the inference pipeline is working as expected (eg, does it convert all the inputs correctly)
@@ -506,6 +556,7 @@ class BaseHandler:
                         "long_context" in test_category or "composite" in test_category
                     ),
                     is_evaL_run=False,
+                    instance_scope_token=instance_scope_token,
                 )
 
                 # Add the execution results to the chat history for the next turn
@@ -540,23 +591,19 @@ class BaseHandler:
             total_input_token_count.append(current_turn_input_token_count)
             total_output_token_count.append(current_turn_output_token_count)
             total_latency.append(current_turn_latency)
+            total_tokenization_latency.append(current_turn_tokenization_latency)
 
             if not exclude_state_log:
                 state_log = []
                 for class_name, class_instance in involved_instances.items():
                     if class_name in STATELESS_CLASSES:
                         continue
-                    # Avoid modification in future turns
-                    class_instance = deepcopy(class_instance)
                     state_log.append(
                         {
                             "role": "state_info",
                             "class_name": class_name,
-                            "content": {
-                                key: value
-                                for key, value in vars(class_instance).items()
-                                if not key.startswith("_")
-                            },
+                            # A copy, to avoid modification in future turns
+                            "content": class_instance._copy_public_state(),
                         }
                     )
                 all_inference_log.append(state_log)
@@ -570,6 +617,8 @@ class BaseHandler:
             "latency": total_latency,
             "inference_log": all_inference_log,
         }
+        if any(any(turn_latency) for turn_latency in total_tokenization_latency):
+            metadata["tokenization_latency"] = total_tokenization_latency
         # We only include reasoning content if it exists and is not empty
         if not all(
             all(content == "" for content in single_turn_reasoning_content)
@@ -590,7 +639,7 @@ class BaseHandler:
             inference_data, test_entry["question"][0]
         )
 
-        api_response, query_latency = self._query_FC(inference_data)
+        api_response, query_latency = self._query_with_cache(self._query_FC, inference_data)
 
         # Try parsing the model response
         model_response_data = self._parse_query_response_FC(api_response)
@@ -622,7 +671,8 @@ class BaseHandler:
             inference_data, test_entry["question"][0]
         )
 
-        api_response, query_latency = self._query_prompting(inference_data)
+        api_response, query_latency = self._query_with_cache(self._query_prompting, inference_data)
+        tokenization_latency = inference_data.pop("tokenization_latency", None)
 
         # Try parsing the model response
         model_response_data = self._parse_query_response_prompting(api_response)
@@ -639,12 +689,43 @@ class BaseHandler:
         metadata["input_token_count"] = model_response_data["input_token"]
         metadata["output_token_count"] = model_response_data["output_token"]
         metadata["latency"] = query_latency
+        if tokenization_latency is not None:
+            metadata["tokenization_latency"] = tokenization_latency
 
         if "reasoning_content" in model_response_data:
             metadata["reasoning_content"] = model_response_data["reasoning_content"]
 
         return model_response_data["model_responses"], metadata
 
+    @final
+    def _query_with_cache(self, query_function, inference_data: dict):
+        """
+        Call `query_function` (`_query_FC` or `_query_prompting`), unless the exact same request has been answered before.
+        On a cache hit, the stored response, latency and input log are returned as if the model had just been queried.
+        When `refresh_response_cache` is set, the model is always queried, and its response replaces the cached one.
+        """
+        if self.response_cache is None:
+            return query_function(inference_data)
+
+        cache_key = ResponseCache.compute_key(self.model_name, self.temperature, inference_data)
+        if cache_key is None:
+            return query_function(inference_data)
+
+        cached_response = None if self.refresh_response_cache else self.response_cache.get(cache_key)
+        if cached_response is not None:
+            api_response, query_latency, inference_input_log = cached_response
+            if inference_input_log is not None:
+                inference_data["inference_input_log"] = inference_input_log
+            return api_response, query_latency
+
+        api_response, query_latency = query_function(inference_data)
+        self.response_cache.set(
+            cache_key,
+            self.model_name,
+            (api_response, query_latency, inference_data.get("inference_input_log")),
+        )
+        return api_response, query_latency
+
     def decode_ast(self, result, language="Python"):
         """
         This method takes raw model output (from `_parse_query_response_xxx`) and convert it to standard AST checker input.
@@ -659,6 +740,13 @@ class BaseHandler:
 
     @final
     def write(self, result, result_dir, update_mode=False):
+        """
+        Append the result entries to the result store of their test category.
+        The result files are only brought into their final sorted form by `compact_results`.
+
+        `update_mode` is kept for backward compatibility. The store always resolves duplicate ids in favour of the
+        latest record, so updating specific entries costs the same as appending new ones.
+        """
         model_name_dir = self.model_name.replace("/", "_")
         model_result_dir = result_dir / model_name_dir
         model_result_dir.mkdir(parents=True, exist_ok=True)
@@ -666,42 +754,27 @@ class BaseHandler:
         if isinstance(result, dict):
             result = [result]
 
-        # Collect and format each entry for JSON compatibility
-        entries_to_write = [make_json_serializable(entry) for entry in result]
-
-        # Group entries by their `test_category` for efficient file handling
+        # Group entries by their `test_category` for efficient file handling.
+        # Values that are not JSON serializable are converted by the store as it writes them.
         file_entries = {}
-        for entry in entries_to_write:
+        for entry in result:
             test_category = entry["id"].rsplit("_", 1)[0]
             file_name = f"{VERSION_PREFIX}_{test_category}_result.json"
             file_path = model_result_dir / file_name
             file_entries.setdefault(file_path, []).append(entry)
 
         for file_path, entries in file_entries.items():
-            if update_mode:
-                # Load existing entries from the file
-                existing_entries = {}
-                if file_path.exists():
-                    existing_entries = {
-                        entry["id"]: entry for entry in load_file(file_path)
-                    }
-
-                # Update existing entries with new data
-                for entry in entries:
-                    existing_entries[entry["id"]] = entry
-
-                # Sort entries by `id` and write them back to ensure order consistency
-                sorted_entries = sorted(existing_entries.values(), key=sort_key)
-                with open(file_path, "w") as f:
-                    for entry in sorted_entries:
-                        f.write(json.dumps(entry) + "\n")
+            if file_path not in self._result_stores:
+                self._result_stores[file_path] = ResultStore(file_path)
+            self._result_stores[file_path].append(entries)
 
-            else:
-                # Normal mode: Append in sorted order
-                entries.sort(key=sort_key)
-                with open(file_path, "a") as f:
-                    for entry in entries:
-                        f.write(json.dumps(entry) + "\n")
+    def compact_results(self):
+        """
+        Merge everything written so far into the canonical result files, sorted by id. Call once at the end of a run.
+        """
+        for result_store in self._result_stores.values():
+            result_store.compact()
+        self._result_stores = {}
 
     #### FC methods ####
 
@@ -0,0 +1,77 @@
+import hashlib
+import pickle
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+
+# Enough for every distinct function set in the dataset, under every model style and doc format used in one run
+MAX_CACHE_ENTRIES = 16384
+
+
+def function_doc_key(functions, *extra) -> Optional[str]:
+    """
+    A key for a list of function docs (plus any extra settings that affect the output), or None if the docs cannot
+    be serialized. Pickle is used rather than JSON as it is several times faster on the large multi-turn docs; equal
+    docs loaded from the same file pickle to the same bytes, and different docs never do.
+    """
+    try:
+        serialized = pickle.dumps((functions, *extra), protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        return None
+    return hashlib.sha256(serialized).hexdigest()
+
+
+class CompilationCache:
+    """
+    A bounded, in-memory LRU cache for deterministic, pure transformations of function docs, such as compiling the
+    tool payload of a model style (`convert_to_tool`) or rendering the function docs in the system prompt
+    (`format_func_doc`). The same function docs are compiled again for every entry of a category and every turn of a
+    multi-turn entry, so most lookups are hits.
+
+    The cache is shared by all worker threads of a run.
+    """
+
+    def __init__(self, name: str, max_entries: int = MAX_CACHE_ENTRIES) -> None:
+        self.name = name
+        self.max_entries = max_entries
+        self.hit_count = 0
+        self.miss_count = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key: Optional[str], compute: Callable):
+        if key is None:
+            return compute()
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hit_count += 1
+                return self._entries[key]
+            self.miss_count += 1
+
+        # Computed outside the lock; two threads missing the same key at once just do the work twice
+        value = compute()
+        with self._lock:
+            self._entries[key] = value
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def summary(self) -> str:
+        total = self.hit_count + self.miss_count
+        hit_rate = self.hit_count / total if total else 0
+        return f"{self.name}: {self.hit_count} hits, {self.miss_count} misses ({hit_rate:.1%} hit rate)"
+
+
+# Compiled tool payloads are stored pickled, since the handlers modify the returned tools in place
+TOOL_COMPILATION_CACHE = CompilationCache("Tool compilation cache")
+FUNC_DOC_CACHE = CompilationCache("Function doc cache")
+
+
+def get_compilation_cache_summary() -> str:
+    return "\n".join(cache.summary() for cache in [TOOL_COMPILATION_CACHE, FUNC_DOC_CACHE])
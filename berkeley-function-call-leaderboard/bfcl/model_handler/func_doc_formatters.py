@@ -3,6 +3,8 @@ Function documentation formatters for converting JSON function docs to different
 """
 import json
 
+from bfcl.model_handler.compilation_cache import FUNC_DOC_CACHE, function_doc_key
+
 
 def format_func_doc_as_json(functions):
     """Format function docs as JSON (default format)."""
@@ -85,6 +87,7 @@ def format_func_doc_as_xml(functions):
 def format_func_doc(functions, doc_fmt="json"):
     """
     Format function documentation according to specified format.
+    The same docs are rendered for many entries and turns, so each distinct (functions, doc_fmt) pair is rendered once.
     
     Args:
         functions: List of function definitions in JSON format
@@ -93,6 +96,13 @@ def format_func_doc(functions, doc_fmt="json"):
     Returns:
         Formatted function documentation string
     """
+    return FUNC_DOC_CACHE.get_or_compute(
+        function_doc_key(functions, doc_fmt),
+        lambda: _format_func_doc(functions, doc_fmt),
+    )
+
+
+def _format_func_doc(functions, doc_fmt):
     if doc_fmt == "python":
         return format_func_doc_as_python(functions)
     elif doc_fmt == "xml":
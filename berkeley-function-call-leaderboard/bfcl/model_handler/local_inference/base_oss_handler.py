@@ -1,18 +1,29 @@
 import os
-import subprocess
 import threading
 import time
 from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from copy import deepcopy
 from typing import Optional
 
-import requests
 from bfcl.constants.eval_config import RESULT_PATH, VLLM_PORT
 from bfcl.model_handler.base_handler import BaseHandler
+from bfcl.model_handler.local_inference.oss_server import (
+    build_server_command,
+    find_live_server,
+    launch_server,
+    stop_server,
+    stream_server_logs,
+    wait_for_server,
+)
+from bfcl.model_handler.local_inference.token_counter import PrefixTokenCounter
 from bfcl.model_handler.model_style import ModelStyle
+from bfcl.model_handler.run_journal import INFERENCE_ERROR_PREFIX, get_run_journal
 from bfcl.model_handler.utils import (
     default_decode_ast_prompting,
     default_decode_execute_prompting,
     func_doc_language_specific_pre_processing,
+    prompt_variation_context,
     system_prompt_pre_processing_chat_model,
 )
 from openai import OpenAI
@@ -71,41 +82,21 @@ class OSSHandler(BaseHandler, EnforceOverrides):
         exclude_state_log: bool,
         update_mode: bool,
         result_dir=RESULT_PATH,
+        entry_variations: Optional[list[tuple]] = None,
     ):
         """
         Batch inference for OSS models.
+
+        `entry_variations`, if given, holds the (prompt variation, result dir) of each test entry, so that entries of
+        several prompt variations can share one server launch. Otherwise all entries use the current prompt variation
+        and are written to `result_dir`.
         """
         from transformers import AutoConfig, AutoTokenizer
 
-        # Determine the model source
-        if local_model_path is not None:
-            # Validate the local_model_path
-            if not os.path.isdir(local_model_path):
-                raise ValueError(
-                    f"local_model_path '{local_model_path}' does not exist or is not a directory."
-                )
-
-            required_files = ["config.json", "tokenizer_config.json"]
-            for file_name in required_files:
-                if not os.path.exists(os.path.join(local_model_path, file_name)):
-                    raise ValueError(
-                        f"Required file '{file_name}' not found in local_model_path '{local_model_path}'."
-                    )
-
-            self.model_path_or_id = local_model_path
-            load_kwargs = {
-                "pretrained_model_name_or_path": self.model_path_or_id,
-                "local_files_only": True,
-                "trust_remote_code": True,
-            }
-        else:
-            self.model_path_or_id = self.model_name_huggingface
-            load_kwargs = {
-                "pretrained_model_name_or_path": self.model_path_or_id,
-                "trust_remote_code": True,
-            }
+        load_kwargs = self.set_model_source(local_model_path)
 
         self.tokenizer = AutoTokenizer.from_pretrained(**load_kwargs)
+        self.token_counter = PrefixTokenCounter(self.tokenizer)
         config = AutoConfig.from_pretrained(**load_kwargs)
 
         if hasattr(config, "max_position_embeddings"):
@@ -119,100 +110,44 @@ class OSSHandler(BaseHandler, EnforceOverrides):
                 )
         print(f"Max context length: {self.max_context_length}")
 
+        # Attach to a server started by `bfcl serve` for this model, if there is one, instead of loading the model again
+        live_server = None
         if not skip_server_setup:
-            if backend == "vllm":
-                process = subprocess.Popen(
-                    [
-                        "vllm",
-                        "serve",
-                        str(self.model_path_or_id),
-                        "--port",
-                        str(self.vllm_port),
-                        "--dtype",
-                        str(self.dtype),
-                        "--tensor-parallel-size",
-                        str(num_gpus),
-                        "--gpu-memory-utilization",
-                        str(gpu_memory_utilization),
-                        "--trust-remote-code",
-                    ],
-                    stdout=subprocess.PIPE,  # Capture stdout
-                    stderr=subprocess.PIPE,  # Capture stderr
-                    text=True,  # To get the output as text instead of bytes
-                )
-            elif backend == "sglang":
-
-                process = subprocess.Popen(
-                    [
-                        "python",
-                        "-m",
-                        "sglang.launch_server",
-                        "--model-path",
-                        str(self.model_path_or_id),
-                        "--port",
-                        str(self.vllm_port),
-                        "--dtype",
-                        str(self.dtype),
-                        "--tp",
-                        str(num_gpus),
-                        "--mem-fraction-static",
-                        str(gpu_memory_utilization),
-                        "--trust-remote-code",
-                    ],
-                    stdout=subprocess.PIPE,  # Capture stdout
-                    stderr=subprocess.PIPE,  # Capture stderr
-                    text=True,  # To get the output as text instead of bytes
+            live_server = find_live_server(self.model_path_or_id, self.dtype)
+        if live_server is not None:
+            print(
+                f"♻️ Reusing the {live_server['backend']} server of {live_server['model']} at {live_server['base_url']} (pid {live_server['pid']})."
+            )
+            self.base_url = live_server["base_url"]
+            self.client = OpenAI(base_url=self.base_url, api_key="EMPTY")
+        launch_server_process = not skip_server_setup and live_server is None
+
+        if launch_server_process:
+            process = launch_server(
+                build_server_command(
+                    backend,
+                    self.model_path_or_id,
+                    self.vllm_port,
+                    self.dtype,
+                    num_gpus,
+                    gpu_memory_utilization,
                 )
-            else:
-                raise ValueError(f"Backend {backend} is not supported.")
+            )
 
             stop_event = threading.Event()
             # Event to signal threads to stop; no need to see logs after server is ready
-
-            def log_subprocess_output(pipe, stop_event):
-                # Read lines until stop event is set
-                for line in iter(pipe.readline, ""):
-                    if stop_event.is_set():
-                        break
-                    else:
-                        print(line, end="")
-                pipe.close()
-                print("server log tracking thread stopped successfully.")
-
-            # Start threads to read and print stdout and stderr
-            stdout_thread = threading.Thread(
-                target=log_subprocess_output, args=(process.stdout, stop_event)
-            )
-            stderr_thread = threading.Thread(
-                target=log_subprocess_output, args=(process.stderr, stop_event)
-            )
-            stdout_thread.start()
-            stderr_thread.start()
+            log_threads = stream_server_logs(process, stop_event)
 
         try:
             # Wait for the server to be ready
-            server_ready = False
-            while not server_ready:
-                # Check if the process has terminated unexpectedly
-                if not skip_server_setup and process.poll() is not None:
-                    # Output the captured logs
-                    stdout, stderr = process.communicate()
-                    print(stdout)
-                    print(stderr)
-                    raise Exception(
-                        f"Subprocess terminated unexpectedly with code {process.returncode}"
-                    )
-                try:
-                    # Make a simple request to check if the server is up
-                    response = requests.get(f"{self.base_url}/models")
-                    if response.status_code == 200:
-                        server_ready = True
-                        print("server is ready!")
-                except requests.exceptions.ConnectionError:
-                    # If the connection is not ready, wait and try again
-                    time.sleep(1)
-
-            if not skip_server_setup:
+            wait_for_server(
+                self.base_url,
+                # A pre-existing endpoint may serve the model under a different name
+                model=None if skip_server_setup else str(self.model_path_or_id),
+                process=process if launch_server_process else None,
+            )
+
+            if launch_server_process:
                 # Signal threads to stop reading output
                 stop_event.set()
 
@@ -224,8 +159,17 @@ class OSSHandler(BaseHandler, EnforceOverrides):
                     desc=f"Generating results for {self.model_name}",
                 ) as pbar:
 
-                    for test_case in test_entries:
+                    if entry_variations is None:
+                        entry_variations = [(None, result_dir)] * len(test_entries)
+
+                    for test_case, (prompt_variation, _) in zip(
+                        test_entries, entry_variations
+                    ):
+                        # Executor threads do not inherit the caller's context, so hand it over explicitly
+                        with prompt_variation_context(prompt_variation):
+                            context = copy_context()
                         future = executor.submit(
+                            context.run,
                             self._multi_threaded_inference,
                             test_case,
                             include_input_log,
@@ -233,32 +177,56 @@ class OSSHandler(BaseHandler, EnforceOverrides):
                         )
                         futures.append(future)
 
-                    for future in futures:
+                    for future, (_, entry_result_dir) in zip(futures, entry_variations):
                         # This will wait for the task to complete, so that we are always writing in order
                         result = future.result()
-                        self.write(result, result_dir, update_mode=update_mode)
+                        self.write(result, entry_result_dir, update_mode=update_mode)
+                        get_run_journal(entry_result_dir, self.model_name).record_results([result])
                         pbar.update()
 
         except Exception as e:
             raise e
 
         finally:
-            if not skip_server_setup:
-                # Ensure the server process is terminated properly
-                process.terminate()
-                try:
-                    # Wait for the process to terminate fully
-                    process.wait(timeout=15)
-                    print("Process terminated successfully.")
-                except subprocess.TimeoutExpired:
-                    process.kill()
-                    process.wait()  # Wait again to ensure it's fully terminated
-                    print("Process killed.")
+            if launch_server_process:
+                stop_server(process)
 
                 # Wait for the output threads to finish
                 stop_event.set()
-                stdout_thread.join()
-                stderr_thread.join()
+                for thread in log_threads:
+                    thread.join()
+
+    @final
+    def set_model_source(self, local_model_path: Optional[str]) -> dict:
+        """
+        Determine where the model weights, tokenizer and config are loaded from, and return the keyword arguments to load them with.
+        """
+        if local_model_path is not None:
+            # Validate the local_model_path
+            if not os.path.isdir(local_model_path):
+                raise ValueError(
+                    f"local_model_path '{local_model_path}' does not exist or is not a directory."
+                )
+
+            required_files = ["config.json", "tokenizer_config.json"]
+            for file_name in required_files:
+                if not os.path.exists(os.path.join(local_model_path, file_name)):
+                    raise ValueError(
+                        f"Required file '{file_name}' not found in local_model_path '{local_model_path}'."
+                    )
+
+            self.model_path_or_id = local_model_path
+            return {
+                "pretrained_model_name_or_path": self.model_path_or_id,
+                "local_files_only": True,
+                "trust_remote_code": True,
+            }
+        else:
+            self.model_path_or_id = self.model_name_huggingface
+            return {
+                "pretrained_model_name_or_path": self.model_path_or_id,
+                "trust_remote_code": True,
+            }
 
     @final
     def _multi_threaded_inference(
@@ -269,6 +237,9 @@ class OSSHandler(BaseHandler, EnforceOverrides):
         """
         assert type(test_case["function"]) is list
 
+        # The inference methods modify the test case in place, and the same entry may be run under several prompt variations
+        test_case = deepcopy(test_case)
+
         try:
             if "multi_turn" in test_case["id"]:
                 model_responses, metadata = self.inference_multi_turn_prompting(
@@ -286,7 +257,7 @@ class OSSHandler(BaseHandler, EnforceOverrides):
             print(f"❗️❗️ Test case ID: {test_case['id']}, Error: {str(e)}")
             print("-" * 100)
 
-            model_responses = f"Error during inference: {str(e)}"
+            model_responses = f"{INFERENCE_ERROR_PREFIX}{str(e)}"
             metadata = {}
 
         result_to_write = {
@@ -317,8 +288,9 @@ class OSSHandler(BaseHandler, EnforceOverrides):
         formatted_prompt: str = self._format_prompt(message, function)
         inference_data["inference_input_log"] = {"formatted_prompt": formatted_prompt}
 
-        # Tokenize the formatted prompt to get token count
-        input_token_count = len(self.tokenizer.tokenize(formatted_prompt))
+        # Tokenize the formatted prompt to get token count; only the part appended since the previous step is tokenized
+        input_token_count, tokenization_latency = self.token_counter.count(formatted_prompt)
+        inference_data["tokenization_latency"] = tokenization_latency
 
         # Determine the number of tokens to request. Cap it at 4096 if the model has a larger limit.
         if self.max_context_length < input_token_count + 2:
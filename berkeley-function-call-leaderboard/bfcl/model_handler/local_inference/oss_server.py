@@ -0,0 +1,284 @@
+import json
+import os
+import subprocess
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+import requests
+from bfcl.constants.eval_config import OSS_SERVER_LOCK_PATH
+
+# Per-request timeout of the health check, so that a hung server is reported as unhealthy instead of blocking forever
+HEALTH_CHECK_TIMEOUT = 5  # seconds
+# Model loading can take a long time for large models, but a server that never becomes ready should not block forever
+SERVER_STARTUP_TIMEOUT = 3600  # seconds
+SERVER_POLL_INTERVAL = 1  # seconds
+SERVER_SHUTDOWN_TIMEOUT = 15  # seconds
+# Hosts that make the server listen on every interface
+WILDCARD_HOSTS = ("0.0.0.0", "::")
+
+
+def build_server_command(
+    backend: str,
+    model_path_or_id: str,
+    port: int,
+    dtype: str,
+    num_gpus: int,
+    gpu_memory_utilization: float,
+    host: Optional[str] = None,
+) -> list[str]:
+    """The command that starts the server. Without a `host`, it listens on the backend's default interfaces."""
+    host_args = ["--host", host] if host is not None else []
+    if backend == "vllm":
+        return [
+            "vllm",
+            "serve",
+            str(model_path_or_id),
+            *host_args,
+            "--port",
+            str(port),
+            "--dtype",
+            str(dtype),
+            "--tensor-parallel-size",
+            str(num_gpus),
+            "--gpu-memory-utilization",
+            str(gpu_memory_utilization),
+            "--trust-remote-code",
+        ]
+    elif backend == "sglang":
+        return [
+            "python",
+            "-m",
+            "sglang.launch_server",
+            "--model-path",
+            str(model_path_or_id),
+            *host_args,
+            "--port",
+            str(port),
+            "--dtype",
+            str(dtype),
+            "--tp",
+            str(num_gpus),
+            "--mem-fraction-static",
+            str(gpu_memory_utilization),
+            "--trust-remote-code",
+        ]
+    else:
+        raise ValueError(f"Backend {backend} is not supported.")
+
+
+def launch_server(command: list[str]) -> subprocess.Popen:
+    return subprocess.Popen(
+        command,
+        stdout=subprocess.PIPE,  # Capture stdout
+        stderr=subprocess.PIPE,  # Capture stderr
+        text=True,  # To get the output as text instead of bytes
+    )
+
+
+def stream_server_logs(process: subprocess.Popen, stop_event: threading.Event) -> list[threading.Thread]:
+    """Print the server output from background threads, until `stop_event` is set."""
+
+    def log_subprocess_output(pipe, stop_event):
+        # Read lines until stop event is set
+        for line in iter(pipe.readline, ""):
+            if stop_event.is_set():
+                break
+            else:
+                print(line, end="")
+        pipe.close()
+        print("server log tracking thread stopped successfully.")
+
+    threads = [
+        threading.Thread(target=log_subprocess_output, args=(pipe, stop_event), daemon=True)
+        for pipe in [process.stdout, process.stderr]
+    ]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+def stop_server(process: subprocess.Popen) -> None:
+    # Ensure the server process is terminated properly
+    process.terminate()
+    try:
+        # Wait for the process to terminate fully
+        process.wait(timeout=SERVER_SHUTDOWN_TIMEOUT)
+        print("Process terminated successfully.")
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()  # Wait again to ensure it's fully terminated
+        print("Process killed.")
+
+
+def is_server_healthy(base_url: str, model: Optional[str] = None) -> bool:
+    """
+    Whether the OpenAI-compatible server at `base_url` (e.g. `http://localhost:1053/v1`) can serve requests.
+
+    vLLM and SGLang report the state of their engine on `/health`; it is checked when the server has it (other
+    OpenAI-compatible endpoints may not). If `model` is given, the server must also be serving that model.
+    """
+    server_root = base_url.rstrip("/").removesuffix("/v1")
+    try:
+        response = requests.get(f"{server_root}/health", timeout=HEALTH_CHECK_TIMEOUT)
+        if response.status_code not in (200, 404):
+            return False
+
+        response = requests.get(f"{base_url}/models", timeout=HEALTH_CHECK_TIMEOUT)
+        if response.status_code != 200:
+            return False
+        if model is not None:
+            served_models = [entry.get("id") for entry in response.json().get("data", [])]
+            return model in served_models
+        return True
+    except (requests.exceptions.RequestException, ValueError):
+        return False
+
+
+def wait_for_server(
+    base_url: str,
+    model: Optional[str] = None,
+    process: Optional[subprocess.Popen] = None,
+    timeout: float = SERVER_STARTUP_TIMEOUT,
+) -> None:
+    """Block until the server is healthy. Raises if the server process dies or the timeout is reached first."""
+    deadline = time.monotonic() + timeout
+    while not is_server_healthy(base_url, model):
+        # Check if the process has terminated unexpectedly
+        if process is not None and process.poll() is not None:
+            # Output the captured logs
+            stdout, stderr = process.communicate()
+            print(stdout)
+            print(stderr)
+            raise Exception(f"Subprocess terminated unexpectedly with code {process.returncode}")
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"The server at {base_url} did not become ready within {timeout} seconds.")
+        # If the server is not ready, wait and try again
+        time.sleep(SERVER_POLL_INTERVAL)
+    print("server is ready!")
+
+
+#### Lockfiles of the servers started by `bfcl serve` ####
+
+
+def _get_lockfile_path(port: int) -> Path:
+    return OSS_SERVER_LOCK_PATH / f"server_{port}.json"
+
+
+def write_server_lockfile(server_info: dict) -> Path:
+    OSS_SERVER_LOCK_PATH.mkdir(parents=True, exist_ok=True)
+    lockfile_path = _get_lockfile_path(server_info["port"])
+    temp_path = lockfile_path.with_name(lockfile_path.name + ".tmp")
+    with open(temp_path, "w") as f:
+        json.dump(server_info, f, indent=2)
+    os.replace(temp_path, lockfile_path)
+    return lockfile_path
+
+
+def remove_server_lockfile(port: int) -> None:
+    _get_lockfile_path(port).unlink(missing_ok=True)
+
+
+def _is_process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # The process exists, but belongs to another user
+        return True
+    return True
+
+
+def list_live_servers() -> list[dict]:
+    """
+    The servers started by `bfcl serve` that are still alive and healthy.
+    Lockfiles left behind by servers that are gone (e.g. after a crash or a reboot) are removed.
+    """
+    if not OSS_SERVER_LOCK_PATH.is_dir():
+        return []
+
+    live_servers = []
+    for lockfile_path in sorted(OSS_SERVER_LOCK_PATH.glob("server_*.json")):
+        try:
+            with open(lockfile_path) as f:
+                server_info = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if not _is_process_alive(server_info["pid"]):
+            lockfile_path.unlink(missing_ok=True)
+            continue
+        if is_server_healthy(server_info["base_url"], server_info["model"]):
+            live_servers.append(server_info)
+    return live_servers
+
+
+def find_live_server(model_path_or_id: str, dtype: str) -> Optional[dict]:
+    """A live server started by `bfcl serve` that serves this model with the same dtype, if there is one."""
+    for server_info in list_live_servers():
+        if server_info["model"] == str(model_path_or_id) and server_info["dtype"] == str(dtype):
+            return server_info
+    return None
+
+
+def serve(
+    backend: str,
+    model_path_or_id: str,
+    host: str,
+    port: int,
+    dtype: str,
+    num_gpus: int,
+    gpu_memory_utilization: float,
+) -> None:
+    """
+    Start a server and keep it alive until it is interrupted (Ctrl+C), so that later `bfcl generate` runs of the same
+    model can attach to it instead of loading the model again. The server is announced through a lockfile as soon as
+    it is ready, and the lockfile is removed when it stops.
+    """
+    # A server listening on all interfaces is reached through the loopback one
+    base_url = f"http://{'localhost' if host in WILDCARD_HOSTS else host}:{port}/v1"
+    for server_info in list_live_servers():
+        if server_info["port"] == port:
+            raise ValueError(
+                f"Port {port} is already used by the {server_info['backend']} server of {server_info['model']} (pid {server_info['pid']})."
+            )
+
+    process = launch_server(
+        build_server_command(
+            backend, model_path_or_id, port, dtype, num_gpus, gpu_memory_utilization, host=host
+        )
+    )
+    stop_event = threading.Event()
+    log_threads = stream_server_logs(process, stop_event)
+    try:
+        wait_for_server(base_url, str(model_path_or_id), process)
+        write_server_lockfile(
+            {
+                "pid": process.pid,
+                "backend": backend,
+                "model": str(model_path_or_id),
+                "dtype": str(dtype),
+                "host": host,
+                "port": port,
+                "base_url": base_url,
+                "num_gpus": num_gpus,
+                "gpu_memory_utilization": gpu_memory_utilization,
+                "started_at": datetime.now().isoformat(timespec="seconds"),
+            }
+        )
+        print(
+            f"🚀 Serving {model_path_or_id} with {backend} at {base_url}. `bfcl generate` runs of this model will reuse it. Press Ctrl+C to stop."
+        )
+        process.wait()
+        print(f"Server exited with code {process.returncode}.")
+    except KeyboardInterrupt:
+        print("Stopping the server...")
+    finally:
+        remove_server_lockfile(port)
+        if process.poll() is None:
+            stop_server(process)
+        stop_event.set()
+        for thread in log_threads:
+            thread.join(timeout=SERVER_SHUTDOWN_TIMEOUT)
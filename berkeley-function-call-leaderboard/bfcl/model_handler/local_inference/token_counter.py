@@ -0,0 +1,84 @@
+import threading
+import time
+from collections import OrderedDict
+
+# Prompts are grouped by their first characters, so that only prompts that can possibly be a prefix are compared
+PREFIX_HEAD_LENGTH = 256
+# Compared before hashing, to cheaply skip the prompts of other conversations that share the same system prompt
+PREFIX_TAIL_LENGTH = 64
+# Enough to remember the latest prompt of every conversation in flight (`batch_inference` runs up to 100 at a time)
+MAX_CACHED_PREFIXES = 1024
+# Tokenizing a prompt in two parts can differ from tokenizing it at once by a token or two around the cut (eg, when
+# the first part ends in the middle of a word); pad the estimate so that it never undercounts
+PREFIX_BOUNDARY_MARGIN = 2
+
+
+class PrefixTokenCounter:
+    """
+    Counts the tokens of formatted prompts, reusing the count of the longest previously counted prompt that is a prefix
+    of the new one, so that only the newly appended text is tokenized.
+
+    In a multi-turn conversation, the prompt of every step is the prompt of the previous step plus the new messages,
+    so tokenizing the full prompt every time is quadratic over the conversation; this makes it linear.
+    The count is an upper-bound estimate (see `PREFIX_BOUNDARY_MARGIN`), used to size `max_tokens`.
+
+    Only the length, hash, last characters and token count of each prompt are kept, not the prompt itself.
+    """
+
+    def __init__(self, tokenizer) -> None:
+        self.tokenizer = tokenizer
+        # Mapping from the first characters of a prompt to {(length, hash): (last characters, token count)} of the prompts starting with them
+        self._prefixes: OrderedDict[str, OrderedDict[tuple[int, int], tuple[str, int]]] = OrderedDict()
+        self._prefix_count = 0
+        self._lock = threading.Lock()
+
+    def _find_longest_prefix(self, prompt: str) -> tuple[int, int]:
+        head = prompt[:PREFIX_HEAD_LENGTH]
+        with self._lock:
+            candidates = self._prefixes.get(head)
+            if not candidates:
+                return 0, 0
+            candidates = sorted(candidates.items(), reverse=True)
+        for (length, prefix_hash), (tail, token_count) in candidates:
+            if (
+                length <= len(prompt)
+                and prompt[max(length - PREFIX_TAIL_LENGTH, 0) : length] == tail
+                and hash(prompt[:length]) == prefix_hash
+            ):
+                return length, token_count
+        return 0, 0
+
+    def _remember(self, prompt: str, token_count: int) -> None:
+        head = prompt[:PREFIX_HEAD_LENGTH]
+        with self._lock:
+            candidates = self._prefixes.setdefault(head, OrderedDict())
+            self._prefixes.move_to_end(head)
+            key = (len(prompt), hash(prompt))
+            if key not in candidates:
+                self._prefix_count += 1
+            candidates[key] = (prompt[-PREFIX_TAIL_LENGTH:], token_count)
+            candidates.move_to_end(key)
+
+            # Evict the least recently used prompts
+            while self._prefix_count > MAX_CACHED_PREFIXES:
+                oldest_head, oldest_candidates = next(iter(self._prefixes.items()))
+                oldest_candidates.popitem(last=False)
+                self._prefix_count -= 1
+                if not oldest_candidates:
+                    del self._prefixes[oldest_head]
+
+    def count(self, prompt: str) -> tuple[int, float]:
+        """Return the (estimated) token count of the prompt, and the time spent tokenizing it."""
+        start_time = time.time()
+        prefix_length, prefix_token_count = self._find_longest_prefix(prompt)
+        if prefix_length == len(prompt):
+            token_count = prefix_token_count
+        elif prefix_length == 0:
+            token_count = len(self.tokenizer.tokenize(prompt))
+        else:
+            token_count = prefix_token_count + len(self.tokenizer.tokenize(prompt[prefix_length:]))
+        # The margin is not remembered, so that it does not pile up over the steps of a long conversation
+        self._remember(prompt, token_count)
+        if prefix_length > 0:
+            token_count += PREFIX_BOUNDARY_MARGIN
+        return token_count, time.time() - start_time
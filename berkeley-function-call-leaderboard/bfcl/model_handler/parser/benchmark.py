@@ -0,0 +1,178 @@
+"""
+Micro-benchmark of the Java and JavaScript decoding path: parsing a model response with tree-sitter, then converting
+each parameter value with the type converters of the AST checker.
+
+The calls are built from the function docs of the Java and JavaScript test categories, with a representative literal
+for each parameter type, so the mix of types matches the dataset.
+
+Usage: python -m bfcl.model_handler.parser.benchmark [--rounds 50]
+"""
+
+import argparse
+import time
+
+from tree_sitter import Parser
+
+from bfcl.constants.eval_config import PROMPT_PATH
+from bfcl.dataset import find_dataset_file, load_dataset_file
+from bfcl.eval_checker.ast_eval.type_convertor.java_type_converter import java_type_converter
+from bfcl.eval_checker.ast_eval.type_convertor.js_type_converter import js_type_converter
+from bfcl.model_handler.parser.java_parser import JAVA_LANGUAGE, parse_java_function_call
+from bfcl.model_handler.parser.js_parser import JS_LANGUAGE, parse_javascript_function_call
+from bfcl.model_handler.parser.tree_sitter_pool import get_parser
+
+JAVA_SAMPLE_VALUES = {
+    "any": "dataSource",
+    "String": '"quarterly_report.csv"',
+    "char": "'c'",
+    "byte": "8",
+    "short": "16",
+    "integer": "42",
+    "long": "1024L",
+    "float": "3.5f",
+    "double": "2.75",
+    "boolean": "true",
+    "Array": 'new String[]{"alpha", "beta", "gamma"}',
+    "ArrayList": 'new ArrayList<>(Arrays.asList("alpha", "beta"))',
+    "HashMap": 'new HashMap<String, String>() {{ put("timeout", "30"); put("retries", "3"); }}',
+}
+JAVA_NESTED_SAMPLE_VALUES = {
+    ("Array", "integer"): "new int[]{1, 2, 3}",
+    ("Array", "char"): "new char[]{'a', 'b'}",
+    ("ArrayList", "integer"): "new ArrayList<>(Arrays.asList(1, 2, 3))",
+    ("ArrayList", "long"): "new ArrayList<>(Arrays.asList(1L, 2L))",
+}
+JS_SAMPLE_VALUES = {
+    "any": "chartElement",
+    "String": '"submitButton"',
+    "integer": "7",
+    "float": "3.5",
+    "Bigint": "10n",
+    "Boolean": "true",
+    "dict": "{limit: 10, order: 'asc'}",
+    "array": '["alpha", "beta", "gamma"]',
+}
+JS_NESTED_SAMPLE_VALUES = {
+    ("array", "float"): "[1.5, 2.5, 3.5]",
+    ("array", "integer"): "[1, 2, 3]",
+}
+
+LANGUAGE_CONFIG = {
+    "Java": (
+        "java",
+        JAVA_LANGUAGE,
+        parse_java_function_call,
+        java_type_converter,
+        JAVA_SAMPLE_VALUES,
+        JAVA_NESTED_SAMPLE_VALUES,
+        ["Array", "ArrayList"],
+    ),
+    "JavaScript": (
+        "javascript",
+        JS_LANGUAGE,
+        parse_javascript_function_call,
+        js_type_converter,
+        JS_SAMPLE_VALUES,
+        JS_NESTED_SAMPLE_VALUES,
+        ["array"],
+    ),
+}
+
+
+def build_samples(test_category, sample_values, nested_sample_values, nested_types):
+    """One call per test entry: `(source code, {param: (type, nested type)})`."""
+    samples = []
+    for entry in load_dataset_file(find_dataset_file(PROMPT_PATH, test_category)):
+        function = entry["function"][0]
+        param_types = {}
+        arguments = []
+        for param, details in function["parameters"]["properties"].items():
+            param_type = details["type"]
+            nested_type = details.get("items", {}).get("type") if param_type in nested_types else None
+            value = nested_sample_values.get((param_type, nested_type), sample_values.get(param_type))
+            if value is None:
+                continue
+            param_types[param] = (param_type, nested_type)
+            arguments.append(f"{param}={value}")
+        samples.append((f"{function['name']}({', '.join(arguments)})", param_types))
+    return samples
+
+
+def time_per_call(func, inputs, rounds):
+    """Mean wall time of one call, in microseconds."""
+    for item in inputs:  # Warm up
+        func(item)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for item in inputs:
+            func(item)
+    return (time.perf_counter() - start) / (rounds * len(inputs)) * 1e6
+
+
+def run_parser_benchmark(rounds: int = 50) -> dict:
+    report = {}
+    for language, (
+        test_category,
+        tree_sitter_language,
+        parse_function_call,
+        type_converter,
+        sample_values,
+        nested_sample_values,
+        nested_types,
+    ) in LANGUAGE_CONFIG.items():
+        samples = build_samples(test_category, sample_values, nested_sample_values, nested_types)
+        source_codes = [source_code for source_code, _ in samples]
+        conversions = []
+        for source_code, param_types in samples:
+            decoded_params = list(parse_function_call(source_code)[0].values())[0]
+            for param, (param_type, nested_type) in param_types.items():
+                if type(decoded_params.get(param)) == str:
+                    conversions.append((decoded_params[param], param_type, nested_type))
+
+        def parse_with_pooled_parser(source_code):
+            return get_parser(tree_sitter_language).parse(bytes(source_code, "utf8"))
+
+        def parse_with_new_parser(source_code):
+            # What a parse costs when the parser is set up for each call
+            parser = Parser()
+            parser.set_language(tree_sitter_language)
+            return parser.parse(bytes(source_code, "utf8"))
+
+        def convert(conversion):
+            value_str, param_type, nested_type = conversion
+            if nested_type:
+                return type_converter(value_str, param_type, nested_type)
+            return type_converter(value_str, param_type)
+
+        report[language] = {
+            "call_count": len(source_codes),
+            "parameter_count": len(conversions),
+            "decode_us": time_per_call(parse_function_call, source_codes, rounds),
+            "tree_sitter_parse_pooled_parser_us": time_per_call(
+                parse_with_pooled_parser, source_codes, rounds
+            ),
+            "tree_sitter_parse_new_parser_us": time_per_call(
+                parse_with_new_parser, source_codes, rounds
+            ),
+            "type_conversion_us": time_per_call(convert, conversions, rounds),
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark of the Java and JavaScript decoding path.")
+    parser.add_argument("--rounds", type=int, default=50, help="Passes over the samples of each language")
+    args = parser.parse_args()
+
+    for language, result in run_parser_benchmark(args.rounds).items():
+        print(
+            f"{language}: {result['call_count']} calls, {result['parameter_count']} parameters\n"
+            f"  decode (parse and traversal):       {result['decode_us']:8.1f} µs/call\n"
+            f"  tree-sitter parse, pooled parser:   {result['tree_sitter_parse_pooled_parser_us']:8.1f} µs/call\n"
+            f"  tree-sitter parse, new parser:      {result['tree_sitter_parse_new_parser_us']:8.1f} µs/call\n"
+            f"  type conversion:                    {result['type_conversion_us']:8.1f} µs/parameter"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,16 @@
-from tree_sitter import Language, Parser
+from tree_sitter import Language
 import tree_sitter_java
 
-JAVA_LANGUAGE = Language(tree_sitter_java.language(), "java")
+from bfcl.model_handler.parser.tree_sitter_pool import contains_error_node, get_parser
 
-parser = Parser()
-parser.set_language(JAVA_LANGUAGE)
+JAVA_LANGUAGE = Language(tree_sitter_java.language(), "java")
 
 
 def parse_java_function_call(source_code):
-    tree = parser.parse(bytes(source_code, "utf8"))
+    tree = get_parser(JAVA_LANGUAGE).parse(bytes(source_code, "utf8"))
     root_node = tree.root_node
-    sexp_result = root_node.sexp()
 
-    if "ERROR" in sexp_result:
+    if contains_error_node(root_node):
         raise Exception("Error parsing java the source code.")
 
     def get_text(node):
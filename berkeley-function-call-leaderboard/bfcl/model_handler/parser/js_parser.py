@@ -1,18 +1,16 @@
-from tree_sitter import Language, Parser
+from tree_sitter import Language
 import tree_sitter_javascript
 
-JS_LANGUAGE = Language(tree_sitter_javascript.language(), "javascript")
+from bfcl.model_handler.parser.tree_sitter_pool import contains_error_node, get_parser
 
-parser = Parser()
-parser.set_language(JS_LANGUAGE)
+JS_LANGUAGE = Language(tree_sitter_javascript.language(), "javascript")
 
 
 def parse_javascript_function_call(source_code):
     # Parse the source code
-    tree = parser.parse(bytes(source_code, "utf8"))
+    tree = get_parser(JS_LANGUAGE).parse(bytes(source_code, "utf8"))
     root_node = tree.root_node
-    sexp_result = root_node.sexp()
-    if "ERROR" in sexp_result:
+    if contains_error_node(root_node):
         raise Exception("Error js parsing the source code.")
 
     # Function to recursively extract argument details
@@ -0,0 +1,30 @@
+import threading
+
+from tree_sitter import Language, Node, Parser
+
+_THREAD_LOCAL = threading.local()
+
+
+def get_parser(language: Language) -> Parser:
+    """
+    The tree-sitter parser for this language of the calling thread.
+
+    A parser must not be used by several threads at once, so each thread gets its own; it is created on first use and
+    then reused for every later parse, instead of setting up a parser per call.
+    """
+    parsers = getattr(_THREAD_LOCAL, "parsers", None)
+    if parsers is None:
+        parsers = _THREAD_LOCAL.parsers = {}
+    parser = parsers.get(language.name)
+    if parser is None:
+        parser = Parser()
+        parser.set_language(language)
+        parsers[language.name] = parser
+    return parser
+
+
+def contains_error_node(root_node: Node) -> bool:
+    """Whether the parse tree has an ERROR node, i.e. the source code does not parse."""
+    # `has_error` is cheap, but is also set for MISSING nodes (which the s-expression does not report as errors);
+    # the s-expression is only built for the (rare) trees that have one of the two
+    return root_node.has_error and "ERROR" in root_node.sexp()
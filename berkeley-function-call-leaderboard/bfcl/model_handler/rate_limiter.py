@@ -0,0 +1,269 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Optional
+
+# How far back we look when estimating the request rate a provider actually accepted
+OBSERVATION_WINDOW = 60  # seconds
+# Multiplicative decrease applied to the rate every time the provider throttles us
+RATE_DECREASE_FACTOR = 0.5
+# Fraction of the configured ceiling regained after each successful request
+RATE_RECOVERY_FRACTION = 0.02
+# Never throttle ourselves below this rate, otherwise a burst of 429s could stall the run
+MINIMUM_RATE_PER_MINUTE = 1
+# Fallback wait when the provider does not send a retry-after hint
+DEFAULT_RETRY_AFTER = 5  # seconds
+MAXIMUM_RETRY_AFTER = 120  # seconds
+
+# Alternative spellings accepted by `--rate-limit`; the canonical name is the handler module name
+PROVIDER_ALIASES = {
+    "anthropic": "claude",
+    "google": "gemini",
+    "gpt": "openai",
+    "amazon": "nova",
+}
+
+
+# HTTP status codes that are retried, but that are server errors rather than throttling
+RETRYABLE_SERVER_ERROR_STATUS_CODES = {500, 503}
+# Lowercased fragments of the messages providers use for throttling, for the SDKs that don't use a 429 status code
+RATE_LIMIT_ERROR_MESSAGES = (
+    "rate limit reached",
+    "rate limit exceeded",
+    "too many requests",
+    "resource exhausted",
+    "resource_exhausted",
+    "throttlingexception",
+)
+
+# The limiter whose token the asyncio scheduler already took, on the event loop, for the next request. The worker
+# thread the request is dispatched to inherits the context (see `asyncio.to_thread`), so its first `acquire` uses
+# that token instead of waiting for another one.
+_prepaid_rate_limiter: ContextVar[Optional["AdaptiveRateLimiter"]] = ContextVar(
+    "prepaid_rate_limiter", default=None
+)
+
+
+class DeferredRateLimitError(Exception):
+    """
+    Raised by `retry_with_backoff` instead of retrying in the worker thread, when the first request of a test case is
+    throttled. The scheduler then waits for the limiter on the event loop and dispatches the test case again; since
+    nothing was done yet, nothing is lost.
+    """
+
+    def __init__(self, original_error: Exception) -> None:
+        super().__init__(str(original_error))
+        self.original_error = original_error
+
+
+class AdaptiveRateLimiter:
+    """
+    A token bucket that keeps a provider close to its quota ceiling.
+
+    The bucket starts at the configured requests-per-minute (or unlimited if none is configured).
+    Each rate-limit response halves the effective rate and pauses all callers until the provider's
+    retry-after hint has elapsed; each successful request slowly restores the rate towards the ceiling.
+
+    The limiter is shared by all worker threads of a provider, so both the blocking `acquire` (used right
+    before every API request) and the awaitable `acquire_async` are thread-safe. The asyncio scheduler awaits
+    `acquire_async` before it dispatches a test case to a worker thread, so that the wait for the first request of
+    every test case (the only one, for the single-turn categories) does not hold a thread; the later requests of a
+    multi-turn test case are paced in the thread.
+    """
+
+    def __init__(self, provider: str, requests_per_minute: Optional[float] = None) -> None:
+        self.provider = provider
+        # None means no configured ceiling; we only start limiting after the first 429
+        self.ceiling = requests_per_minute / 60 if requests_per_minute else None
+        self.rate = self.ceiling
+        self.capacity = max(1.0, self.rate) if self.rate else 1.0
+        self.tokens = self.capacity
+        self.last_refill = time.monotonic()
+        self.paused_until = 0.0
+        self.recent_requests = deque()
+        self.rate_limited_count = 0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        if self.rate is not None:
+            self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def _reserve(self) -> float:
+        """
+        Try to take one token. Returns 0 on success, or the number of seconds to wait before trying again.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if now < self.paused_until:
+                return self.paused_until - now
+
+            self._refill(now)
+            if self.rate is not None and self.tokens < 1:
+                return (1 - self.tokens) / self.rate
+
+            if self.rate is not None:
+                self.tokens -= 1
+            self.recent_requests.append(now)
+            while self.recent_requests and self.recent_requests[0] < now - OBSERVATION_WINDOW:
+                self.recent_requests.popleft()
+            return 0
+
+    def acquire(self) -> bool:
+        """
+        Block the calling thread until a request may be sent.
+        Returns whether the token was the one `acquire_async` took for this thread, in which case there is no wait.
+        """
+        if _prepaid_rate_limiter.get() is self:
+            _prepaid_rate_limiter.set(None)
+            return True
+        while (wait_time := self._reserve()) > 0:
+            time.sleep(wait_time)
+        return False
+
+    async def acquire_async(self) -> None:
+        """
+        Wait, without holding a thread, until a request may be sent. The token is handed over to the first `acquire`
+        of the next worker thread the calling task dispatches to.
+        """
+        while (wait_time := self._reserve()) > 0:
+            await asyncio.sleep(wait_time)
+        _prepaid_rate_limiter.set(self)
+
+    def on_success(self) -> None:
+        with self._lock:
+            if self.rate is None:
+                return
+            if self.ceiling is None:
+                # No configured ceiling; go back to unlimited once the provider stops complaining for a while
+                if time.monotonic() - self.paused_until > OBSERVATION_WINDOW:
+                    self.rate = None
+                    self.tokens = self.capacity = 1.0
+                return
+            self.rate = min(self.ceiling, self.rate + self.ceiling * RATE_RECOVERY_FRACTION)
+            self.capacity = max(1.0, self.rate)
+
+    def on_rate_limited(self, retry_after: Optional[float] = None) -> float:
+        """
+        Record a rate-limit response from the provider.
+
+        Returns the number of seconds the caller should wait before retrying.
+        """
+        if retry_after is None:
+            retry_after = DEFAULT_RETRY_AFTER
+        retry_after = min(max(retry_after, 0), MAXIMUM_RETRY_AFTER)
+
+        with self._lock:
+            now = time.monotonic()
+            self.rate_limited_count += 1
+            if self.rate is None:
+                # Start from the throughput the provider was accepting before it throttled us
+                observed_rate = len(self.recent_requests) / OBSERVATION_WINDOW
+                self.rate = observed_rate
+            self.rate = max(self.rate * RATE_DECREASE_FACTOR, MINIMUM_RATE_PER_MINUTE / 60)
+            self.capacity = max(1.0, self.rate)
+            self.tokens = 0
+            self.paused_until = max(self.paused_until, now + retry_after)
+            return self.paused_until - now
+
+    def __repr__(self):
+        rate = "unlimited" if self.rate is None else f"{self.rate * 60:.1f} RPM"
+        return f"<AdaptiveRateLimiter provider={self.provider} rate={rate} throttled={self.rate_limited_count}>"
+
+
+_RATE_LIMITERS: dict[str, AdaptiveRateLimiter] = {}
+_RATE_LIMITERS_LOCK = threading.Lock()
+
+
+def normalize_provider_name(provider: str) -> str:
+    provider = provider.strip().lower()
+    return PROVIDER_ALIASES.get(provider, provider)
+
+
+def get_provider_name(handler) -> str:
+    """
+    The provider of a handler is the name of the module it is defined in (e.g. `openai`, `claude`, `gemini`).
+    OpenAI-compatible third-party endpoints (DeepSeek, Grok, ...) live in their own modules and therefore get their own quota.
+    """
+    return normalize_provider_name(type(handler).__module__.rsplit(".", 1)[-1])
+
+
+def get_rate_limiter(provider: str, requests_per_minute: Optional[float] = None) -> AdaptiveRateLimiter:
+    """
+    Return the process-wide limiter for a provider, creating it on first use.
+    All handlers talking to the same provider share one limiter, and thus one quota.
+    """
+    provider = normalize_provider_name(provider)
+    with _RATE_LIMITERS_LOCK:
+        if provider not in _RATE_LIMITERS:
+            _RATE_LIMITERS[provider] = AdaptiveRateLimiter(provider, requests_per_minute)
+        return _RATE_LIMITERS[provider]
+
+
+def parse_rate_limit_argument(rate_limit_args: Optional[list[str]]) -> dict[str, float]:
+    """
+    Input is like ['openai=200', 'claude=50'] (requests per minute), we need to transform it to {'openai': 200.0, 'claude': 50.0}.
+    """
+    rate_limits = {}
+    for item in rate_limit_args or []:
+        if "=" not in item:
+            raise ValueError(
+                f"Invalid rate limit '{item}'. Expected the format 'PROVIDER=REQUESTS_PER_MINUTE', e.g. 'openai=200'."
+            )
+        provider, requests_per_minute = item.split("=", 1)
+        rate_limits[normalize_provider_name(provider)] = float(requests_per_minute)
+    return rate_limits
+
+
+def get_retry_after(exception: Exception) -> Optional[float]:
+    """
+    Extract the retry-after hint (in seconds) from a rate-limit exception, if the provider sent one.
+    Most SDKs (openai, anthropic, mistral, ...) attach the raw HTTP response to their status errors.
+    """
+    response = getattr(exception, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms is not None:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+    if retry_after is not None:
+        try:
+            return float(retry_after)
+        except ValueError:
+            # HTTP-date form
+            from email.utils import parsedate_to_datetime
+
+            try:
+                return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+            except (TypeError, ValueError):
+                return None
+    return None
+
+
+def is_rate_limit_error(exception: Exception) -> bool:
+    """Whether the provider throttled us; only these errors slow the limiter down."""
+    # TODO: It might be better to handle the exception in the handler itself rather than a universal check here, as each handler use different ways to call the endpoint.
+    # OpenAI has openai.RateLimitError while Anthropic has anthropic.RateLimitError. It would be more robust in the long run.
+    if isinstance(exception, DeferredRateLimitError):
+        return True
+    # `status_code` for the OpenAI-style SDKs, `code` for the Google ones
+    if getattr(exception, "status_code", None) == 429 or getattr(exception, "code", None) == 429:
+        return True
+    error_message = str(exception).lower()
+    return any(message in error_message for message in RATE_LIMIT_ERROR_MESSAGES)
+
+
+def is_retryable_error(exception: Exception) -> bool:
+    """Whether a failed test case is worth running again: it was throttled, or the provider had a transient error."""
+    return is_rate_limit_error(exception) or (
+        getattr(exception, "status_code", None) in RETRYABLE_SERVER_ERROR_STATUS_CODES
+    )
@@ -0,0 +1,122 @@
+import hashlib
+import json
+import pickle
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Optional
+
+from bfcl.model_handler.utils import get_prompt_variation
+
+CACHE_FILE_NAME = "response_cache.sqlite"
+# Bump this whenever the key derivation or the stored value layout changes, so stale entries are never returned
+CACHE_FORMAT_VERSION = 1
+
+
+def _json_fallback(obj):
+    # SDK message objects (pydantic models) end up in the chat history after the first turn
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump()
+    if hasattr(obj, "to_dict"):
+        return obj.to_dict()
+    return repr(obj)
+
+
+class ResponseCache:
+    """
+    A persistent, content-addressed cache of raw model responses.
+
+    The key is a hash of everything that determines what the model sees: the model name, the temperature, the prompt
+    variation, and the fully compiled request (`inference_data`, i.e. the tools and the formatted messages).
+    The value is the raw API response together with the latency and the input log recorded when it was first obtained,
+    so a cache hit is indistinguishable from the original call for the downstream parsing and metadata logic.
+
+    The cache is backed by a single SQLite file and is safe to share between the worker threads of a run.
+    """
+
+    def __init__(self, cache_dir: Path) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.cache_path = self.cache_dir / CACHE_FILE_NAME
+
+        self.hit_count = 0
+        self.miss_count = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            self.cache_path, check_same_thread=False, isolation_level=None
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, model_name TEXT, value BLOB)"
+        )
+
+    @staticmethod
+    def compute_key(model_name: str, temperature: float, inference_data: dict) -> Optional[str]:
+        # The input log is (re)generated by the query itself, so it is not part of the request
+        request = {k: v for k, v in inference_data.items() if k != "inference_input_log"}
+        try:
+            serialized_request = json.dumps(
+                [
+                    CACHE_FORMAT_VERSION,
+                    model_name,
+                    temperature,
+                    get_prompt_variation(),
+                    request,
+                ],
+                sort_keys=True,
+                default=_json_fallback,
+            )
+        except (TypeError, ValueError):
+            return None
+        return hashlib.sha256(serialized_request.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[tuple]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is not None:
+            try:
+                value = pickle.loads(row[0])
+            except Exception:
+                # e.g. the SDK that produced the response is no longer installed; treat it as a miss
+                value = None
+            if value is not None:
+                with self._lock:
+                    self.hit_count += 1
+                return value
+        with self._lock:
+            self.miss_count += 1
+        return None
+
+    def set(self, key: str, model_name: str, value: tuple) -> None:
+        try:
+            serialized_value = pickle.dumps(value)
+        except Exception:
+            # Some SDK response objects cannot be pickled; those responses are simply not cached
+            return
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses (key, model_name, value) VALUES (?, ?, ?)",
+                (key, model_name, serialized_value),
+            )
+
+    def summary(self) -> str:
+        total = self.hit_count + self.miss_count
+        hit_rate = self.hit_count / total if total else 0
+        return f"Response cache: {self.hit_count} hits, {self.miss_count} misses ({hit_rate:.1%} hit rate). Stored at {self.cache_path}"
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+_RESPONSE_CACHES: dict[Path, ResponseCache] = {}
+
+
+def get_response_cache(cache_dir: Path) -> ResponseCache:
+    """Return the process-wide cache for a directory, so that all models of a run share one connection and one set of counters."""
+    cache_dir = Path(cache_dir).resolve()
+    if cache_dir not in _RESPONSE_CACHES:
+        _RESPONSE_CACHES[cache_dir] = ResponseCache(cache_dir)
+    return _RESPONSE_CACHES[cache_dir]
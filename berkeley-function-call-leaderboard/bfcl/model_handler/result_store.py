@@ -0,0 +1,183 @@
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+from bfcl.serialization import dumps, loads
+from bfcl.utils import sort_key
+
+# The pending records of `BFCL_v3_simple_result.json` live in `BFCL_v3_simple_result.json.log`,
+# and their positions in `BFCL_v3_simple_result.json.index`.
+LOG_SUFFIX = ".log"
+INDEX_SUFFIX = ".index"
+
+
+class ResultStore:
+    """
+    An append-only store for the model responses of one result file.
+
+    New records are appended to a log file next to the canonical result file, and their byte offset in the log is
+    appended to a sidecar index (one `id<TAB>offset<TAB>length` line per record). Writing a record is therefore O(1)
+    no matter how large the result file is. If the same id is written more than once (eg, `--allow-overwrite` or
+    `--run-ids`), the latest record wins.
+
+    `compact` merges the log into the canonical result file, sorted by id, and removes the log and the index.
+    It is run once at the end of a generation run. If a run crashes before that, the log is still on disk and is
+    compacted the next time the result folder is used (see `compact_result_dir`).
+    """
+
+    def __init__(self, file_path: Path) -> None:
+        self.file_path = Path(file_path)
+        self.log_path = self.file_path.with_name(self.file_path.name + LOG_SUFFIX)
+        self.index_path = self.file_path.with_name(self.file_path.name + INDEX_SUFFIX)
+
+        # Mapping from test entry id to the (offset, length) of its latest record in the log
+        self.index: dict[str, tuple[int, int]] = {}
+        self._log_file = None
+        self._index_file = None
+        self._log_size = 0
+        self._lock = threading.Lock()
+
+        self._load_index()
+
+    def _load_index(self) -> None:
+        if not self.log_path.exists():
+            return
+
+        log_size = self.log_path.stat().st_size
+        indexed_size = 0
+        if self.index_path.exists():
+            with open(self.index_path) as f:
+                for line in f:
+                    # A line without the trailing newline was cut off by a crash
+                    if not line.endswith("\n"):
+                        break
+                    test_id, offset, length = line.rstrip("\n").split("\t")
+                    self.index[test_id] = (int(offset), int(length))
+                    indexed_size = max(indexed_size, int(offset) + int(length))
+
+        if indexed_size != log_size:
+            # The process died between writing a record and indexing it; the log is the source of truth
+            self._rebuild_index()
+        self._log_size = self.log_path.stat().st_size
+
+    def _rebuild_index(self) -> None:
+        self.index = {}
+        offset = 0
+        with open(self.log_path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # Drop the partially written last record
+                    break
+                test_id = loads(line)["id"]
+                self.index[test_id] = (offset, len(line))
+                offset += len(line)
+
+        with open(self.log_path, "r+b") as f:
+            f.truncate(offset)
+        with open(self.index_path, "w") as f:
+            for test_id, (record_offset, length) in self.index.items():
+                f.write(f"{test_id}\t{record_offset}\t{length}\n")
+
+    def append(self, entries: list[dict]) -> None:
+        with self._lock:
+            if self._log_file is None:
+                self.log_path.parent.mkdir(parents=True, exist_ok=True)
+                self._log_file = open(self.log_path, "ab")
+                self._index_file = open(self.index_path, "a")
+
+            for entry in entries:
+                record = (dumps(entry) + "\n").encode("utf-8")
+                self._log_file.write(record)
+                self._index_file.write(f"{entry['id']}\t{self._log_size}\t{len(record)}\n")
+                self.index[entry["id"]] = (self._log_size, len(record))
+                self._log_size += len(record)
+
+            # Flush (to the OS) after every write, so that a crash of this process loses nothing
+            self._log_file.flush()
+            self._index_file.flush()
+
+    def __contains__(self, test_id: str) -> bool:
+        return test_id in self.index
+
+    def get(self, test_id: str) -> Optional[dict]:
+        """Return the latest record written for `test_id` since the last compaction, or None."""
+        with self._lock:
+            if test_id not in self.index:
+                return None
+            if self._log_file is not None:
+                self._log_file.flush()
+            offset, length = self.index[test_id]
+            with open(self.log_path, "rb") as f:
+                f.seek(offset)
+                return loads(f.read(length))
+
+    def get_records(self) -> list[dict]:
+        """Return the latest record written for each id since the last compaction."""
+        with self._lock:
+            if not self.index:
+                return []
+            if self._log_file is not None:
+                self._log_file.flush()
+            records = []
+            with open(self.log_path, "rb") as f:
+                for offset, length in self.index.values():
+                    f.seek(offset)
+                    records.append(loads(f.read(length)))
+            return records
+
+    def close(self) -> None:
+        with self._lock:
+            if self._log_file is not None:
+                self._log_file.close()
+                self._index_file.close()
+                self._log_file = None
+                self._index_file = None
+
+    def compact(self) -> None:
+        """Merge the pending records into the canonical result file, sorted by id."""
+        self.close()
+        with self._lock:
+            if not self.log_path.exists():
+                return
+
+            # The records are moved as they are (already serialized), rather than decoded and encoded again;
+            # only the records of the canonical file need to be decoded, for their id
+            records = {}
+            if self.file_path.exists():
+                with open(self.file_path, "rb") as f:
+                    for line in f:
+                        if not line.endswith(b"\n"):
+                            line += b"\n"
+                        records[loads(line)["id"]] = line
+
+            # Only the latest record of each id is read from the log
+            with open(self.log_path, "rb") as f:
+                for test_id, (offset, length) in self.index.items():
+                    f.seek(offset)
+                    records[test_id] = f.read(length)
+
+            # Write to a temporary file first so that the canonical file is never left half-written
+            temp_path = self.file_path.with_name(self.file_path.name + ".tmp")
+            with open(temp_path, "wb") as f:
+                for test_id in sorted(records, key=lambda test_id: sort_key({"id": test_id})):
+                    f.write(records[test_id])
+            os.replace(temp_path, self.file_path)
+
+            self.log_path.unlink()
+            if self.index_path.exists():
+                self.index_path.unlink()
+            self.index = {}
+            self._log_size = 0
+
+
+def compact_result_dir(model_result_dir: Path) -> None:
+    """
+    Compact every result file in the folder that still has pending records, eg. because the generation run that
+    wrote them crashed or was interrupted.
+    """
+    model_result_dir = Path(model_result_dir)
+    if not model_result_dir.is_dir():
+        return
+    for log_path in model_result_dir.glob(f"*.json{LOG_SUFFIX}"):
+        ResultStore(log_path.with_name(log_path.name[: -len(LOG_SUFFIX)])).compact()
@@ -0,0 +1,310 @@
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from bfcl.constants.eval_config import RUN_JOURNAL_PATH
+from bfcl.model_handler.result_store import ResultStore
+from bfcl.utils import extract_test_category_from_id, load_file
+
+JOURNAL_FILE_NAME = "journal.jsonl"
+MANIFEST_FILE_NAME = "manifests.jsonl"
+# The model response recorded for a test entry whose inference raised
+INFERENCE_ERROR_PREFIX = "Error during inference: "
+# The journal is rewritten as a single snapshot once it holds this many more events than entries
+JOURNAL_COMPACTION_RATIO = 2
+JOURNAL_COMPACTION_MIN_EVENTS = 1000
+
+# The status of a test entry: submitted to the model (in flight, or lost to a crash), or written to the result file
+SUBMITTED = "submitted"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+def is_inference_error(result_entry: dict) -> bool:
+    return type(result_entry.get("result")) == str and result_entry["result"].startswith(
+        INFERENCE_ERROR_PREFIX
+    )
+
+
+def _get_file_stat(file_path: Path) -> Optional[list[int]]:
+    try:
+        file_stat = file_path.stat()
+    except FileNotFoundError:
+        return None
+    return [file_stat.st_mtime_ns, file_stat.st_size]
+
+
+class RunJournal:
+    """
+    A record of the generation runs of one model into one result folder: the manifest of each run (its model,
+    categories, settings and number of entries), and a journal of the test entries submitted to the model, completed,
+    or failed (the inference raised, and the error was written as the model response), with the number of attempts of
+    each entry.
+
+    The result files remain the source of truth. The journal also holds the modification time and size of each result
+    file as of the last time it was known to match the journal; as long as a result file is unchanged, the ids it holds
+    are taken from the journal rather than read from the file, so that working out what is left to generate costs the
+    same no matter how many entries were already generated. A result file that changed behind the journal's back (eg.
+    edited, or copied from another machine) is read once to resync the journal.
+
+    The journal is kept under `.cache/run_journal/`, away from the result folder, and can be deleted at any time.
+    """
+
+    def __init__(self, result_dir: Path, model_name: str) -> None:
+        model_name_dir = model_name.replace("/", "_")
+        self.model_result_dir = Path(result_dir) / model_name_dir
+        result_dir_digest = hashlib.sha256(
+            str(self.model_result_dir.resolve()).encode("utf-8")
+        ).hexdigest()[:16]
+        self.journal_dir = RUN_JOURNAL_PATH / f"{model_name_dir}-{result_dir_digest}"
+        self.journal_path = self.journal_dir / JOURNAL_FILE_NAME
+        self.manifest_path = self.journal_dir / MANIFEST_FILE_NAME
+
+        # Mapping from test entry id to its [status, attempt count]
+        self.entries: dict[str, list] = {}
+        # Mapping from test category to the ids of its entries, and to the [mtime_ns, size] of its result file
+        self._category_ids: dict[str, set[str]] = {}
+        self._file_stats: dict[str, Optional[list[int]]] = {}
+        # Mapping from test category to its result file, for the categories this process keeps in sync
+        self._result_file_paths: dict[str, Path] = {}
+        self._event_count = 0
+        self._journal_file = None
+        self._lock = threading.Lock()
+
+        self._load()
+
+    def _load(self) -> None:
+        if not self.journal_path.exists():
+            return
+        with open(self.journal_path) as f:
+            for line in f:
+                # A line without the trailing newline was cut off by a crash
+                if not line.endswith("\n"):
+                    break
+                self._apply(json.loads(line))
+                self._event_count += 1
+
+        if self._event_count > max(
+            JOURNAL_COMPACTION_MIN_EVENTS, JOURNAL_COMPACTION_RATIO * len(self.entries)
+        ):
+            try:
+                self._compact()
+            except OSError:
+                pass
+
+    def _compact(self) -> None:
+        snapshot = {
+            "event": "snapshot",
+            "entries": self.entries,
+            "file_stats": self._file_stats,
+        }
+        # Write to a temporary file first so that the journal is never left half-written
+        temp_path = self.journal_path.with_name(self.journal_path.name + ".tmp")
+        with open(temp_path, "w") as f:
+            f.write(json.dumps(snapshot) + "\n")
+        os.replace(temp_path, self.journal_path)
+        self._event_count = 1
+
+    def _set_status(self, test_entry_id: str, status: str, new_attempt: bool = False) -> None:
+        entry = self.entries.setdefault(test_entry_id, [status, 0])
+        entry[0] = status
+        if new_attempt:
+            entry[1] += 1
+        self._category_ids.setdefault(extract_test_category_from_id(test_entry_id), set()).add(
+            test_entry_id
+        )
+
+    def _drop_generated(self, test_category: str) -> None:
+        # The entries that were submitted but never written stay pending, with their attempts
+        category_ids = self._category_ids.get(test_category, set())
+        for test_entry_id in [
+            test_entry_id
+            for test_entry_id in category_ids
+            if self.entries[test_entry_id][0] != SUBMITTED
+        ]:
+            del self.entries[test_entry_id]
+            category_ids.discard(test_entry_id)
+
+    def _apply(self, event: dict) -> None:
+        event_type = event["event"]
+        if event_type == "snapshot":
+            self.entries = {}
+            self._category_ids = {}
+            for test_entry_id, (status, attempt_count) in event["entries"].items():
+                self._set_status(test_entry_id, status)
+                self.entries[test_entry_id][1] = attempt_count
+            self._file_stats = event["file_stats"]
+        elif event_type == SUBMITTED:
+            for test_entry_id in event["ids"]:
+                self._set_status(test_entry_id, SUBMITTED, new_attempt=True)
+        elif event_type in (COMPLETED, FAILED):
+            self._set_status(event["id"], event_type)
+        elif event_type == "synced":
+            # The result file was read; its ids replace the ones the journal held
+            self._drop_generated(event["test_category"])
+            for test_entry_id in event["completed"]:
+                self._set_status(test_entry_id, COMPLETED)
+            for test_entry_id in event["failed"]:
+                self._set_status(test_entry_id, FAILED)
+            self._file_stats[event["test_category"]] = event["stat"]
+        elif event_type == "checkpoint":
+            if event["stat"] is None:
+                # The result file is gone, and so are the entries it held
+                self._drop_generated(event["test_category"])
+            self._file_stats[event["test_category"]] = event["stat"]
+
+    def _append(self, events: list[dict]) -> None:
+        with self._lock:
+            for event in events:
+                self._apply(event)
+            try:
+                if self._journal_file is None:
+                    self.journal_dir.mkdir(parents=True, exist_ok=True)
+                    self._journal_file = open(self.journal_path, "a")
+                for event in events:
+                    self._journal_file.write(json.dumps(event) + "\n")
+                # Flush (to the OS) after every write, like the result store, so that a crash of this process loses nothing
+                self._journal_file.flush()
+            except OSError:
+                # e.g. a read-only checkout; the result files are then read on every run
+                pass
+            self._event_count += len(events)
+
+    def is_in_sync(self, test_category: str, result_file_path: Path) -> bool:
+        """Whether the result file is the one the journal last saw (or, for a missing file, was never written)."""
+        return self._file_stats.get(test_category) == _get_file_stat(result_file_path)
+
+    def checkpoint(self, test_category: str, result_file_path: Path) -> None:
+        """Record that the result file now holds exactly the entries the journal marks as generated."""
+        self._result_file_paths[test_category] = result_file_path
+        file_stat = _get_file_stat(result_file_path)
+        if self._file_stats.get(test_category) != file_stat or (
+            file_stat is None and self._get_generated_ids(test_category)
+        ):
+            self._append([{"event": "checkpoint", "test_category": test_category, "stat": file_stat}])
+
+    def compact_result_file(self, test_category: str, result_file_path: Path) -> None:
+        """
+        Merge the pending records of a result file (left by a run that was interrupted) into it. When the journal was
+        in sync with the result file, only the pending records are read, to bring the journal in sync with the merged
+        file; otherwise the whole file is read by `get_generated_ids`.
+        """
+        result_store = ResultStore(result_file_path)
+        if not result_store.log_path.exists():
+            return
+        in_sync = self.is_in_sync(test_category, result_file_path)
+        if in_sync:
+            self.record_results(result_store.get_records())
+        result_store.compact()
+        if in_sync:
+            self.checkpoint(test_category, result_file_path)
+
+    def get_generated_ids(self, test_category: str, result_file_path: Path) -> set[str]:
+        """The ids of the entries in the result file, whether completed or failed."""
+        if not self.is_in_sync(test_category, result_file_path):
+            completed_ids, failed_ids = [], []
+            for entry in load_file(result_file_path):
+                (failed_ids if is_inference_error(entry) else completed_ids).append(entry["id"])
+            self._append(
+                [
+                    {
+                        "event": "synced",
+                        "test_category": test_category,
+                        "stat": _get_file_stat(result_file_path),
+                        "completed": completed_ids,
+                        "failed": failed_ids,
+                    }
+                ]
+            )
+        self._result_file_paths[test_category] = result_file_path
+        return self._get_generated_ids(test_category)
+
+    def _get_generated_ids(self, test_category: str) -> set[str]:
+        return {
+            test_entry_id
+            for test_entry_id in self._category_ids.get(test_category, set())
+            if self.entries[test_entry_id][0] != SUBMITTED
+        }
+
+    def get_failed_ids(self, test_category: str) -> set[str]:
+        return {
+            test_entry_id
+            for test_entry_id in self._category_ids.get(test_category, set())
+            if self.entries[test_entry_id][0] == FAILED
+        }
+
+    def get_attempt_count(self, test_entry_id: str) -> int:
+        return self.entries[test_entry_id][1] if test_entry_id in self.entries else 0
+
+    def start_run(self, manifest: dict, test_entry_ids: list[str]) -> str:
+        """Record the manifest of a new run, and the entries it submits to the model. Returns the id of the run."""
+        run_id = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+        try:
+            self.journal_dir.mkdir(parents=True, exist_ok=True)
+            with open(self.manifest_path, "a") as f:
+                f.write(
+                    json.dumps(
+                        {
+                            "run_id": run_id,
+                            "started_at": datetime.now().isoformat(timespec="seconds"),
+                            "result_dir": str(self.model_result_dir.resolve()),
+                            **manifest,
+                            "entry_count": len(test_entry_ids),
+                        }
+                    )
+                    + "\n"
+                )
+        except OSError:
+            pass
+        self._append([{"event": SUBMITTED, "run_id": run_id, "ids": test_entry_ids}])
+        return run_id
+
+    def record_results(self, result_entries: list[dict]) -> None:
+        """Record the outcome of entries that were just written to the result files."""
+        if result_entries:
+            self._append(
+                [
+                    {
+                        "event": FAILED if is_inference_error(entry) else COMPLETED,
+                        "id": entry["id"],
+                    }
+                    for entry in result_entries
+                ]
+            )
+
+    def finish_run(self) -> None:
+        """
+        Record that the result files of the categories in this run hold the entries the journal marks as generated.
+        Call once the result files are compacted, including when the run was interrupted: the entries that were still
+        in flight were not written, and stay pending.
+        """
+        for test_category, result_file_path in self._result_file_paths.items():
+            self.checkpoint(test_category, result_file_path)
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._journal_file is not None:
+                self._journal_file.close()
+                self._journal_file = None
+
+    def summary(self) -> str:
+        status_counts = {SUBMITTED: 0, COMPLETED: 0, FAILED: 0}
+        for status, _ in self.entries.values():
+            status_counts[status] += 1
+        return f"Run journal ({self.model_result_dir}): {status_counts[COMPLETED]} entries completed, {status_counts[FAILED]} failed, {status_counts[SUBMITTED]} pending. Stored at {self.journal_dir}"
+
+
+_RUN_JOURNALS: dict[tuple[Path, str], RunJournal] = {}
+
+
+def get_run_journal(result_dir: Path, model_name: str) -> RunJournal:
+    """Return the process-wide journal of the model's result folder."""
+    key = (Path(result_dir).resolve(), model_name)
+    if key not in _RUN_JOURNALS:
+        _RUN_JOURNALS[key] = RunJournal(result_dir, model_name)
+    return _RUN_JOURNALS[key]
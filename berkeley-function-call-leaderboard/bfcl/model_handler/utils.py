@@ -3,12 +3,19 @@ import builtins
 import copy
 import json
 import operator
+import pickle
 import re
+from contextlib import contextmanager
+from contextvars import ContextVar
 from functools import reduce
-from typing import Callable, List, Optional, Type, Union
+from typing import Callable, List, NamedTuple, Optional, Type, Union
 
 from bfcl.constants.default_prompts import DEFAULT_SYSTEM_PROMPT
 from bfcl.constants.type_mappings import GORILLA_TO_OPENAPI
+from bfcl.model_handler.compilation_cache import (
+    TOOL_COMPILATION_CACHE,
+    function_doc_key,
+)
 from bfcl.model_handler.model_style import ModelStyle
 from bfcl.model_handler.parser.java_parser import parse_java_function_call
 from bfcl.model_handler.parser.js_parser import parse_javascript_function_call
@@ -18,22 +25,44 @@ from bfcl.model_handler.func_doc_formatters import format_func_doc
 
 # Import prompt variations
 try:
-    from bfcl.constants.prompt_variations import PROMPT_VARIATIONS
+    from bfcl.constants.prompt_variations import DOC_FORMATS, PROMPT_VARIATIONS
 except ImportError:
     # Fallback if prompt_variations doesn't exist yet
     PROMPT_VARIATIONS = None
+    DOC_FORMATS = ["json"]
+
+
+class PromptVariation(NamedTuple):
+    res_fmt: str
+    doc_fmt: str
+    system_prompt_template: str
+    parser_language: str
+
+
+def _build_prompt_variation(res_fmt: str, doc_fmt: str) -> PromptVariation:
+    if PROMPT_VARIATIONS is None:
+        return PromptVariation(
+            res_fmt, doc_fmt, DEFAULT_SYSTEM_PROMPT + "\n{functions}\n", "Python"
+        )
+    return PromptVariation(
+        res_fmt,
+        doc_fmt,
+        PROMPT_VARIATIONS[res_fmt]["system_prompt"],
+        PROMPT_VARIATIONS[res_fmt]["parser_language"],
+    )
 
-# Global variables to store the current prompt variation
-_CURRENT_PROMPT_VARIATION = "python"
-_CURRENT_RES_FMT = "python"
-_CURRENT_DOC_FMT = "json"
-_CURRENT_SYSTEM_PROMPT_TEMPLATE = None  # Cached system prompt template
 
-# Initialize the system prompt template
-if PROMPT_VARIATIONS:
-    _CURRENT_SYSTEM_PROMPT_TEMPLATE = PROMPT_VARIATIONS["python"]["system_prompt"]
-else:
-    _CURRENT_SYSTEM_PROMPT_TEMPLATE = DEFAULT_SYSTEM_PROMPT + "\n{functions}\n"
+# The prompt variation of the task being run. Each task (asyncio task, or the worker thread it is handed to) can have
+# its own, so that several prompt variations can be generated and evaluated in the same process.
+# When a context has not set one, the process-wide default set by `set_prompt_variation` is used.
+_DEFAULT_PROMPT_VARIATION = _build_prompt_variation("python", "json")
+_PROMPT_VARIATION_CONTEXT: ContextVar[Optional[PromptVariation]] = ContextVar(
+    "prompt_variation", default=None
+)
+
+
+def _get_current_prompt_variation() -> PromptVariation:
+    return _PROMPT_VARIATION_CONTEXT.get() or _DEFAULT_PROMPT_VARIATION
 
 
 def parse_prompt_variation(variation_str: str) -> dict:
@@ -61,70 +90,119 @@ def parse_prompt_variation(variation_str: str) -> dict:
         return {"res_fmt": variation_str, "doc_fmt": "json"}
 
 
-def set_prompt_variation(variation: str):
-    """
-    Set the global prompt variation to use.
-    
-    Args:
-        variation: Either legacy format like 'python' or new format like 'res_fmt=json,doc_fmt=xml'
-    """
-    global _CURRENT_PROMPT_VARIATION, _CURRENT_RES_FMT, _CURRENT_DOC_FMT, _CURRENT_SYSTEM_PROMPT_TEMPLATE
-    
+def _resolve_prompt_variation(variation: str) -> PromptVariation:
     parsed = parse_prompt_variation(variation)
     res_fmt = parsed["res_fmt"]
     doc_fmt = parsed["doc_fmt"]
-    
+
     # Validate res_fmt
     if PROMPT_VARIATIONS and res_fmt not in PROMPT_VARIATIONS:
         raise ValueError(f"Invalid response format: {res_fmt}. Must be one of {list(PROMPT_VARIATIONS.keys())}")
-    
-    _CURRENT_PROMPT_VARIATION = res_fmt  # For backward compatibility
-    _CURRENT_RES_FMT = res_fmt
-    _CURRENT_DOC_FMT = doc_fmt
-    
-    # Cache the system prompt template
-    if PROMPT_VARIATIONS is None:
-        from bfcl.constants.default_prompts import DEFAULT_SYSTEM_PROMPT
-        _CURRENT_SYSTEM_PROMPT_TEMPLATE = DEFAULT_SYSTEM_PROMPT + "\n{functions}\n"
-    else:
-        _CURRENT_SYSTEM_PROMPT_TEMPLATE = PROMPT_VARIATIONS[res_fmt]["system_prompt"]
+
+    return _build_prompt_variation(res_fmt, doc_fmt)
+
+
+def set_prompt_variation(variation: str):
+    """
+    Set the prompt variation to use, for the whole process.
+    This sets the default for every task, as well as the variation of the current context.
+    To run a single task with a different variation, use `prompt_variation_context` instead.
+
+    Args:
+        variation: Either legacy format like 'python' or new format like 'res_fmt=json,doc_fmt=xml'
+    """
+    global _DEFAULT_PROMPT_VARIATION
+
+    _DEFAULT_PROMPT_VARIATION = _resolve_prompt_variation(variation)
+    _PROMPT_VARIATION_CONTEXT.set(_DEFAULT_PROMPT_VARIATION)
+
+
+@contextmanager
+def prompt_variation_context(variation: Optional[str]):
+    """
+    Use the given prompt variation within the `with` block, for the current context only (ie, the current thread or asyncio task).
+    Threads started through `asyncio.to_thread` inherit it. If `variation` is None, the current variation is kept.
+
+    Args:
+        variation: Either legacy format like 'python' or new format like 'res_fmt=json,doc_fmt=xml'
+    """
+    if variation is None:
+        yield
+        return
+
+    token = _PROMPT_VARIATION_CONTEXT.set(_resolve_prompt_variation(variation))
+    try:
+        yield
+    finally:
+        _PROMPT_VARIATION_CONTEXT.reset(token)
+
+
+def get_all_prompt_variations() -> list[str]:
+    """Every combination of response format and doc format, as used by `--variations all`."""
+    return [
+        f"res_fmt={res_fmt},doc_fmt={doc_fmt}"
+        for res_fmt in PROMPT_VARIATIONS
+        for doc_fmt in DOC_FORMATS
+    ]
+
+
+def expand_prompt_variations(variations: list[str]) -> list[str]:
+    """
+    Input is like ['all'] or ['res_fmt=json,doc_fmt=xml', 'python'], we need to transform it to the list of variations to run.
+    """
+    expanded_variations = []
+    for variation in variations:
+        if variation == "all":
+            expanded_variations.extend(get_all_prompt_variations())
+        else:
+            # Validate early, rather than failing in the middle of a run
+            _resolve_prompt_variation(variation)
+            expanded_variations.append(variation)
+    # Remove duplicates while keeping the order
+    return list(dict.fromkeys(expanded_variations))
+
+
+def get_prompt_variation_dir_suffix(variation: str) -> str:
+    """The suffix of the result and score folders of a variation, eg. `json_xml` for 'res_fmt=json,doc_fmt=xml'."""
+    parsed = parse_prompt_variation(variation)
+    return f"{parsed['res_fmt']}_{parsed['doc_fmt']}"
 
 
 def get_prompt_variation():
     """Get the current prompt variation (response format)."""
-    return _CURRENT_PROMPT_VARIATION
+    return _get_current_prompt_variation().res_fmt
 
 
 def get_res_fmt():
     """Get the current response format."""
-    return _CURRENT_RES_FMT
+    return _get_current_prompt_variation().res_fmt
 
 
 def get_doc_fmt():
     """Get the current documentation format."""
-    return _CURRENT_DOC_FMT
+    return _get_current_prompt_variation().doc_fmt
 
 
 def get_system_prompt_template():
     """Get the system prompt template for the current prompt variation."""
-    if PROMPT_VARIATIONS is None:
-        # Fallback to default if prompt_variations is not available
-        from bfcl.constants.default_prompts import DEFAULT_SYSTEM_PROMPT
-        return DEFAULT_SYSTEM_PROMPT + "\n{functions}\n"
-    return PROMPT_VARIATIONS[_CURRENT_PROMPT_VARIATION]["system_prompt"]
+    return _get_current_prompt_variation().system_prompt_template
 
 
 def get_parser_language():
     """Get the parser language for the current prompt variation."""
-    if PROMPT_VARIATIONS is None:
-        return "Python"  # Default fallback
-    return PROMPT_VARIATIONS[_CURRENT_PROMPT_VARIATION]["parser_language"]
+    return _get_current_prompt_variation().parser_language
 
 
+from bfcl.model_handler.rate_limiter import (
+    DeferredRateLimitError,
+    get_retry_after,
+    is_rate_limit_error,
+)
 from tenacity import (
     retry,
     retry_if_exception_message,
     retry_if_exception_type,
+    retry_if_not_exception_type,
     wait_random_exponential,
 )
 
@@ -175,6 +253,21 @@ def _cast_to_openai_type(properties, mapping):
 
 
 def convert_to_tool(functions, mapping, model_style):
+    """
+    Compile the function docs into the tool payload of the model style.
+    The result only depends on the inputs, so it is compiled once per distinct function set and reused afterwards.
+    """
+    key = function_doc_key(functions, mapping, model_style.value)
+    if key is None:
+        return _convert_to_tool(functions, mapping, model_style)
+    compiled_tools = TOOL_COMPILATION_CACHE.get_or_compute(
+        key, lambda: pickle.dumps(_convert_to_tool(functions, mapping, model_style))
+    )
+    # A fresh copy for every caller, as some handlers modify the tools afterwards (eg, Claude's cache control flag)
+    return pickle.loads(compiled_tools)
+
+
+def _convert_to_tool(functions, mapping, model_style):
     functions = copy.deepcopy(functions)
     oai_tool = []
     for item in functions:
@@ -452,12 +545,12 @@ def system_prompt_pre_processing_chat_model(prompts, function_docs, test_categor
     """
     assert type(prompts) == list
 
+    prompt_variation = _get_current_prompt_variation()
+
     # Format function docs according to the doc_fmt setting
-    doc_fmt = _CURRENT_DOC_FMT  # Use cached global instead of function call
-    formatted_functions = format_func_doc(function_docs, doc_fmt)
+    formatted_functions = format_func_doc(function_docs, prompt_variation.doc_fmt)
 
-    # Use the cached system prompt template
-    system_prompt = _CURRENT_SYSTEM_PROMPT_TEMPLATE.format(functions=formatted_functions)
+    system_prompt = prompt_variation.system_prompt_template.format(functions=formatted_functions)
 
     # System prompt must be in the first position
     # If the question comes with a system prompt, append its content at the end of the chat template.
@@ -914,6 +1007,11 @@ def retry_with_backoff(
     Note:
         At least one of `error_type` or `error_message_pattern` must be provided.
         If both `error_type` and `error_message_pattern` are provided, the retry will occur if either condition is met.
+        If the handler has a `rate_limiter`, every attempt first takes a token from it, and an attempt the provider
+        throttled waits as long as the limiter (which honours the provider's retry-after header) says instead of the
+        exponential backoff. When the throttled attempt is the first request of a test case, whose token the asyncio
+        scheduler took on the event loop, it is not retried here but raised as a `DeferredRateLimitError`, so that the
+        scheduler waits on the event loop rather than in the worker thread.
 
     Args:
         error_type ([Union[Type[Exception], List[Type[Exception]]]], optional): The exception type to retry on. Supports one exception, or a list of exceptions.
@@ -944,11 +1042,32 @@ def retry_with_backoff(
         if not conditions:
             raise ValueError("Either error_type or retry_condition must be provided.")
 
-        # Combine all conditions using logical OR
-        retry_policy = reduce(operator.or_, conditions)
+        # Combine all conditions using logical OR; a deferred rate limit is always left to the scheduler
+        retry_policy = reduce(operator.or_, conditions) & retry_if_not_exception_type(
+            DeferredRateLimitError
+        )
+
+        exponential_wait = wait_random_exponential(min=min_wait, max=max_wait)
+
+        def _get_rate_limiter(retry_state):
+            # The decorated functions are handler methods, so the handler is the first positional argument
+            if retry_state.args:
+                return getattr(retry_state.args[0], "rate_limiter", None)
+            return None
+
+        def wait_policy(retry_state):
+            # Honour the provider's retry-after hint when it sends one, otherwise back off exponentially
+            retry_after = get_retry_after(retry_state.outcome.exception())
+            rate_limiter = _get_rate_limiter(retry_state)
+            if rate_limiter is not None and is_rate_limit_error(retry_state.outcome.exception()):
+                # The limiter pauses every worker of this provider, not just the one that got throttled
+                return rate_limiter.on_rate_limited(retry_after)
+            if retry_after is not None:
+                return min(retry_after, max_wait)
+            return exponential_wait(retry_state)
 
         @retry(
-            wait=wait_random_exponential(min=min_wait, max=max_wait),
+            wait=wait_policy,
             retry=retry_policy,
             before_sleep=lambda retry_state: print(
                 f"Attempt {retry_state.attempt_number} failed. "
@@ -958,7 +1077,17 @@ def retry_with_backoff(
             **kwargs,
         )
         def wrapped(*args, **inner_kwargs):
-            return func(*args, **inner_kwargs)
+            rate_limiter = getattr(args[0], "rate_limiter", None) if args else None
+            prepaid = rate_limiter is not None and rate_limiter.acquire()
+            try:
+                result = func(*args, **inner_kwargs)
+            except Exception as e:
+                if prepaid and is_rate_limit_error(e):
+                    raise DeferredRateLimitError(e) from e
+                raise
+            if rate_limiter is not None:
+                rate_limiter.on_success()
+            return result
 
         return wrapped
 
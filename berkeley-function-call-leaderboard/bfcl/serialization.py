@@ -0,0 +1,86 @@
+import json
+import os
+from functools import lru_cache
+from typing import Any, Callable, Iterable, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Set to `orjson` to write JSON with orjson, when it is installed. Its output is equivalent, but more compact (no space
+# after the separators), so the files it writes differ byte-wise from the default ones; it is therefore opt-in.
+# Reading always goes through orjson when it is installed, as it parses to the very same values.
+JSON_BACKEND_ENV_VAR = "BFCL_JSON_BACKEND"
+
+# The types `json` writes natively, for which no fallback is ever needed
+JSON_PRIMITIVE_TYPES = (str, int, float, bool, type(None))
+
+_JSON_FALLBACKS: dict[type, Callable[[Any], Any]] = {}
+
+
+def register_json_fallback(cls: type, fallback: Callable[[Any], Any]) -> None:
+    """
+    Serialize the instances of `cls` (and of its subclasses) as `fallback(instance)`, which must return a value JSON
+    can represent (it may itself contain values that need a fallback).
+    """
+    _JSON_FALLBACKS[cls] = fallback
+
+
+def json_fallback(value: Any) -> Any:
+    """
+    What to write for a value that JSON can't represent. By default, that is its string representation; e.g. the
+    instances of the multi-turn backend classes (found in the instance states of the score records) are written as
+    their `repr`. numpy values are written as the equivalent Python numbers and lists.
+    """
+    for cls in type(value).__mro__:
+        if cls in _JSON_FALLBACKS:
+            return _JSON_FALLBACKS[cls](value)
+    # Checked by module, so that numpy doesn't have to be imported
+    if type(value).__module__ == "numpy" and hasattr(value, "tolist"):
+        return value.tolist()
+    return str(value)
+
+
+@lru_cache(maxsize=1)
+def _use_orjson_writer() -> bool:
+    # Read on first use rather than at import time, so that it can be set in the `.env` file
+    return orjson is not None and os.getenv(JSON_BACKEND_ENV_VAR, "").lower() == "orjson"
+
+
+def dumps(value: Any) -> str:
+    """
+    Serialize a value to JSON in a single pass, converting the values JSON can't represent with `json_fallback` as they
+    are encountered.
+    """
+    if _use_orjson_writer():
+        try:
+            return orjson.dumps(
+                value, default=json_fallback, option=orjson.OPT_NON_STR_KEYS
+            ).decode("utf-8")
+        except (TypeError, orjson.JSONEncodeError):
+            # e.g. integers beyond 64 bits, which `json` does handle
+            pass
+    return json.dumps(value, default=json_fallback)
+
+
+def loads(serialized: Union[str, bytes]) -> Any:
+    if orjson is not None:
+        try:
+            return orjson.loads(serialized)
+        except orjson.JSONDecodeError:
+            # orjson is stricter than `json`, e.g. it rejects NaN and integers beyond 64 bits
+            pass
+    return json.loads(serialized)
+
+
+def write_json_lines(file_path, entries: Iterable[dict]) -> None:
+    """
+    Write one JSON entry per line, without a trailing newline. The entries are serialized and written one at a time,
+    so they can come from a generator; the whole list is never held in memory, in either form.
+    """
+    with open(file_path, "w") as f:
+        for i, entry in enumerate(entries):
+            if i > 0:
+                f.write("\n")
+            f.write(dumps(entry))
@@ -5,6 +5,7 @@ from pathlib import Path
 from typing import Union
 
 from bfcl.constants.category_mapping import TEST_COLLECTION_MAPPING, TEST_FILE_MAPPING, VERSION_PREFIX
+from bfcl.serialization import JSON_PRIMITIVE_TYPES, json_fallback, loads, write_json_lines
 
 
 def extract_test_category(input_string: Union[str, Path]) -> str:
@@ -71,16 +72,25 @@ def is_sql(test_category):
 def load_file(file_path, sort_by_id=False):
     result = []
     with open(file_path) as f:
-        file = f.readlines()
-        for line in file:
-            result.append(json.loads(line))
+        for line in f:
+            result.append(loads(line))
 
     if sort_by_id:
         result.sort(key=sort_key)
     return result
 
 
+def load_file_header(file_path):
+    """The first entry of a file, without reading the rest; e.g. the accuracy summary of a score file."""
+    with open(file_path) as f:
+        return loads(f.readline())
+
+
 def write_list_of_dicts_to_file(filename, data, subdir=None):
+    """
+    Write the entries (a list, or any iterable such as a generator) to the file, one JSON entry per line.
+    Values that are not JSON serializable are converted on the fly; see `bfcl/serialization.py`.
+    """
     if subdir:
         # Ensure the subdirectory exists
         os.makedirs(subdir, exist_ok=True)
@@ -88,15 +98,7 @@ def write_list_of_dicts_to_file(filename, data, subdir=None):
         # Construct the full path to the file
         filename = os.path.join(subdir, filename)
 
-    # Write the list of dictionaries to the file in JSON format
-    with open(filename, "w") as f:
-        for i, entry in enumerate(data):
-            # Go through each key-value pair in the dictionary to make sure the values are JSON serializable
-            entry = make_json_serializable(entry)
-            json_str = json.dumps(entry)
-            f.write(json_str)
-            if i < len(data) - 1:
-                f.write("\n")
+    write_json_lines(filename, data)
 
 
 def make_json_serializable(value):
@@ -106,13 +108,15 @@ def make_json_serializable(value):
     elif isinstance(value, list):
         # If the value is a list, we need to process each element recursively
         return [make_json_serializable(item) for item in value]
+    elif type(value) in JSON_PRIMITIVE_TYPES:
+        return value
     else:
-        # Try to serialize the value directly, and if it fails, convert it to a string
+        # Try to serialize the value directly, and if it fails, convert it
         try:
             json.dumps(value)
             return value
         except (TypeError, ValueError):
-            return str(value)
+            return json_fallback(value)
 
 
 def sort_key(entry):
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Test that `bfcl generate` finds the servers started by `bfcl serve` through their lockfiles."""
+
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "berkeley-function-call-leaderboard"))
+
+import bfcl.model_handler.local_inference.oss_server as oss_server
+from bfcl.benchmark.mock_model_server import MockModelServer
+
+# The mock server answers `/health` and lists this model on `/v1/models`
+SERVED_MODEL = "mock"
+DTYPE = "bfloat16"
+
+
+def write_lockfile(port, pid, base_url, model=SERVED_MODEL):
+    return oss_server.write_server_lockfile(
+        {
+            "pid": pid,
+            "backend": "vllm",
+            "model": model,
+            "dtype": DTYPE,
+            "host": "127.0.0.1",
+            "port": port,
+            "base_url": base_url,
+        }
+    )
+
+
+# A pid that no longer belongs to any process
+exited_process = subprocess.Popen([sys.executable, "-c", "pass"])
+exited_process.wait()
+dead_pid = exited_process.pid
+
+with tempfile.TemporaryDirectory() as lock_dir, MockModelServer() as server:
+    oss_server.OSS_SERVER_LOCK_PATH = Path(lock_dir)
+
+    # Test 1: A healthy server, whose process is alive
+    print("Test 1: Attaching to a healthy server")
+    write_lockfile(1053, os.getpid(), server.base_url)
+    server_info = oss_server.find_live_server(SERVED_MODEL, DTYPE)
+    print(f"  Found: {server_info}")
+    assert server_info is not None and server_info["base_url"] == server.base_url, "Expected to attach to the server"
+
+    # Test 2: The same server, but another dtype was requested
+    print("\nTest 2: Skipping a server with another dtype")
+    server_info = oss_server.find_live_server(SERVED_MODEL, "float16")
+    print(f"  Found: {server_info}")
+    assert server_info is None, "Expected no server for another dtype"
+
+    # Test 3: A lockfile for another model, although the server behind it serves the mock model
+    print("\nTest 3: Skipping a server that does not serve the model of its lockfile")
+    oss_server.remove_server_lockfile(1053)
+    write_lockfile(1054, os.getpid(), server.base_url, model="other-model")
+    for model in [SERVED_MODEL, "other-model"]:
+        server_info = oss_server.find_live_server(model, DTYPE)
+        print(f"  {model}: found: {server_info}")
+        assert server_info is None, f"Expected no server for {model}"
+
+    # Test 4: The process of the lockfile is gone
+    print("\nTest 4: Skipping a server whose process is gone, and removing its lockfile")
+    lockfile_path = write_lockfile(1055, dead_pid, server.base_url)
+    server_info = oss_server.find_live_server(SERVED_MODEL, DTYPE)
+    print(f"  Found: {server_info}, lockfile left: {lockfile_path.exists()}")
+    assert server_info is None, "Expected no server for a dead process"
+    assert not lockfile_path.exists(), "Expected the stale lockfile to be removed"
+
+print("\nAll tests passed!")
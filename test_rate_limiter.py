@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Test the rate limiting of the generation scheduler against the mock model server."""
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "berkeley-function-call-leaderboard"))
+
+from openai import OpenAI
+
+from bfcl._llm_response_generation import RETRY_LIMIT, _async_inference, build_handler
+from bfcl.benchmark.mock_model_server import MockModelServer
+from bfcl.constants.eval_config import PROMPT_PATH
+from bfcl.dataset import find_dataset_file, load_dataset_file
+from bfcl.model_handler.rate_limiter import AdaptiveRateLimiter
+
+MODEL_NAME = "gpt-4o-2024-11-20-FC"
+TEST_CATEGORY = "simple"
+NUM_THREADS = 8
+# The handler's default client is replaced by one talking to the mock server
+os.environ.setdefault("OPENAI_API_KEY", "mock")
+
+test_cases = [dict(entry) for entry in load_dataset_file(find_dataset_file(PROMPT_PATH, TEST_CATEGORY))]
+
+
+def generate(server, rate_limiter, test_cases):
+    handler = build_handler(MODEL_NAME, 0.001)
+    # The SDK's own retries are turned off, so that every retry of a throttled request goes through the limiter
+    handler.client = OpenAI(api_key="mock", base_url=server.base_url, max_retries=0)
+    handler.rate_limiter = rate_limiter
+
+    async def run():
+        semaphore = asyncio.Semaphore(NUM_THREADS)
+        return await asyncio.gather(
+            *(_async_inference(handler, test_case, False, False, semaphore) for test_case in test_cases)
+        )
+
+    return asyncio.run(run())
+
+
+# Test 1: Requests are paced to the configured rate
+print("Test 1: Pacing requests at openai=600 (10 requests per second)")
+with MockModelServer() as server:
+    rate_limiter = AdaptiveRateLimiter("openai", 600)
+    results = generate(server, rate_limiter, test_cases[:40])
+    request_times = sorted(server.request_times)
+# The bucket starts full, so the first `capacity` requests go out at once
+burst_size = int(rate_limiter.capacity)
+paced_rate = (len(request_times) - burst_size - 1) / (request_times[-1] - request_times[burst_size])
+print(f"  Requests: {len(request_times)}, rate after the initial burst of {burst_size}: {paced_rate:.2f} per second")
+assert len(request_times) == 40, f"Expected 40 requests, got {len(request_times)}"
+assert all(isinstance(result["result"], list) for result in results), "Expected every test case to succeed"
+assert 9 <= paced_rate <= 10.5, f"Expected about 10 requests per second, got {paced_rate:.2f}"
+
+# Test 2: A throttled request is retried after the provider's Retry-After, without using up the retries
+print(f"\nTest 2: Retrying a request throttled {RETRY_LIMIT + 1} times with Retry-After: 2")
+with MockModelServer(rate_limited_request_count=RETRY_LIMIT + 1, retry_after=2) as server:
+    rate_limiter = AdaptiveRateLimiter("openai", 600)
+    results = generate(server, rate_limiter, test_cases[:1])
+    request_times = server.request_times
+retry_delays = [later - earlier for earlier, later in zip(request_times, request_times[1:])]
+print(f"  Requests: {len(request_times)}, delays: {', '.join(f'{delay:.2f}s' for delay in retry_delays)}")
+print(f"  Result: {results[0]['result']}")
+assert len(request_times) == RETRY_LIMIT + 2, f"Expected {RETRY_LIMIT + 2} requests, got {len(request_times)}"
+assert all(delay >= 2 for delay in retry_delays), f"Expected every retry to wait for the Retry-After, got {retry_delays}"
+assert isinstance(results[0]["result"], list), "Expected the test case to succeed, not to run out of retries"
+assert rate_limiter.rate_limited_count == RETRY_LIMIT + 1, f"Expected {RETRY_LIMIT + 1} throttled requests, got {rate_limiter}"
+
+print("\nAll tests passed!")
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Test that the score cache keeps the scores of different prompt variations, and of entries sharing an id, apart."""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "berkeley-function-call-leaderboard"))
+
+import bfcl.eval_checker.score_cache as score_cache
+from bfcl.constants.eval_config import POSSIBLE_ANSWER_PATH
+from bfcl.eval_checker.eval_runner import score_shard
+from bfcl.dataset import find_dataset_file, get_dataset_entry_count
+
+MODEL_NAME = "gpt-4o-2024-11-20"
+TEST_CATEGORY = "multi_turn_base"
+# The handler's client is never used for scoring
+os.environ.setdefault("OPENAI_API_KEY", "unused")
+
+total_count = get_dataset_entry_count(find_dataset_file(POSSIBLE_ANSWER_PATH, TEST_CATEGORY))
+
+# A prompting model's response to the first entry in the Python response format, one step per turn
+model_result = [
+    {
+        "id": f"{TEST_CATEGORY}_0",
+        "result": [
+            ["[cd(folder='document'), mkdir(dir_name='temp'), mv(source='final_report.pdf', destination='temp')]"],
+            ["[cd(folder='temp'), grep(file_name='final_report.pdf', pattern='budget analysis')]"],
+            ["[sort(file_name='final_report.pdf')]"],
+            [
+                "[cd(folder='..'), mv(source='previous_report.pdf', destination='temp'), cd(folder='temp'), "
+                "diff(file_name1='final_report.pdf', file_name2='previous_report.pdf')]"
+            ],
+        ],
+    }
+]
+
+with tempfile.TemporaryDirectory() as cache_dir:
+    score_cache._SCORE_CACHE = score_cache.ScoreCache(Path(cache_dir))
+
+    # Test 1: Python response format
+    print("Test 1: Scoring the result under the Python response format")
+    result, correct_count, lookups = score_shard(
+        MODEL_NAME, MODEL_NAME, TEST_CATEGORY, model_result, 0, total_count, "python"
+    )
+    print(f"  Correct: {correct_count}, cache (hits, misses): {lookups}")
+    assert correct_count == 1, f"Expected the entry to be correct, got {result}"
+    assert lookups == (0, 1), f"Expected a cache miss, got {lookups}"
+
+    # Test 2: JSON response format, the same result can't be decoded so it is not reused from the cache
+    print("\nTest 2: Scoring the same result under the JSON response format")
+    result, correct_count, lookups = score_shard(
+        MODEL_NAME, MODEL_NAME, TEST_CATEGORY, model_result, 0, total_count, "json"
+    )
+    print(f"  Correct: {correct_count}, cache (hits, misses): {lookups}")
+    assert correct_count == 0, "Expected the entry to be incorrect, the Python calls are not valid JSON"
+    assert lookups == (0, 1), f"Expected a cache miss, got {lookups}"
+
+    # Test 3: Each variation reuses its own score
+    print("\nTest 3: Scoring the result again under both response formats")
+    for variation, expected_correct_count in [("python", 1), ("json", 0)]:
+        result, correct_count, lookups = score_shard(
+            MODEL_NAME, MODEL_NAME, TEST_CATEGORY, model_result, 0, total_count, variation
+        )
+        print(f"  {variation}: correct: {correct_count}, cache (hits, misses): {lookups}")
+        assert correct_count == expected_correct_count, f"Expected {expected_correct_count} correct under {variation}"
+        assert lookups == (1, 0), f"Expected a cache hit, got {lookups}"
+
+    # Test 4: A result file with the same id twice, one entry correct and the other not
+    print("\nTest 4: Scoring two entries that share an id")
+    duplicate_model_result = [
+        {"id": "live_relevance_0-0-0", "result": "[generate_image(prompt='a digital painting')]"},
+        {"id": "live_relevance_0-0-0", "result": "I can't help with that."},
+    ]
+    expected_result, expected_correct_count, _ = score_shard(
+        MODEL_NAME, MODEL_NAME, "live_relevance", duplicate_model_result, 0, None, "python", False
+    )
+    for attempt in ["scored", "reused"]:
+        result, correct_count, lookups = score_shard(
+            MODEL_NAME, MODEL_NAME, "live_relevance", duplicate_model_result, 0, None, "python"
+        )
+        print(f"  {attempt}: correct: {correct_count}, records: {len(result)}, cache (hits, misses): {lookups}")
+        assert correct_count == expected_correct_count == 1, f"Expected 1 correct entry, got {correct_count}"
+        assert result == expected_result, f"Expected the records of the uncached run, got {result}"
+
+print("\nAll tests passed!")